@@ -4,12 +4,16 @@ FlowSense App Icon Generator
 Creates a beautiful, professional app icon for the FlowSense period tracking app.
 """
 
-from PIL import Image, ImageDraw, ImageFont
 import math
-import numpy as np
+
+def linspace(start, end, count):
+    """count evenly spaced values from start to end inclusive."""
+    step = (end - start) / (count - 1)
+    return [start + step * i for i in range(count - 1)] + [end]
 
 def create_flowsense_icon(size=1024):
     """Create a professional FlowSense app icon with circular flow design."""
+    from PIL import Image, ImageDraw
     
     # Create a new image with transparent background
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -69,12 +73,12 @@ def create_flowsense_icon(size=1024):
                 
                 # Create arc path
                 arc_points = []
-                for a in np.linspace(start_rad, end_rad, 20):
+                for a in linspace(start_rad, end_rad, 20):
                     x1 = center + inner_radius * math.cos(a)
                     y1 = center + inner_radius * math.sin(a)
                     arc_points.append((x1, y1))
                 
-                for a in np.linspace(end_rad, start_rad, 20):
+                for a in linspace(end_rad, start_rad, 20):
                     x2 = center + outer_radius * math.cos(a)
                     y2 = center + outer_radius * math.sin(a)
                     arc_points.append((x2, y2))
@@ -127,6 +131,8 @@ def create_flowsense_icon(size=1024):
 
 def main():
     """Generate FlowSense app icon in multiple sizes."""
+    from PIL import Image
+    
     print("🎨 Creating professional FlowSense app icon...")
     
     # Generate the main icon
@@ -3,9 +3,60 @@
 Simple script to create CycleAI logo PNG using PIL
 """
 
-try:
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from project_config import enter_project_root
+
+SIMPLE_SVG = '''<?xml version="1.0" encoding="UTF-8"?>
+<svg width="1024" height="1024" viewBox="0 0 1024 1024" xmlns="http://www.w3.org/2000/svg">
+  <defs>
+    <linearGradient id="grad" x1="0%" y1="0%" x2="100%" y2="100%">
+      <stop offset="0%" style="stop-color:#FF6B9D;stop-opacity:1" />
+      <stop offset="50%" style="stop-color:#C147E9;stop-opacity:1" />
+      <stop offset="100%" style="stop-color:#4F46E5;stop-opacity:1" />
+    </linearGradient>
+  </defs>
+  
+  <circle cx="512" cy="512" r="480" fill="url(#grad)"/>
+  
+  <!-- Infinity symbol for cycles -->
+  <path d="M 320 512 Q 400 400, 512 512 Q 624 624, 704 512 Q 624 400, 512 512 Q 400 624, 320 512 Z" 
+        fill="none" 
+        stroke="white" 
+        stroke-width="32" 
+        stroke-linecap="round" 
+        opacity="0.9"/>
+  
+  <!-- AI node -->
+  <circle cx="512" cy="512" r="48" fill="white" opacity="0.9"/>
+  <circle cx="512" cy="512" r="32" fill="#C147E9"/>
+  
+  <!-- Tech connections -->
+  <g stroke="white" stroke-width="8" fill="white" opacity="0.7">
+    <line x1="512" y1="464" x2="512" y2="360"/>
+    <circle cx="512" cy="340" r="16"/>
+    <line x1="560" y1="512" x2="664" y2="512"/>
+    <circle cx="684" cy="512" r="16"/>
+    <line x1="512" y1="560" x2="512" y2="664"/>
+    <circle cx="512" cy="684" r="16"/>
+    <line x1="464" y1="512" x2="360" y2="512"/>
+    <circle cx="340" cy="512" r="16"/>
+  </g>
+  
+  <!-- Data pulse points -->
+  <circle cx="512" cy="240" r="8" fill="#00FFFF"/>
+  <circle cx="784" cy="512" r="8" fill="#00FFFF"/>
+  <circle cx="512" cy="784" r="8" fill="#00FFFF"/>
+  <circle cx="240" cy="512" r="8" fill="#00FFFF"/>
+</svg>'''
+
+
+def create_png(path='cycleai_icon.png'):
+    """Draw the logo with Pillow; raises ImportError when it is missing."""
     from PIL import Image, ImageDraw
-    import math
     
     # Create a 1024x1024 image with transparent background
     size = 1024
@@ -83,58 +134,26 @@ try:
         draw.ellipse([x-8, y-8, x+8, y+8], fill=tech_color)
     
     # Save the image
-    img.save('/Users/ronos/development/FlowSense/cycleai_icon.png')
-    print("CycleAI logo created successfully as cycleai_icon.png")
-    
-except ImportError:
-    print("PIL (Pillow) not available. Creating a simple placeholder icon...")
-    # Create a simple colored square as fallback
-    import os
-    
-    # Create a simple SVG that can be converted later
-    simple_svg = '''<?xml version="1.0" encoding="UTF-8"?>
-<svg width="1024" height="1024" viewBox="0 0 1024 1024" xmlns="http://www.w3.org/2000/svg">
-  <defs>
-    <linearGradient id="grad" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:#FF6B9D;stop-opacity:1" />
-      <stop offset="50%" style="stop-color:#C147E9;stop-opacity:1" />
-      <stop offset="100%" style="stop-color:#4F46E5;stop-opacity:1" />
-    </linearGradient>
-  </defs>
-  
-  <circle cx="512" cy="512" r="480" fill="url(#grad)"/>
-  
-  <!-- Infinity symbol for cycles -->
-  <path d="M 320 512 Q 400 400, 512 512 Q 624 624, 704 512 Q 624 400, 512 512 Q 400 624, 320 512 Z" 
-        fill="none" 
-        stroke="white" 
-        stroke-width="32" 
-        stroke-linecap="round" 
-        opacity="0.9"/>
-  
-  <!-- AI node -->
-  <circle cx="512" cy="512" r="48" fill="white" opacity="0.9"/>
-  <circle cx="512" cy="512" r="32" fill="#C147E9"/>
-  
-  <!-- Tech connections -->
-  <g stroke="white" stroke-width="8" fill="white" opacity="0.7">
-    <line x1="512" y1="464" x2="512" y2="360"/>
-    <circle cx="512" cy="340" r="16"/>
-    <line x1="560" y1="512" x2="664" y2="512"/>
-    <circle cx="684" cy="512" r="16"/>
-    <line x1="512" y1="560" x2="512" y2="664"/>
-    <circle cx="512" cy="684" r="16"/>
-    <line x1="464" y1="512" x2="360" y2="512"/>
-    <circle cx="340" cy="512" r="16"/>
-  </g>
-  
-  <!-- Data pulse points -->
-  <circle cx="512" cy="240" r="8" fill="#00FFFF"/>
-  <circle cx="784" cy="512" r="8" fill="#00FFFF"/>
-  <circle cx="512" cy="784" r="8" fill="#00FFFF"/>
-  <circle cx="240" cy="512" r="8" fill="#00FFFF"/>
-</svg>'''
-    
-    with open('/Users/ronos/development/FlowSense/cycleai_icon.svg', 'w') as f:
-        f.write(simple_svg)
-    print("Created SVG fallback icon as cycleai_icon.svg")
+    img.save(path)
+    print(f"CycleAI logo created successfully as {path}")
+
+
+def create_svg(path='cycleai_icon.svg'):
+    """Write the SVG fallback, which can be rasterized later."""
+    with open(path, 'w') as f:
+        f.write(SIMPLE_SVG)
+    print(f"Created SVG fallback icon as {path}")
+
+
+def main():
+    # Icons are written next to pubspec.yaml, as before
+    enter_project_root()
+    try:
+        create_png()
+    except ImportError:
+        print("PIL (Pillow) not available. Creating a simple placeholder icon...")
+        create_svg()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,66 @@
 #!/usr/bin/env python3
 
-import re
-import os
+import argparse
 import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from project_config import add_root_argument, enter_project_root
+from rule_profile import add_profile_argument, enable_profile, report_profile, subn
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+from theme_scope import theme_scope
+
+# Target files with theme/const issues, relative to the project root
+TARGET_PATTERNS = [
+    "lib/features/biometric/**/*.dart",
+    "lib/features/cycle/**/*.dart",
+    "lib/core/routing/*.dart",
+    "lib/core/widgets/*.dart",
+]
+
+def keep_member_access(match):
+    """Theme.of(context). for a bare theme. with no `theme` in scope and a BuildContext `context`.
+
+    Member accesses (`.theme.`), methods that declare or take a `theme`
+    and methods whose `context` is not a BuildContext keep the match.
+    """
+    if match.group(0).startswith('.') or not theme_scope(match.string).can_use_theme_of(match.start()):
+        return match.group(0)
+    return 'Theme.of(context).'
+
+def drop_const(match):
+    return match.group(0).replace('const ', '')
+
+# (name, pattern, replacement) applied in order by fix_file_errors
+THEME_ERROR_RULES = [
+    # Fix const const duplication
+    ('const_const', r'\bconst const\b', 'const'),
+    
+    # Fix theme variable references that are incorrectly declared
+    ('self_theme', r'final theme = theme;', 'final theme = Theme.of(context);'),
+    
+    # Fix theme usage before declaration issues where a BuildContext is available.
+    # A member access such as `widget.theme.` (also across a line break) is
+    # matched by the first branch and kept as is.
+    ('theme_before_declaration', r'\.\s*theme\.|(?<![\w$.])theme\.(?!of\()', keep_member_access),
+    
+    # Fix widget construction issues
+    ('const_padding', r'return const Padding\(padding: const', 'return Padding(padding: const'),
+    ('const_sized_box', r'return const SizedBox\(', 'return SizedBox('),
+    ('const_text', r'return const Text\(', 'return Text('),
+    ('const_column', r'return const Column\(', 'return Column('),
+    ('const_row', r'return const Row\(', 'return Row('),
+    ('const_container', r'return const Container\(', 'return Container('),
+    
+    # Fix invalid constant expressions in string interpolation
+    ('const_interpolated_text', r'const Text\(\'[^\']*\$[^\']*\'\)', drop_const),
+    
+    # Fix switch and condition statement formatting
+    ('const_progress_box', r'const\s+SizedBox\(\s*width:\s*\d+\s*,\s*height:\s*\d+\s*,\s*child:\s*CircularProgressIndicator\(', 
+     'SizedBox(\n                              width: 20,\n                              height: 20,\n                              child: CircularProgressIndicator('),
+]
 
 def fix_file_errors(file_path):
     """Fix all theme and const errors in a single file"""
@@ -12,34 +70,12 @@ def fix_file_errors(file_path):
         
         original_content = content
         
-        # Fix const const duplication
-        content = re.sub(r'\bconst const\b', 'const', content)
-        
-        # Fix theme variable references that are incorrectly declared
-        content = re.sub(r'final theme = theme;', 'final theme = Theme.of(context);', content)
-        
-        # Fix theme usage before declaration issues by ensuring context is available
-        content = re.sub(r'(?<!Theme\.of\(context\)\.)(?<!final )(?<!\.\s*)theme\.(?!of\()', 'Theme.of(context).', content)
-        
-        # Fix widget construction issues
-        content = re.sub(r'return const Padding\(padding: const', 'return Padding(padding: const', content)
-        content = re.sub(r'return const SizedBox\(', 'return SizedBox(', content)
-        content = re.sub(r'return const Text\(', 'return Text(', content)
-        content = re.sub(r'return const Column\(', 'return Column(', content)
-        content = re.sub(r'return const Row\(', 'return Row(', content)
-        content = re.sub(r'return const Container\(', 'return Container(', content)
-        
-        # Fix invalid constant expressions in string interpolation
-        content = re.sub(r'const Text\(\'[^\']*\$[^\']*\'\)', lambda m: m.group(0).replace('const ', ''), content)
-        
-        # Fix switch and condition statement formatting
-        content = re.sub(r'const\s+SizedBox\(\s*width:\s*\d+\s*,\s*height:\s*\d+\s*,\s*child:\s*CircularProgressIndicator\(', 
-                        'SizedBox(\n                              width: 20,\n                              height: 20,\n                              child: CircularProgressIndicator(', content)
+        for name, pattern, replacement in THEME_ERROR_RULES:
+            content, _ = subn(f'fix_file_errors:{name}', file_path, pattern, replacement, content)
         
         # Write back if changes were made
         if content != original_content:
-            with open(file_path, 'w') as f:
-                f.write(content)
+            write_source(file_path, content)
             print(f"Fixed: {file_path}")
             return True
         return False
@@ -50,19 +86,22 @@ def fix_file_errors(file_path):
 
 def main():
     """Fix errors in all relevant Flutter files"""
+    parser = argparse.ArgumentParser(description='Fix theme and const errors in Flutter files')
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
     
-    # Target files with theme/const issues
-    target_patterns = [
-        "/Users/ronos/development/FlowSense/lib/features/biometric/**/*.dart",
-        "/Users/ronos/development/FlowSense/lib/features/cycle/**/*.dart", 
-        "/Users/ronos/development/FlowSense/lib/core/routing/*.dart",
-        "/Users/ronos/development/FlowSense/lib/core/widgets/*.dart"
-    ]
+    enter_project_root(args.root)
     
     files_fixed = 0
     total_files = 0
     
-    for pattern in target_patterns:
+    for pattern in TARGET_PATTERNS:
         for file_path in glob.glob(pattern, recursive=True):
             if file_path.endswith('.dart'):
                 total_files += 1
@@ -70,6 +109,8 @@ def main():
                     files_fixed += 1
     
     print(f"\nCompleted: Fixed {files_fixed} out of {total_files} files")
+    print_summary()
+    report_profile()
 
 if __name__ == "__main__":
     main()
@@ -1,52 +1,118 @@
 #!/usr/bin/env python3
 
-import re
+import argparse
 import os
+import sys
 
-def fix_biometric_dashboard_file():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from dart_index import SourceIndex
+from dart_lexer import THEME_OF_CONTEXT, match_sequence, replace_spans, sub_code
+from project_config import add_root_argument, enter_project_root
+from source_writer import add_dry_run_argument, enable_dry_run, write_source
+
+# Helper methods whose Theme.of(context) lookup goes back to `theme`
+HELPER_METHODS = [
+    '_buildTabContent',
+    '_buildTrendItem',
+    '_buildInsightCard',
+    '_buildNoInsightsCard',
+    '_buildConnectedDevicesCard',
+    '_buildSyncSettingsCard',
+    '_buildDeviceItem',
+    '_buildLoadingState',
+    '_buildErrorState',
+    '_buildEmptyState',
+    '_buildPermissionState',
+]
+
+def use_theme_in_helpers(content, method_names):
+    """Swap a helper's last Theme.of(context). before its first `}` for theme.
+
+    Method bodies come from one brace-matched index of the file, so each
+    helper is edited without searching the file again; strings and comments
+    are ignored.
+    """
+    index = SourceIndex(content)
+    edits = []
+    
+    for name in method_names:
+        span = index.method(name)
+        if span is None:
+            continue
+        
+        body = index.body_tokens(span)
+        last_theme = None
+        for position, token in enumerate(body):
+            if token.text == '}':
+                break
+            if match_sequence(body, position, THEME_OF_CONTEXT + ('.',)):
+                last_theme = position
+        
+        if last_theme is not None:
+            start = body[last_theme].start
+            end = body[last_theme + len(THEME_OF_CONTEXT)].end
+            edits.append((start, end, 'theme.'))
+    
+    # Edits share the original offsets; apply them together
+    return replace_spans(content, edits)
+
+DASHBOARD_FILE = 'lib/features/biometric/screens/biometric_dashboard_screen.dart'
+
+def fix_const_const(content, file_path=None):
+    """Fix const const duplication"""
+    return sub_code(r'\bconst const\b', 'const', content)[0]
+
+def fix_theme_to_context(content, file_path=None):
+    """Fix theme references in build methods by going through Theme.of(context)"""
+    return sub_code(r'(?<!final )theme\.', 'Theme.of(context).', content)[0]
+
+def fix_self_theme(content, file_path=None):
+    """Fix improper theme declarations"""
+    return sub_code(r'final theme = theme;', 'final theme = Theme.of(context);', content)[0]
+
+def fix_const_padding(content, file_path=None):
+    """Fix widget returns that should start with proper widget constructors"""
+    return sub_code(r'return const Padding\(padding: const', 'return Padding(padding: const', content)[0]
+
+def fix_helpers_use_theme(content, file_path=None):
+    """Fix method-level theme issues: helper methods use their local theme"""
+    return use_theme_in_helpers(content, HELPER_METHODS)
+
+# (name, fix) applied in order to the dashboard screen
+BIOMETRIC_RULES = [
+    ('const_const', fix_const_const),
+    ('theme_to_context', fix_theme_to_context),
+    ('self_theme', fix_self_theme),
+    ('const_padding', fix_const_padding),
+    ('helpers_use_theme', fix_helpers_use_theme),
+]
+
+def fix_biometric_dashboard_file(file_path=DASHBOARD_FILE):
     """Fix all errors in the biometric dashboard screen file"""
-    file_path = "/Users/ronos/development/FlowSense/lib/features/biometric/screens/biometric_dashboard_screen.dart"
     
     with open(file_path, 'r') as f:
         content = f.read()
+    original = content
     
-    # Fix const const duplication
-    content = re.sub(r'\bconst const\b', 'const', content)
-    
-    # Fix theme variable references in methods by adding proper context parameter
-    # Fix theme references in build methods by ensuring theme is properly declared
-    content = re.sub(r'(?<!final )theme\.', 'Theme.of(context).', content)
-    
-    # Fix improper theme declarations
-    content = re.sub(r'final theme = theme;', 'final theme = Theme.of(context);', content)
-    
-    # Fix widget returns that should start with proper widget constructors
-    content = re.sub(r'return const Padding\(padding: const', 'return Padding(padding: const', content)
-    
-    # Fix method-level theme issues by adding context parameters where needed
-    fixes = [
-        # Fix theme references in helper methods
-        (r'(\s+Widget _buildTabContent\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildTrendItem\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildInsightCard\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildNoInsightsCard\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildConnectedDevicesCard\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildSyncSettingsCard\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildDeviceItem\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildLoadingState\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildErrorState\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildEmptyState\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-        (r'(\s+Widget _buildPermissionState\([^{]+\{[^}]+)(Theme\.of\(context\)\.)', r'\1theme.'),
-    ]
+    for _, fix in BIOMETRIC_RULES:
+        content = fix(content, file_path)
     
-    for pattern, replacement in fixes:
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-    
-    # Write back fixed content
-    with open(file_path, 'w') as f:
-        f.write(content)
-    
-    print(f"Fixed biometric dashboard screen file: {file_path}")
+    # Write back fixed content, leaving the file alone if nothing changed
+    if write_source(file_path, content, original):
+        print(f"Fixed biometric dashboard screen file: {file_path}")
+    else:
+        print(f"No changes needed in biometric dashboard screen file: {file_path}")
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description='Fix errors in the biometric dashboard screen')
+    add_dry_run_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    enter_project_root(args.root)
     fix_biometric_dashboard_file()
+
+if __name__ == "__main__":
+    main()
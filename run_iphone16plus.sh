@@ -4,7 +4,7 @@
 # This script always runs the app on iPhone 16 Plus simulator
 
 DEVICE_ID="4AE9785A-6AA6-47F4-8DB1-6C6F84DA1B09"
-PROJECT_DIR="/Users/ronos/development/FlowSense"
+PROJECT_DIR="${ZYRAFLOW_ROOT:-$(cd "$(dirname "$0")" && pwd)}"
 
 # Color codes for output
 GREEN='\033[0;32m'
@@ -2,9 +2,10 @@
 """
 Add critical missing translations to key languages.
 """
-import json
 import os
-from pathlib import Path
+
+from arb_store import ArbStore
+from project_config import project_root
 
 # Critical translations for top priority keys
 CRITICAL_TRANSLATIONS = {
@@ -125,40 +126,13 @@ CRITICAL_TRANSLATIONS = {
     }
 }
 
-def load_arb_file(file_path):
-    """Load ARB file and return JSON data."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        return None
-
-def save_arb_file(file_path, data):
-    """Save data to ARB file with proper formatting."""
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
-        print(f"Successfully updated {file_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving {file_path}: {e}")
-        return False
-
 def add_critical_translations():
     """Add critical translations to key languages."""
-    l10n_dir = Path(__file__).parent.parent / 'lib' / 'l10n'
+    store = ArbStore.load(project_root())
     
     for lang_code, translations in CRITICAL_TRANSLATIONS.items():
-        lang_file = l10n_dir / f'app_{lang_code}.arb'
-        
-        if not lang_file.exists():
-            print(f"Language file not found: {lang_file}")
-            continue
-        
-        # Load existing translations
-        lang_data = load_arb_file(lang_file)
-        if not lang_data:
+        if lang_code not in store.locales:
+            print(f"Language file not found: {os.path.join(store.arb_dir, store.prefix + lang_code + '.arb')}")
             continue
         
         print(f"Adding critical translations for {lang_code}...")
@@ -166,14 +140,14 @@ def add_critical_translations():
         # Add missing critical translations
         added_count = 0
         for key, value in translations.items():
-            if key not in lang_data:
-                lang_data[key] = value
+            if not store.has(lang_code, key):
+                store.set(lang_code, key, value)
                 added_count += 1
         
         print(f"  Added {added_count} critical translations")
-        
-        # Save updated file
-        save_arb_file(lang_file, lang_data)
+    
+    # Only the locales that gained translations are written
+    store.flush()
     
     print("Critical translations completed!")
     return True
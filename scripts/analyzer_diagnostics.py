@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Location index built from `flutter analyze` / `dart analyze` output.
+
+Understands the three formats the analyzer prints:
+
+    [info] message (/abs/path/file.dart:12:5)               lib/analysis_output.txt
+    info • message • lib/file.dart:12:5 • rule_id           flutter analyze
+    INFO|LINT|rule_id|/abs/path/file.dart|12|5|11|message    --machine
+
+Paths are mapped back onto the project tree, so output captured on another
+machine still points at the right files. Fixers use the index to open only
+files with diagnostics and to rewrite only the flagged lines.
+"""
+import os
+import re
+from collections import namedtuple
+
+DEFAULT_ANALYSIS = 'lib/analysis_output.txt'
+
+Diagnostic = namedtuple('Diagnostic', 'severity code message path line column')
+
+_BRACKET = re.compile(r'^\s*\[(\w+)\]\s+(.*)\s+\((.+):(\d+):(\d+)\)\s*$')
+_BULLET = re.compile(r'^\s*(\w+)\s+•\s+(.*?)\s+•\s+(.+):(\d+):(\d+)\s+•\s+(\S+)\s*$')
+_MACHINE = re.compile(r'^(\w+)\|(\w+)\|(\w+)\|(.+?)\|(\d+)\|(\d+)\|\d+\|(.*)$')
+
+# The bracket format carries no rule id; recognise the ones fixers act on
+_MESSAGE_CODES = [
+    (re.compile(r"^'\w+' is deprecated"), 'deprecated_member_use'),
+    (re.compile(r"^Don't invoke 'print'"), 'avoid_print'),
+    (re.compile(r'could be (?:a )?super parameters?'), 'use_super_parameters'),
+    (re.compile(r"^Unnecessary 'const' keyword"), 'unnecessary_const'),
+    (re.compile(r"^The value of the local variable '\w+' isn't used"), 'unused_local_variable'),
+]
+
+_DEPRECATED_MEMBER = re.compile(r"^'(\w+)' is deprecated")
+
+
+def _code_for_message(message):
+    for pattern, code in _MESSAGE_CODES:
+        if pattern.search(message):
+            return code
+    return None
+
+
+def parse_line(line):
+    """Return the Diagnostic on one line of analyzer output, or None."""
+    match = _MACHINE.match(line)
+    if match:
+        severity, _, code, path, line_no, column, message = match.groups()
+        return Diagnostic(severity.lower(), code.lower(), message.strip(), path, int(line_no), int(column))
+    match = _BULLET.match(line)
+    if match:
+        severity, message, path, line_no, column, code = match.groups()
+        return Diagnostic(severity.lower(), code, message, path, int(line_no), int(column))
+    match = _BRACKET.match(line)
+    if match:
+        severity, message, path, line_no, column = match.groups()
+        return Diagnostic(severity.lower(), _code_for_message(message), message, path, int(line_no), int(column))
+    return None
+
+
+def parse_diagnostics(lines):
+    """Yield the diagnostics in an iterable of output lines, one at a time."""
+    for line in lines:
+        diagnostic = parse_line(line)
+        if diagnostic is not None:
+            yield diagnostic
+
+
+def project_path(path, root='.', _cache={}):
+    """Map an analyzer path onto root, or return None if no such file exists.
+
+    Absolute paths from another checkout are resolved by the longest
+    suffix that exists under root.
+    """
+    key = (path, root)
+    if key not in _cache:
+        resolved = None
+        if not os.path.isabs(path):
+            resolved = path if os.path.isfile(os.path.join(root, path)) else None
+        else:
+            parts = path.replace('\\', '/').strip('/').split('/')
+            for index in range(len(parts)):
+                candidate = '/'.join(parts[index:])
+                if os.path.isfile(os.path.join(root, candidate)):
+                    resolved = candidate
+                    break
+        _cache[key] = resolved
+    return _cache[key]
+
+
+def deprecated_member(diagnostic):
+    """Name of the deprecated member a deprecated_member_use diagnostic is about."""
+    match = _DEPRECATED_MEMBER.match(diagnostic.message)
+    return match.group(1) if match else None
+
+
+def is_deprecated(*members):
+    """Predicate: a deprecation diagnostic for one of the given members."""
+    def predicate(diagnostic):
+        return diagnostic.code == 'deprecated_member_use' and deprecated_member(diagnostic) in members
+    return predicate
+
+
+class DiagnosticIndex:
+    """Diagnostics grouped by project-relative file path."""
+
+    def __init__(self, diagnostics, root='.', mtime=None):
+        self.root = root
+        # Files edited after the analysis ran may have shifted lines
+        self.mtime = mtime
+        self.by_path = {}
+        self.unresolved = 0
+        for diagnostic in diagnostics:
+            path = project_path(diagnostic.path, root)
+            if path is None:
+                self.unresolved += 1
+                continue
+            self.by_path.setdefault(path, []).append(diagnostic._replace(path=path))
+
+    @classmethod
+    def load(cls, analysis_path=DEFAULT_ANALYSIS, root='.'):
+        """Index a saved analyzer output, or the latest run of a diagnostics store."""
+        if analysis_path.endswith('.sqlite3'):
+            # Imported lazily: only store users need sqlite3
+            from diagnostics_store import DiagnosticsStore
+            store = DiagnosticsStore(analysis_path, read_only=True)
+            try:
+                return store.index(root=root)
+            finally:
+                store.close()
+        with open(analysis_path, 'r', encoding='utf-8') as f:
+            return cls(parse_diagnostics(f), root, os.path.getmtime(analysis_path))
+
+    def __len__(self):
+        return sum(len(diagnostics) for diagnostics in self.by_path.values())
+
+    def locations(self, predicate):
+        """Return {path: sorted line numbers} of the diagnostics matching predicate."""
+        result = {}
+        for path, diagnostics in self.by_path.items():
+            lines = {d.line for d in diagnostics if predicate(d)}
+            if lines:
+                result[path] = sorted(lines)
+        return dict(sorted(result.items()))
+
+    def is_stale(self, path):
+        """True when path changed after the analysis ran, so its line numbers may be off."""
+        if self.mtime is None:
+            return False
+        return os.path.getmtime(os.path.join(self.root, path)) > self.mtime
+
+
+def fix_lines(content, lines, fix):
+    """Apply fix(line_text) -> (new_text, count) to the given 1-based lines only.
+
+    Returns (new_content, count).
+    """
+    source_lines = content.splitlines(keepends=True)
+    count = 0
+    for line_no in lines:
+        if 1 <= line_no <= len(source_lines):
+            new_line, fixed = fix(source_lines[line_no - 1])
+            source_lines[line_no - 1] = new_line
+            count += fixed
+    return ''.join(source_lines), count
+
+
+def add_analysis_argument(parser):
+    parser.add_argument(
+        '--from-analysis', nargs='?', const=DEFAULT_ANALYSIS, metavar='ANALYSIS_OUTPUT',
+        help='only fix lines flagged in saved analyzer output (text or --machine format, '
+             f'default {DEFAULT_ANALYSIS}) or in the latest run of a .sqlite3 diagnostics store; '
+             'files without diagnostics are never opened',
+    )
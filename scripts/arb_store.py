@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+In-memory store of every ARB file, shared by the translation scripts.
+
+All locales are loaded once into a key × locale matrix. Each key gets one
+interned row number, and each locale is a column: a dict from row to
+value, plus an integer bitmask of the rows it defines. Questions about
+missing, extra or metadata (`@key`) keys are then bitwise operations on
+those masks rather than new JSON parses, and per-key counts such as "keys
+missing in at least 10 locales" are cached until the next edit.
+
+Every locale keeps its file's text and key order. A key new to a locale
+goes next to its English neighbours: after the nearest key before it in
+the template that the locale has (a `@key` right after its message).
+Edits mark the locale dirty, and flush() writes only the dirty locales,
+editing their text in place with arb_writer and writing through
+source_writer, so a file is only replaced when its bytes change.
+
+ArbCache keeps results derived from single ARB files (untranslated keys,
+generated Dart) under .dart_tool/, valid while the file's bytes are.
+"""
+import hashlib
+import json
+import os
+import sys
+
+from arb_writer import update_text
+from project_config import l10n_config
+from source_writer import write_source
+
+CACHE_DIR = os.path.join('.dart_tool', 'zyraflow_l10n')
+
+
+def is_metadata(key):
+    """`@key` descriptions and `@@locale`-style globals."""
+    return key.startswith('@')
+
+
+def arb_paths(arb_dir, template_file):
+    """Locale -> ARB path for the files named like the template, template first, then by locale."""
+    prefix = template_file[:template_file.rindex('_') + 1]
+    paths = {template_file[len(prefix):-len('.arb')]: os.path.join(arb_dir, template_file)}
+    for name in sorted(os.listdir(arb_dir)):
+        if name.startswith(prefix) and name.endswith('.arb') and name != template_file:
+            paths[name[len(prefix):-len('.arb')]] = os.path.join(arb_dir, name)
+    return paths
+
+
+def _rows(mask):
+    """Row numbers of the set bits of mask, lowest first."""
+    rows = []
+    while mask:
+        low = mask & -mask
+        rows.append(low.bit_length() - 1)
+        mask ^= low
+    return rows
+
+
+class Locale:
+    """One ARB file: its text, its values by row, the rows it defines and their order."""
+
+    __slots__ = ('code', 'path', 'text', 'values', 'mask', 'order', 'dirty')
+
+    def __init__(self, code, path, text=None):
+        self.code = code
+        self.path = path
+        self.text = text
+        self.values = {}
+        self.mask = 0
+        self.order = []
+        self.dirty = False
+
+
+class ArbStore:
+    """Key × locale matrix over the ARB files of one directory."""
+
+    def __init__(self, arb_dir, template_file='app_en.arb'):
+        self.arb_dir = arb_dir
+        self.prefix = template_file[:template_file.rindex('_') + 1]
+        self.keys = []
+        self.rows = {}
+        self.locales = {}
+        # Rows of message keys, i.e. everything but metadata
+        self.message_mask = 0
+        self.template = template_file[len(self.prefix):-len('.arb')]
+        self._missing_counts = None
+
+    @classmethod
+    def load(cls, root='.'):
+        """Load every ARB file of the project's arb-dir (from l10n.yaml)."""
+        config = l10n_config(root)
+        store = cls(os.path.join(root, config['arb-dir']), config['template-arb-file'])
+        paths = arb_paths(store.arb_dir, config['template-arb-file'])
+        if not os.path.isfile(paths[store.template]):
+            raise SystemExit(f"❌ Template {paths[store.template]} not found")
+        # The template goes first, so rows (and every key list) follow its order
+        for path in paths.values():
+            store._load_file(path)
+        return store
+
+    def _load_file(self, path):
+        code = os.path.basename(path)[len(self.prefix):-len('.arb')]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            data = json.loads(text)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {path}: {e}")
+            return
+        locale = Locale(code, path, text)
+        for key, value in data.items():
+            row = self.row(key)
+            locale.values[row] = value
+            locale.mask |= 1 << row
+            locale.order.append(row)
+        self.locales[code] = locale
+
+    def row(self, key):
+        """The row number of key, adding the key if it is new."""
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            key = sys.intern(key)
+            self.keys.append(key)
+            self.rows[key] = row
+            if not is_metadata(key):
+                self.message_mask |= 1 << row
+        return row
+
+    def _keys(self, mask):
+        return [self.keys[row] for row in _rows(mask)]
+
+    # Lookups
+
+    def codes(self):
+        return list(self.locales)
+
+    def _has_row(self, locale, row):
+        return row is not None and bool(locale.mask >> row & 1)
+
+    def has(self, code, key):
+        return self._has_row(self.locales[code], self.rows.get(key))
+
+    def get(self, code, key, default=None):
+        row = self.rows.get(key)
+        return self.locales[code].values.get(row, default)
+
+    def data(self, code):
+        """The locale as an ordered dict, as it would be written."""
+        locale = self.locales[code]
+        return {self.keys[row]: locale.values[row] for row in locale.order}
+
+    # Set operations, as key lists in row order: template keys in template order, then the rest
+
+    def messages(self, code):
+        return self._keys(self.locales[code].mask & self.message_mask)
+
+    def metadata(self, code):
+        return self._keys(self.locales[code].mask & ~self.message_mask)
+
+    def missing(self, code):
+        """Template messages the locale does not define."""
+        template = self.locales[self.template].mask & self.message_mask
+        return self._keys(template & ~self.locales[code].mask)
+
+    def extra(self, code):
+        """Messages the locale defines that the template does not."""
+        return self._keys(self.locales[code].mask & self.message_mask & ~self.locales[self.template].mask)
+
+    def missing_counts(self):
+        """Template message -> number of locales missing it; cached until an edit."""
+        if self._missing_counts is None:
+            template = self.locales[self.template].mask & self.message_mask
+            counts = {}
+            for locale in self.locales.values():
+                for row in _rows(template & ~locale.mask):
+                    counts[row] = counts.get(row, 0) + 1
+            self._missing_counts = {self.keys[row]: counts.get(row, 0) for row in _rows(template)}
+        return self._missing_counts
+
+    def keys_missing_in(self, min_locales):
+        """Template messages missing from at least min_locales locales."""
+        return [key for key, count in self.missing_counts().items() if count >= min_locales]
+
+    # Edits
+
+    def _position(self, locale, row):
+        """Index in locale.order for a row new to it, next to its template neighbours."""
+        key = self.keys[row]
+        if key.startswith('@') and not key.startswith('@@'):
+            message = self.rows.get(key[1:])
+            if self._has_row(locale, message):
+                return locale.order.index(message) + 1
+            # Placed where its message would go
+            row = message
+        template_order = self.locales[self.template].order
+        if row is None or row not in template_order:
+            return len(locale.order)
+        position = template_order.index(row)
+        for previous in reversed(template_order[:position]):
+            if self._has_row(locale, previous) and not is_metadata(self.keys[previous]):
+                index = locale.order.index(previous) + 1
+                description = self.rows.get('@' + self.keys[previous])
+                if index < len(locale.order) and locale.order[index] == description:
+                    index += 1
+                return index
+        for following in template_order[position + 1:]:
+            if self._has_row(locale, following) and not is_metadata(self.keys[following]):
+                return locale.order.index(following)
+        return len(locale.order)
+
+    def set(self, code, key, value):
+        """Set a value; a key new to the locale goes next to its template neighbours."""
+        locale = self.locales[code]
+        row = self.row(key)
+        bit = 1 << row
+        if locale.mask & bit:
+            if locale.values[row] == value:
+                return False
+        else:
+            locale.order.insert(self._position(locale, row), row)
+            locale.mask |= bit
+            self._missing_counts = None
+        locale.values[row] = value
+        locale.dirty = True
+        return True
+
+    def remove(self, code, key):
+        locale = self.locales[code]
+        row = self.rows.get(key)
+        if row is None or not locale.mask >> row & 1:
+            return False
+        locale.mask &= ~(1 << row)
+        del locale.values[row]
+        locale.order.remove(row)
+        locale.dirty = True
+        self._missing_counts = None
+        return True
+
+    def dirty(self):
+        return [code for code, locale in self.locales.items() if locale.dirty]
+
+    def flush(self):
+        """Write the locales edited since loading. Returns {code: arb_writer.Changes} for the written ones."""
+        written = {}
+        for code in self.dirty():
+            locale = self.locales[code]
+            content, changes = update_text(locale.text, self.data(code))
+            if write_source(locale.path, content, locale.text):
+                print(f"✏️  {code}: {changes} ({locale.path})")
+                written[code] = changes
+            locale.text = content
+            locale.dirty = False
+        return written
+
+
+class ArbCache:
+    """Per-file results keyed by the file's content hash.
+
+    A (size, mtime) match stands in for the hash, so an untouched ARB file
+    costs one stat; a touched file is hashed, and only a changed one needs
+    its result recomputed.
+    """
+
+    def __init__(self, name, version, root='.'):
+        # Entries are keyed by paths relative to root, however root is spelled
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, f'{name}.json')
+        self.version = version
+        self.entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == version:
+            self.entries = data.get('entries', {})
+
+    def fingerprint(self, path):
+        """(content hash, bytes) of path; bytes is None when the stat shows no change."""
+        stat = os.stat(path)
+        entry = self.entry(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['hash'], None
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry and entry['hash'] == digest:
+            entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            self._dirty = True
+        return digest, data
+
+    def entry(self, path):
+        return self.entries.get(os.path.relpath(path, self.root))
+
+    def get(self, path, key):
+        """The result stored for path under key (usually built from content hashes), else None."""
+        entry = self.entry(path)
+        if entry and entry['key'] == key:
+            return entry['result']
+        return None
+
+    def put(self, path, digest, key, result):
+        stat = os.stat(path)
+        self.entries[os.path.relpath(path, self.root)] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest,
+            'key': key, 'result': result,
+        }
+        self._dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Order-preserving, minimal-diff serializer for ARB files.
+
+The ARB files are hand formatted: blank lines between sections, and in a
+few files repeated keys. Re-serializing a whole file with json.dumps
+rewrites all of that and touches every line. Instead the original text is
+edited in place. Only the values that changed are replaced. New keys are
+inserted after the key that precedes them in the desired order, and
+removed keys are cut out together with their separating comma. Everything
+else, including whitespace, stays byte for byte.
+"""
+import json
+import re
+
+_WHITESPACE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+
+
+class Entry:
+    """One top-level `"key": value` of an ARB file and where it sits in the text."""
+
+    __slots__ = ('key', 'value', 'start', 'value_start', 'value_end')
+
+    def __init__(self, key, value, start, value_start, value_end):
+        self.key = key
+        self.value = value
+        self.start = start
+        self.value_start = value_start
+        self.value_end = value_end
+
+
+def parse_entries(text):
+    """Top-level entries in file order (repeated keys included), or None if text is not an object."""
+    position = _WHITESPACE.match(text, 0).end()
+    if not text.startswith('{', position):
+        return None
+    position = _WHITESPACE.match(text, position + 1).end()
+    entries = []
+    if text.startswith('}', position):
+        return entries
+    while True:
+        if not text.startswith('"', position):
+            return None
+        start = position
+        key, position = json.decoder.scanstring(text, position + 1)
+        position = _WHITESPACE.match(text, position).end()
+        if not text.startswith(':', position):
+            return None
+        value_start = _WHITESPACE.match(text, position + 1).end()
+        value, value_end = _DECODER.raw_decode(text, value_start)
+        entries.append(Entry(key, value, start, value_start, value_end))
+        position = _WHITESPACE.match(text, value_end).end()
+        if text.startswith(',', position):
+            position = _WHITESPACE.match(text, position + 1).end()
+        elif text.startswith('}', position):
+            return entries
+        else:
+            return None
+
+
+def _indent(text, entries):
+    """The indentation of the first entry, two spaces if there is none."""
+    if entries:
+        line_start = text.rfind('\n', 0, entries[0].start) + 1
+        indent = text[line_start:entries[0].start]
+        if not indent.strip():
+            return indent
+    return '  '
+
+
+def render_value(value, indent):
+    """A value as JSON at the given nesting, in the files' style."""
+    rendered = json.dumps(value, ensure_ascii=False, indent=len(indent), separators=(',', ': '))
+    return rendered.replace('\n', '\n' + indent)
+
+
+def serialize(data):
+    """A whole file, for new files or text that cannot be edited in place."""
+    return json.dumps(data, ensure_ascii=False, indent=2, separators=(',', ': ')) + '\n'
+
+
+class Changes:
+    """Keys added, changed and removed by one update."""
+
+    __slots__ = ('added', 'changed', 'removed')
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f"+{len(self.added)} added, ~{len(self.changed)} changed, -{len(self.removed)} removed"
+
+
+def update_text(text, data):
+    """Edit text, an ARB file, so it decodes to data; returns (new_text, Changes).
+
+    data is an ordered dict; keys not in text are placed after the key that
+    precedes them in data.
+    """
+    changes = Changes()
+    entries = parse_entries(text) if text is not None else None
+    if not entries:
+        changes.added = list(data)
+        return serialize(data), changes
+
+    indent = _indent(text, entries)
+    # The value json.load keeps for a repeated key is its last one
+    last = {entry.key: entry for entry in entries}
+    edits = []
+
+    index = 0
+    while index < len(entries):
+        entry = entries[index]
+        if entry.key in data:
+            if last[entry.key] is entry and entry.value != data[entry.key]:
+                edits.append((entry.value_start, entry.value_end, render_value(data[entry.key], indent)))
+                changes.changed.append(entry.key)
+            index += 1
+            continue
+        # A run of removed entries goes with the comma before it (after it, at the start)
+        end = index
+        while end + 1 < len(entries) and entries[end + 1].key not in data:
+            end += 1
+        for removed in entries[index:end + 1]:
+            if removed.key not in changes.removed:
+                changes.removed.append(removed.key)
+        if index > 0:
+            edits.append((entries[index - 1].value_end, entries[end].value_end, ''))
+        elif end + 1 < len(entries):
+            edits.append((entry.start, entries[end + 1].start, ''))
+        else:
+            changes.added = list(data)
+            return serialize(data), changes
+        index = end + 1
+
+    # New keys, grouped by the existing entry they follow (None: before the first)
+    anchor = None
+    inserted = {}
+    for key, value in data.items():
+        if key in last:
+            anchor = key
+            continue
+        item = f'{json.dumps(key, ensure_ascii=False)}: {render_value(value, indent)}'
+        inserted.setdefault(anchor, []).append(item)
+        changes.added.append(key)
+
+    for key, items in inserted.items():
+        if key is None:
+            edits.append((entries[0].start, entries[0].start, ''.join(f'{item},\n{indent}' for item in items)))
+        else:
+            position = last[key].value_end
+            edits.append((position, position, ''.join(f',\n{indent}{item}' for item in items)))
+
+    if not edits:
+        return text, changes
+    # Insertions at an offset go before a removal starting there
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+    pieces = []
+    position = 0
+    for start, end, replacement in edits:
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = max(position, end)
+    pieces.append(text[position:])
+    return ''.join(pieces), changes
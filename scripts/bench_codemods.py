@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Dart codemod scripts.
+
+Generates realistic synthetic Flutter sources (widget classes, build methods,
+withOpacity calls, theme lookups, duplicate imports, const candidates) at a
+range of corpus sizes, then times every fixer end to end and every rule in
+memory. Results (wall time, MB/s, files/s, peak memory) are written to a
+JSON baseline that later runs can be compared against.
+
+    python3 scripts/bench_codemods.py --sizes 100,1000,5000 --save bench.json
+    python3 scripts/bench_codemods.py --sizes 100,1000,5000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+DEFAULT_SIZES = '100,1000'
+
+# Fixers run end to end as separate processes, from the corpus root
+FIXERS = {
+    'cleanup_unused': ['cleanup_unused.py', '--no-cache'],
+    'fix_with_opacity': ['fix_with_opacity.py', '--no-cache'],
+    # Only the corpus pass, which is what --jobs parallelizes; the snippet reads --jobs itself
+    'optimize_performance': ['-c', 'import argparse, optimize_performance as m; p = argparse.ArgumentParser(); '
+                                   'm.add_jobs_argument(p); m.optimize_source_patterns(p.parse_args().jobs)'],
+    'production_cleanup': ['-c', 'import production_cleanup as m; m.run_corpus_fixes()'],
+    'fix_critical_errors': ['-c', 'import fix_critical_errors as m; m.run_corpus_fixes()'],
+}
+
+# Fixers that accept --jobs
+PARALLEL_FIXERS = {'cleanup_unused', 'fix_with_opacity', 'optimize_performance'}
+
+FEATURES = [
+    'cycle', 'tracking', 'insights', 'biometric', 'community',
+    'healthcare', 'partner', 'settings', 'calendar', 'ai_predictions',
+]
+
+IMPORTS = [
+    "import 'package:flutter/material.dart';",
+    "import 'package:flutter/foundation.dart';",
+    "import 'package:provider/provider.dart';",
+    "import 'dart:async';",
+    "import '../../../core/theme/app_theme.dart';",
+    "import '../../../generated/app_localizations.dart';",
+]
+
+TYPED_VALUES = [
+    ('int', 'widget.items.length'),
+    ('int', '42'),
+    ('String', "'pending'"),
+    ('Size?', 'context.size'),
+]
+
+UNUSED_NAMES = ['avgLength', 'adjustment', 'index', 'localizations', 'report', 'isExpanded']
+
+HELPER_TEMPLATES = [
+    '''
+  Widget _build{name}(BuildContext context) {{
+    final {type} {unused} = {value};
+    return Container(
+      padding: const EdgeInsets.all({pad}),
+      decoration: BoxDecoration(
+        color: Theme.of(context).colorScheme.primary.withOpacity(0.{alpha}),
+        borderRadius: BorderRadius.circular({radius}),
+      ),
+      child: Column(
+        children: [
+          Text('{label}'),
+          SizedBox(height: {pad}),
+          Text(
+            '{label} details',
+            style: Theme.of(context).textTheme.bodyMedium?.copyWith(
+              color: Colors.black.withOpacity(0.{alpha}),
+            ),
+          ),
+        ],
+      ),
+    );
+  }}
+''',
+    '''
+  Widget _build{name}(BuildContext context) {{
+    // Section header for {label}
+    return Padding(
+      padding: const EdgeInsets.symmetric(horizontal: {pad}),
+      child: Row(
+        children: [
+          Icon(Icons.favorite, color: Theme.of(context).colorScheme.secondary),
+          SizedBox(width: {pad}),
+          Expanded(
+            child: Text(
+              "{label}",
+              style: TextStyle(color: Colors.grey.withOpacity(0.{alpha})),
+            ),
+          ),
+        ],
+      ),
+    );
+  }}
+''',
+    '''
+  Widget _build{name}(BuildContext context) {{
+    final theme = Theme.of(context);
+    return Card(
+      color: theme.colorScheme.surfaceVariant,
+      child: ListTile(
+        title: Text('{label}'),
+        subtitle: Text('Updated ${{DateTime.now().hour}}:00'),
+        trailing: Container(
+          width: {radius},
+          height: {radius},
+          color: theme.colorScheme.background.withOpacity(0.{alpha}),
+        ),
+      ),
+    );
+  }}
+''',
+]
+
+
+def _class_name(feature, number):
+    return ''.join(part.capitalize() for part in feature.split('_')) + f'Widget{number}'
+
+
+def generate_file(rng, feature, number):
+    """Return the text of one synthetic widget file."""
+    class_name = _class_name(feature, number)
+    imports = rng.sample(IMPORTS, rng.randint(2, len(IMPORTS)))
+    # Duplicate imports, as left behind by merges and codemods
+    imports += rng.sample(imports, rng.randint(0, 2))
+
+    helpers = []
+    for helper_number in range(rng.randint(3, 12)):
+        template = rng.choice(HELPER_TEMPLATES)
+        var_type, value = rng.choice(TYPED_VALUES)
+        helpers.append(template.format(
+            name=f'Section{helper_number}',
+            unused=rng.choice(UNUSED_NAMES),
+            type=var_type,
+            value=value,
+            pad=rng.choice([4, 8, 12, 16, 24]),
+            alpha=rng.randint(1, 9),
+            radius=rng.choice([8, 12, 16, 20, 32]),
+            label=f'{feature.title()} {number}.{helper_number}',
+        ))
+
+    calls = ',\n'.join(
+        f'            _buildSection{i}(context)' for i in range(len(helpers))
+    )
+    return '\n'.join(imports) + f'''
+
+/// Synthetic {feature} widget number {number}
+class {class_name} extends StatefulWidget {{
+  final List<String> items;
+
+  const {class_name}({{super.key, this.items = const []}});
+
+  @override
+  State<{class_name}> createState() => _{class_name}State();
+}}
+
+class _{class_name}State extends State<{class_name}> {{
+  bool _loading = false;
+
+  @override
+  Widget build(BuildContext context) {{
+    final colors = Theme.of(context).colorScheme;
+    return Scaffold(
+      backgroundColor: colors.surface,
+      body: _loading
+          ? const Center(child: CircularProgressIndicator())
+          : ListView(
+              children: [
+{calls},
+              ],
+            ),
+    );
+  }}
+{''.join(helpers)}}}
+'''
+
+
+def generate_corpus(root, file_count, seed=0):
+    """Write file_count synthetic Dart files under root/lib. Returns total bytes."""
+    rng = random.Random(seed)
+    total = 0
+    # Marks root as the project root for fixers that look one up
+    with open(os.path.join(root, 'pubspec.yaml'), 'w', encoding='utf-8') as f:
+        f.write('name: bench_corpus\n')
+    for number in range(file_count):
+        feature = FEATURES[number % len(FEATURES)]
+        directory = os.path.join(root, 'lib', 'features', feature, 'widgets', f'group_{number // 500}')
+        os.makedirs(directory, exist_ok=True)
+        text = generate_file(rng, feature, number)
+        with open(os.path.join(directory, f'widget_{number}.dart'), 'w', encoding='utf-8') as f:
+            f.write(text)
+        total += len(text.encode('utf-8'))
+    return total
+
+
+def _peak_rss_bytes(rusage):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return rusage.ru_maxrss * scale
+
+
+def run_fixer(name, corpus_root, jobs=1):
+    """Run one fixer on a fresh copy of the corpus. Returns (seconds, peak bytes)."""
+    workdir = tempfile.mkdtemp(prefix='bench_codemods_')
+    try:
+        shutil.copytree(os.path.join(corpus_root, 'lib'), os.path.join(workdir, 'lib'))
+        shutil.copy(os.path.join(corpus_root, 'pubspec.yaml'), workdir)
+        args = list(FIXERS[name])
+        if args[0] != '-c':
+            args[0] = os.path.join(SCRIPTS_DIR, args[0])
+        if name in PARALLEL_FIXERS and jobs != 1:
+            args += ['--jobs', str(jobs)]
+
+        env = dict(os.environ, PYTHONPATH=SCRIPTS_DIR, ZYRAFLOW_ROOT=workdir)
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable] + args, cwd=workdir, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        _, status, rusage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            print(f"❌ {name} exited with status {process.returncode}")
+        return elapsed, _peak_rss_bytes(rusage)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def _rules_to_time():
+    """(name, callable(content, path) -> content) for every rule."""
+    import cleanup_unused
+    import production_cleanup
+    from dart_corpus import _all_rules
+
+    rules = list(_all_rules())
+    for rule_set in (cleanup_unused.UNUSED_RULES, production_cleanup.DEPRECATED_RULES):
+        for rule in rule_set.rules:
+            rules.append((f'{rule_set.name}:{rule.name}', lambda content, path, rule=rule: rule.apply(content)[0]))
+    return rules
+
+
+def time_rules(corpus_root):
+    """Time every rule over the in-memory corpus, without any file I/O."""
+    from dart_corpus import DartCorpus
+
+    # Stay in the corpus while the rules run: some, such as the const
+    # rules, look up project-wide tables keyed on the working directory
+    cwd = os.getcwd()
+    os.chdir(corpus_root)
+    try:
+        corpus = DartCorpus.load()
+        total_bytes = sum(len(f.content.encode('utf-8')) for f in corpus.files)
+        results = {}
+        for name, rule in _rules_to_time():
+            modified = 0
+            start = time.perf_counter()
+            for dart_file in corpus.files:
+                if rule(dart_file.content, dart_file.path) != dart_file.content:
+                    modified += 1
+            elapsed = time.perf_counter() - start
+            results[name] = _throughput(elapsed, total_bytes, len(corpus.files), files_modified=modified)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def _throughput(elapsed, total_bytes, file_count, **extra):
+    result = {
+        'seconds': round(elapsed, 6),
+        'mb_per_s': round(total_bytes / 1e6 / elapsed, 3) if elapsed else None,
+        'files_per_s': round(file_count / elapsed, 1) if elapsed else None,
+    }
+    result.update(extra)
+    return result
+
+
+def run_benchmarks(sizes, jobs=1, fixers=None, seed=0):
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'jobs': jobs,
+        'sizes': {},
+    }
+    for size in sizes:
+        corpus_root = tempfile.mkdtemp(prefix=f'bench_corpus_{size}_')
+        try:
+            total_bytes = generate_corpus(corpus_root, size, seed)
+            print(f"📦 {size} files, {total_bytes / 1e6:.1f} MB")
+            entry = {'files': size, 'bytes': total_bytes, 'fixers': {}, 'rules': {}}
+
+            for name in fixers or FIXERS:
+                elapsed, peak = run_fixer(name, corpus_root, jobs)
+                entry['fixers'][name] = _throughput(elapsed, total_bytes, size, peak_rss_bytes=peak)
+                print(f"   {name:<24} {elapsed:8.3f} s  {total_bytes / 1e6 / elapsed:7.2f} MB/s  "
+                      f"{size / elapsed:8.0f} files/s  {peak / 1e6:7.1f} MB peak")
+
+            entry['rules'] = time_rules(corpus_root)
+            slowest = sorted(entry['rules'].items(), key=lambda item: -item[1]['seconds'])[:5]
+            for name, rule_result in slowest:
+                print(f"   rule {name[:40]:<40} {rule_result['seconds']:8.3f} s  "
+                      f"{rule_result['files_modified']} files modified")
+            results['sizes'][str(size)] = entry
+        finally:
+            shutil.rmtree(corpus_root)
+    return results
+
+
+def compare(baseline, current):
+    """Print per-fixer and per-rule time ratios against a saved baseline."""
+    print("\n📊 Compared with baseline (ratio > 1.00 means slower now)")
+    for size, entry in current['sizes'].items():
+        old = baseline.get('sizes', {}).get(size)
+        if old is None:
+            print(f"   {size} files: not in baseline")
+            continue
+        print(f"   {size} files:")
+        for kind in ('fixers', 'rules'):
+            for name, result in entry[kind].items():
+                before = old.get(kind, {}).get(name)
+                if not before or not before['seconds']:
+                    continue
+                ratio = result['seconds'] / before['seconds']
+                # Flag clear regressions, not timer noise on tiny rules
+                slower = ratio > 1.2 and result['seconds'] - before['seconds'] > 0.005
+                marker = '⚠️ ' if slower else '   '
+                print(f"   {marker}{kind[:-1]} {name[:40]:<40} {before['seconds']:8.3f} s -> "
+                      f"{result['seconds']:8.3f} s  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Dart codemod scripts on synthetic corpora')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'comma-separated corpus sizes in files, 100 to 20000 (default {DEFAULT_SIZES})')
+    parser.add_argument('--fixers', help='comma-separated subset of: ' + ', '.join(FIXERS))
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='worker processes for fixers that support --jobs')
+    parser.add_argument('--seed', type=int, default=0, help='corpus generator seed')
+    parser.add_argument('--save', metavar='FILE', help='write results to a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare results with a JSON baseline')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    fixers = args.fixers.split(',') if args.fixers else None
+    for name in fixers or []:
+        if name not in FIXERS:
+            parser.error(f'unknown fixer: {name}')
+
+    print("⏱️ Benchmarking codemod scripts...")
+    results = run_benchmarks(sizes, args.jobs, fixers, args.seed)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,66 @@
 #!/usr/bin/env python3
 
-import os
-import re
-import glob
+import argparse
+
+from reference_graph import ReferenceGraph, remove_unused_imports
+from codemod_cache import CleanFileCache, add_cache_argument, rules_version, run_cached
+from dart_corpus import add_jobs_argument, dart_files, map_files
+from project_config import add_root_argument, enter_project_root
+from rule_registry import Rule, RuleSet, add_report_argument, enable_report
+from rule_profile import add_profile_argument, enable_profile, report_profile
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+# Variables that are assigned but never used again: final variable = value;
+UNUSED_VARIABLE_NAMES = [
+    'avgLength', 'adjustment', 'index', 'localizations',
+    'action', 'credentials', 'report', 'isExpanded',
+]
+
+# Unused imports (common ones we can safely detect), keyed by anchor literal
+UNUSED_IMPORT_PATTERNS = [
+    ("import 'package:flutter/foundation.dart';", r"import 'package:flutter/foundation\.dart';\n"),
+    ("import 'dart:async';", r"import 'dart:async';\n(?=.*\n.*class)"),  # Only if not using async
+]
+
+def _unused_variable_rule(name):
+    return Rule(f"unused_variable:{name}", rf'(\s+)final\s+\w+\s+({name})\s*=', r'\1final _\2 =',
+                anchors=[name], message=f"Fixed unused variable: {name}")
+
+def _unused_import_rule(anchor, pattern):
+    uri = anchor.split("'")[1]
+    return Rule(f"unused_import:{uri}", pattern, '', anchors=[anchor], message=f"Removed unused import: {uri}")
+
+# Each rule's regex only runs on files containing its anchor literal
+UNUSED_RULES = RuleSet('cleanup_unused', [
+    *(_unused_variable_rule(name) for name in UNUSED_VARIABLE_NAMES),
+    *(_unused_import_rule(anchor, pattern) for anchor, pattern in UNUSED_IMPORT_PATTERNS),
+])
+
+def clean_unused_content(content, file_path=None):
+    """Fix common unused variable and import issues in source text
+
+    Returns (new_content, changes).
+    """
+    changes = []
+    
+    # Apply the unused variable and import rules that can fire on this file
+    content, fired = UNUSED_RULES.apply(content, file_path)
+    for rule_name in fired:
+        changes.append(UNUSED_RULES.message(rule_name))
+    
+    # Remove duplicate imports; a set keeps each check constant-time
+    seen_imports = set()
+    cleaned_lines = []
+    
+    for line in content.split('\n'):
+        if line.strip().startswith('import '):
+            if line in seen_imports:
+                changes.append(f"Removed duplicate import: {line.strip()}")
+                continue
+            seen_imports.add(line)
+        cleaned_lines.append(line)
+    
+    return '\n'.join(cleaned_lines), changes
 
 def fix_unused_issues(file_path):
     """Fix common unused variable and import issues"""
@@ -11,68 +69,11 @@ def fix_unused_issues(file_path):
             content = f.read()
         
         original_content = content
-        changes = []
-        
-        # Fix unused variables by prefixing with underscore
-        unused_var_patterns = [
-            # Local variables that are assigned but never used
-            (r'(\s+)(final\s+\w+\s+)(\w+)(\s*=.*?;)', r'\1\2_\3\4'),
-            # Parameters that are unused (but keep named parameters)
-            (r'(\w+\s+)(\w+)(\s*\{[^}]*\})', r'\1_\2\3'),
-        ]
-        
-        # Remove unused imports (common ones we can safely detect)
-        unused_imports = [
-            r"import 'package:flutter/foundation\.dart';\n",
-            r"import 'dart:async';\n(?=.*\n.*class)",  # Only if not using async
-        ]
-        
-        # Fix obvious unused variables
-        patterns_to_fix = [
-            # final variable = value; (never used again)
-            (r'(\s+)final\s+\w+\s+(avgLength)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(adjustment)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(index)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(localizations)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(action)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(credentials)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(report)\s*=', r'\1final _\2 ='),
-            (r'(\s+)final\s+\w+\s+(isExpanded)\s*=', r'\1final _\2 ='),
-        ]
-        
-        # Apply fixes
-        for pattern, replacement in patterns_to_fix:
-            if re.search(pattern, content):
-                content = re.sub(pattern, replacement, content)
-                changes.append(f"Fixed unused variable: {pattern}")
-        
-        # Remove unused import statements
-        for import_pattern in unused_imports:
-            if re.search(import_pattern, content):
-                content = re.sub(import_pattern, '', content)
-                changes.append(f"Removed unused import: {import_pattern}")
-        
-        # Remove duplicate imports
-        import_lines = []
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            if line.strip().startswith('import '):
-                if line not in import_lines:
-                    import_lines.append(line)
-                    cleaned_lines.append(line)
-                else:
-                    changes.append(f"Removed duplicate import: {line.strip()}")
-            else:
-                cleaned_lines.append(line)
-        
-        content = '\n'.join(cleaned_lines)
+        content, changes = clean_unused_content(content, file_path)
         
         # Only write if there were changes
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_source(file_path, content, original_content)
             
             print(f"✅ Cleaned {len(changes)} issues in {file_path}")
             for change in changes[:3]:  # Show first 3 changes
@@ -85,26 +86,71 @@ def fix_unused_issues(file_path):
     
     except Exception as e:
         print(f"❌ Error processing {file_path}: {e}")
-        return 0
+        # None, not 0: a file that could not be processed is not clean
+        return None
 
 def main():
     """Clean up unused variables and imports in Dart files"""
+    parser = argparse.ArgumentParser(description='Clean up unused variables and imports in Dart files')
+    add_jobs_argument(parser)
+    add_cache_argument(parser)
+    add_report_argument(parser)
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    parser.add_argument('--import-graph', action='store_true',
+                        help='also remove project imports the whole-tree reference graph finds unused (slower)')
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.report_rules:
+        enable_report()
+    if args.profile:
+        enable_profile(args.profile)
+    enter_project_root(args.root)
+    
     print("🧹 Cleaning up unused variables and imports...")
     
-    # Find all Dart files in lib directory
-    dart_files = glob.glob('lib/**/*.dart', recursive=True)
+    # Imports nothing uses, judged against the whole tree's declarations.
+    # Opt-in: the graph reads and indexes every file, cached or not.
+    removed_imports = 0
+    if args.import_graph:
+        graph = ReferenceGraph.build()
+        removed_imports = remove_unused_imports(graph)
+        unreachable, leftovers = graph.dead_files()
+        if unreachable or leftovers:
+            print(f"🪦 {len(unreachable)} files main.dart never reaches and {len(leftovers)} backup leftovers; "
+                  "see scripts/reference_graph.py")
+    
+    # Find all Dart files in lib directory, in a stable order
+    dart_file_paths = dart_files()
     
     total_fixes = 0
     files_processed = 0
     
-    for file_path in dart_files:
-        fixes = fix_unused_issues(file_path)
-        if fixes > 0:
+    # Skip files already known to be clean for the current rules
+    cache = CleanFileCache('cleanup_unused', rules_version(fix_unused_issues, clean_unused_content, UNUSED_RULES)) if args.use_cache else None
+    results = run_cached(
+        cache,
+        lambda paths: map_files(fix_unused_issues, paths, args.jobs),
+        dart_file_paths,
+    )
+    
+    for fixes in results:
+        if fixes:
             total_fixes += fixes
             files_processed += 1
     
+    if cache is not None and cache.hits:
+        print(f"\n⚡ Skipped {cache.hits} files cached as clean")
+    
+    print()
+    print_summary()
+    report_profile()
     print(f"\n🎉 Cleanup complete!")
     print(f"📊 Fixed {total_fixes} unused issues across {files_processed} files")
+    if removed_imports:
+        print(f"✂️  Removed {removed_imports} unused project imports")
     print(f"🚀 Code quality improved!")
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Persistent record of Dart files already known to be clean for a codemod.
+
+Entries are keyed by file content hash plus a rule-set version, so a file
+is only skipped while both its content and the rules that checked it are
+unchanged. A (size, mtime) match short-circuits even the hash, which keeps
+repeat runs from a pre-commit hook close to free.
+"""
+import hashlib
+import inspect
+import json
+import os
+
+CACHE_DIR = os.path.join('.dart_tool', 'zyraflow_codemods')
+
+
+def rules_version(*objects):
+    """Derive a rule-set version from the source of the given functions/values."""
+    digest = hashlib.sha1()
+    for obj in objects:
+        try:
+            text = inspect.getsource(obj)
+        except (OSError, TypeError):
+            text = repr(obj)
+        digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class CleanFileCache:
+    """Tracks which files a named codemod has already found nothing to fix in."""
+
+    def __init__(self, name, version, cache_dir=CACHE_DIR):
+        self.path = os.path.join(cache_dir, f'{name}.json')
+        self.version = version
+        self.files = {}
+        self.clean_hashes = set()
+        self.hits = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.version:
+            # Rules changed since the cache was written; start over
+            self._dirty = True
+            return
+        self.files = data.get('files', {})
+        self.clean_hashes = set(data.get('clean_hashes', []))
+
+    def is_clean(self, file_path):
+        """Return True when file_path is known clean for the current rules."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+
+        entry = self.files.get(file_path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            self.hits += 1
+            return True
+
+        if not self.clean_hashes:
+            return False
+        try:
+            with open(file_path, 'rb') as f:
+                digest = content_hash(f.read())
+        except OSError:
+            return False
+        if digest in self.clean_hashes:
+            # Same content under a new mtime (touched, checked out, copied)
+            self.files[file_path] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._dirty = True
+            self.hits += 1
+            return True
+        return False
+
+    def mark_clean(self, file_path):
+        """Record that the current content of file_path needs no fixes."""
+        try:
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                digest = content_hash(f.read())
+        except OSError:
+            return
+        self.files[file_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        self.clean_hashes.add(digest)
+        self._dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+        live_hashes = {entry[2] for entry in self.files.values()}
+        data = {
+            'version': self.version,
+            'files': self.files,
+            'clean_hashes': sorted(self.clean_hashes & live_hashes),
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def add_cache_argument(parser):
+    parser.add_argument(
+        '--no-cache', dest='use_cache', action='store_false',
+        help=f'scan every file instead of skipping ones cached as clean in {CACHE_DIR}/',
+    )
+
+
+def run_cached(cache, map_func, file_paths):
+    """Run map_func over the files the cache does not already know are clean.
+
+    map_func takes a list of paths and returns one fix count per path, or
+    None for a file it failed to process. Only files with exactly zero fixes
+    are recorded as clean. Returns counts for every input path, with 0 for
+    skipped files.
+    """
+    if cache is None:
+        return map_func(file_paths)
+
+    pending = [path for path in file_paths if not cache.is_clean(path)]
+    results = dict(zip(pending, map_func(pending)))
+    for path, fixes in results.items():
+        if fixes is not None and fixes == 0:
+            cache.mark_clean(path)
+    cache.save()
+    return [results.get(path, 0) for path in file_paths]
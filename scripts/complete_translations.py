@@ -3,11 +3,13 @@
 Translation completion script for FlowSense ARB files.
 Completes missing translations for all supported languages.
 """
-import json
 import os
 import sys
 import re
-from pathlib import Path
+
+from arb_store import ArbStore
+from project_config import project_root
+from untranslated_messages import print_progress, update as update_untranslated
 
 # Translation mappings for key languages
 TRANSLATIONS = {
@@ -358,85 +360,53 @@ TRANSLATIONS = {
     }
 }
 
-def load_arb_file(file_path):
-    """Load ARB file and return JSON data."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        return None
-
-def save_arb_file(file_path, data):
-    """Save data to ARB file with proper formatting."""
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
-        print(f"Successfully updated {file_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving {file_path}: {e}")
-        return False
-
 def complete_translations():
     """Complete missing translations for key languages."""
-    l10n_dir = Path(__file__).parent.parent / 'lib' / 'l10n'
-    english_file = l10n_dir / 'app_en.arb'
+    root = project_root()
+    store = ArbStore.load(root)
+    english = store.template
+    english_keys = store.messages(english)
     
-    if not english_file.exists():
-        print(f"English template file not found: {english_file}")
-        return False
-    
-    # Load English template
-    english_data = load_arb_file(english_file)
-    if not english_data:
-        return False
-    
-    print(f"English template loaded with {len(english_data)} keys")
+    print(f"English template loaded with {len(store.locales[english].order)} keys")
     
     # Complete translations for key languages
     completed_languages = []
     
     for lang_code, translations in TRANSLATIONS.items():
-        lang_file = l10n_dir / f'app_{lang_code}.arb'
-        
-        if not lang_file.exists():
-            print(f"Language file not found: {lang_file}")
-            continue
-        
-        # Load existing translations
-        lang_data = load_arb_file(lang_file)
-        if not lang_data:
+        if lang_code not in store.locales:
+            print(f"Language file not found: {os.path.join(store.arb_dir, store.prefix + lang_code + '.arb')}")
             continue
         
         print(f"Processing {lang_code}...")
         
         # Count existing keys (excluding metadata)
-        existing_keys = {k for k in lang_data.keys() if not k.startswith('@') and not k.startswith('@@')}
-        english_keys = {k for k in english_data.keys() if not k.startswith('@') and not k.startswith('@@')}
-        
-        print(f"  Existing keys: {len(existing_keys)}")
+        print(f"  Existing keys: {len(store.messages(lang_code))}")
         print(f"  Total needed: {len(english_keys)}")
-        print(f"  Missing: {len(english_keys - existing_keys)}")
+        print(f"  Missing: {len(store.missing(lang_code))}")
         
         # Add missing translations
         added_count = 0
         for key, value in translations.items():
-            if key in english_data and key not in lang_data:
-                lang_data[key] = value
+            if store.has(english, key) and not store.has(lang_code, key):
+                store.set(lang_code, key, value)
                 # Also add description if it exists in English
                 desc_key = f"@{key}"
-                if desc_key in english_data:
-                    lang_data[desc_key] = english_data[desc_key]
+                if store.has(english, desc_key):
+                    store.set(lang_code, desc_key, store.get(english, desc_key))
                 added_count += 1
         
         print(f"  Added {added_count} new translations")
-        
-        # Save updated file
-        if save_arb_file(lang_file, lang_data):
-            completed_languages.append(lang_code)
+        completed_languages.append(lang_code)
+    
+    # Only the locales that gained translations are written
+    store.flush()
     
     print(f"\nCompleted translations for: {', '.join(completed_languages)}")
+    
+    # Refresh untranslated_messages.json for the locales just written
+    result = update_untranslated(root)
+    if result:
+        print_progress(*result)
     return True
 
 if __name__ == '__main__':
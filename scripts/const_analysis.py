@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Cross-file const analysis for `add_const_constructors`.
+
+A symbol table built from every file under lib/ records which constructors
+are const (declared `const` in lib/, already used as `const X(...)`, or
+known Flutter/Dart const constructors), which `Class.member` names are
+compile-time constants (enum values, `static const` fields, well-known
+framework constants) and each file's top-level consts. insert_const() then
+prefixes `const` to a constructor call only when every argument is a
+compile-time constant and the call is not already in a const context, so
+it never produces a `const` that has to be stripped again.
+"""
+import os
+from collections import namedtuple
+
+from dart_corpus import DEFAULT_PATTERNS, dart_files
+from dart_lexer import COMMENT, IDENT, NUMBER, PUNCT, STRING, replace_spans, tokenize
+
+# Flutter and dart:ui constructors that are const, as Class or Class.named
+FRAMEWORK_CONST_CONSTRUCTORS = {
+    'Align', 'AlwaysScrollableScrollPhysics', 'AspectRatio', 'Border', 'BorderRadius.all',
+    'BorderRadius.only', 'BorderRadius.vertical', 'BorderRadius.horizontal', 'BorderSide',
+    'BouncingScrollPhysics', 'BoxConstraints', 'BoxDecoration', 'BoxShadow', 'Center',
+    'CircularProgressIndicator', 'ClampingScrollPhysics', 'Color', 'Column', 'Divider',
+    'Duration', 'EdgeInsets.all', 'EdgeInsets.fromLTRB', 'EdgeInsets.only',
+    'EdgeInsets.symmetric', 'Expanded', 'Flexible', 'Icon', 'LinearGradient',
+    'LinearProgressIndicator', 'NeverScrollableScrollPhysics', 'Offset', 'Padding',
+    'Positioned', 'Radius.circular', 'RadialGradient', 'Row', 'Size', 'SizedBox',
+    'SizedBox.expand', 'SizedBox.shrink', 'SizedBox.square', 'Spacer', 'Text', 'Text.rich',
+    'TextSpan', 'TextStyle', 'ValueKey', 'VerticalDivider', 'Wrap',
+}
+
+# Classes whose `Class.member` (not followed by `.`, `[` or `(`) is a constant
+FRAMEWORK_CONST_NAMESPACES = {
+    'Alignment', 'Axis', 'BorderRadius', 'BorderStyle', 'BoxFit', 'BoxShape', 'Clip',
+    'Colors', 'CrossAxisAlignment', 'Curves', 'Duration', 'EdgeInsets', 'FontStyle',
+    'FontWeight', 'Icons', 'MainAxisAlignment', 'MainAxisSize', 'Offset', 'Radius',
+    'StackFit', 'TextAlign', 'TextDecoration', 'TextDirection', 'TextOverflow',
+    'WrapAlignment',
+}
+
+# Tokens after which an expression, and so a `const` keyword, may start
+_EXPRESSION_START = {'(', ',', ':', '=', '[', '?', 'return', 'yield'}
+
+# Punctuation allowed between constant operands
+_CONST_PUNCT = {',', '+', '-', '*', '/', '%', '(', ')', '[', ']'}
+
+_LITERALS = {'true', 'false', 'null'}
+
+ConstSymbols = namedtuple('ConstSymbols', 'constructors private_constructors members private_members top_level')
+
+
+def _source_tokens(source):
+    """Tokens without comments; strings are kept, they can be constant arguments."""
+    return [token for token in tokenize(source) if token.kind != COMMENT]
+
+
+def _brackets(tokens):
+    """Map each opening (, [ or { token index to its closing index, and back."""
+    pairs = {}
+    stack = []
+    closers = {')': '(', ']': '[', '}': '{'}
+    for index, token in enumerate(tokens):
+        if token.kind != PUNCT:
+            continue
+        if token.text in '([{':
+            stack.append(index)
+        elif token.text in closers and stack and tokens[stack[-1]].text == closers[token.text]:
+            opener = stack.pop()
+            pairs[opener] = index
+            pairs[index] = opener
+    return pairs
+
+
+def constructor_at(tokens, index):
+    """(key, open_paren_index) for `Name(` or `Name.named(` at index, else None."""
+    token = tokens[index]
+    if token.kind != IDENT or index + 1 >= len(tokens):
+        return None
+    following = tokens[index + 1].text
+    if following == '(':
+        return token.text, index + 1
+    if (following == '.' and index + 3 < len(tokens) and tokens[index + 2].kind == IDENT
+            and tokens[index + 3].text == '('):
+        return f'{token.text}.{tokens[index + 2].text}', index + 3
+    return None
+
+
+def _collect(path, tokens, symbols):
+    """Record the classes, const constructors and constants declared in one file."""
+    depth = 0
+    pending_class = None
+    current_class = None
+    class_depth = None
+
+    for index, token in enumerate(tokens):
+        text = token.text
+        if token.kind == PUNCT:
+            if text == '{':
+                depth += 1
+                if pending_class is not None:
+                    current_class, class_depth, pending_class = pending_class, depth, None
+            elif text == '}':
+                if depth == class_depth:
+                    current_class = class_depth = None
+                depth -= 1
+            elif text == ';':
+                pending_class = None
+            continue
+        if token.kind != IDENT:
+            continue
+
+        if text in ('class', 'mixin', 'enum') and index + 1 < len(tokens) and depth == 0:
+            pending_class = tokens[index + 1].text
+            symbols['declared'].setdefault(pending_class, set()).add(path)
+            if text == 'enum':
+                _add_member(symbols, path, pending_class, None)
+            continue
+
+        if text == 'const' and current_class is not None and depth == class_depth:
+            start = index + 1
+            if start < len(tokens) and tokens[start].text == 'factory':
+                start += 1
+            if start < len(tokens) and tokens[start].text == current_class:
+                found = constructor_at(tokens, start)
+                if found is not None:
+                    _add_constructor(symbols, path, found[0], 'const_declared')
+                    continue
+
+        static = index > 0 and tokens[index - 1].text == 'static'
+        if text == 'const' and (depth == 0 or (static and depth == class_depth)):
+            name = _declared_name(tokens, index + 1)
+            if name is not None:
+                if depth == 0:
+                    symbols['top_level'].setdefault(path, set()).add(name)
+                else:
+                    _add_member(symbols, path, current_class, name)
+                continue
+
+        # Existing `const X(...)` uses prove X has a const constructor
+        if text == 'const' and index + 1 < len(tokens):
+            found = constructor_at(tokens, index + 1)
+            if found is not None:
+                _add_constructor(symbols, path, found[0], 'observed')
+
+
+def _declared_name(tokens, index):
+    """Name declared by `Type name = ...` starting at index, or None."""
+    for position in range(index, min(index + 8, len(tokens) - 1)):
+        if tokens[position + 1].text == '=' and tokens[position].kind == IDENT:
+            return tokens[position].text
+        if tokens[position].text in (';', '(', '{'):
+            return None
+    return None
+
+
+def _add_constructor(symbols, path, key, kind):
+    symbols[kind].setdefault(key, set()).add(path)
+
+
+def _add_member(symbols, path, class_name, member):
+    # member None marks an enum: every Enum.value is constant
+    symbols['members'].setdefault((class_name, member), set()).add(path)
+
+
+def _resolve(found):
+    """Turn the raw per-file findings into a ConstSymbols table.
+
+    A private name only holds in the file that declares it. A public class
+    declared in several files (lib/ has a few, e.g. PersonalizedInsight)
+    only counts as having a const constructor or constant member when every
+    declaration does; `const X(...)` uses only vouch for classes declared
+    outside lib/.
+    """
+    declared = found['declared']
+    symbols = ConstSymbols(set(FRAMEWORK_CONST_CONSTRUCTORS), {}, set(), {}, found['top_level'])
+
+    def consistent(class_name, paths):
+        return class_name not in declared or declared[class_name] <= paths
+
+    for key, paths in found['const_declared'].items():
+        class_name = key.split('.')[0]
+        if class_name.startswith('_'):
+            for path in paths:
+                symbols.private_constructors.setdefault(path, set()).add(key)
+        elif consistent(class_name, paths):
+            symbols.constructors.add(key)
+    for key, paths in found['observed'].items():
+        class_name = key.split('.')[0]
+        if class_name not in declared and not class_name.startswith('_'):
+            symbols.constructors.add(key)
+    for key, paths in found['members'].items():
+        if key[0].startswith('_'):
+            for path in paths:
+                symbols.private_members.setdefault(path, set()).add(key)
+        elif consistent(key[0], paths):
+            symbols.members.add(key)
+    return symbols
+
+
+def build_symbols(patterns=DEFAULT_PATTERNS):
+    """Scan every file matching patterns into a ConstSymbols table."""
+    found = {kind: {} for kind in ('declared', 'const_declared', 'observed', 'members', 'top_level')}
+    for path in dart_files(patterns):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        _collect(path, _source_tokens(source), found)
+    return _resolve(found)
+
+
+_symbols_by_root = {}
+
+
+def const_symbols(patterns=DEFAULT_PATTERNS):
+    """The symbol table for the current directory, built once per process."""
+    key = (os.getcwd(), tuple(patterns))
+    if key not in _symbols_by_root:
+        _symbols_by_root[key] = build_symbols(patterns)
+    return _symbols_by_root[key]
+
+
+class ConstAnalysis:
+    """Const contexts and constant-argument checks for one source file."""
+
+    def __init__(self, source, path, symbols):
+        self.source = source
+        self.tokens = _source_tokens(source)
+        self.pairs = _brackets(self.tokens)
+        self.constructors = symbols.constructors | symbols.private_constructors.get(path, set())
+        self.class_names = {key.split('.')[0] for key in self.constructors}
+        self.members = symbols.members | symbols.private_members.get(path, set())
+        self.top_level = symbols.top_level.get(path, set())
+        self.const_end = {}
+        self.in_const = [False] * len(self.tokens)
+        self._mark_const_contexts()
+
+    def _region_end(self, index):
+        """Last token index governed by the `const` keyword at index."""
+        tokens = self.tokens
+        start = index + 1
+        if start >= len(tokens):
+            return index
+        found = constructor_at(tokens, start)
+        if found is not None:
+            return self.pairs.get(found[1], found[1])
+        if tokens[start].text == '<':
+            while start < len(tokens) and tokens[start].text not in ('[', '{', ';'):
+                start += 1
+        if start < len(tokens) and tokens[start].text in ('[', '{'):
+            return self.pairs.get(start, start)
+        # A const declaration: up to the `;` at this nesting level
+        position = start
+        while position < len(tokens) and tokens[position].text != ';':
+            position = self.pairs.get(position, position) + 1 if tokens[position].text in '([{' else position + 1
+        return position
+
+    def _mark_const_contexts(self):
+        for index, token in enumerate(self.tokens):
+            if token.kind == IDENT and token.text == 'const':
+                end = self._region_end(index)
+                self.const_end[index] = end
+                for inside in range(index + 1, end + 1):
+                    self.in_const[inside] = True
+
+    def is_constant_range(self, start, end):
+        """True when tokens[start:end] (call arguments or list elements) are all constant."""
+        tokens = self.tokens
+        index = start
+        while index < end:
+            token = tokens[index]
+            text = token.text
+            previous = tokens[index - 1].text if index > 0 else ''
+
+            if (token.kind == IDENT and index + 1 < end and tokens[index + 1].text == ':'
+                    and previous in ('(', ',')):
+                index += 2  # named-argument label
+            elif token.kind == IDENT and text == 'const':
+                index = self.const_end[index] + 1
+            elif token.kind == NUMBER or (token.kind == IDENT and text in _LITERALS):
+                index += 1
+            elif token.kind == STRING:
+                if '$' in text and text[0] not in 'rR':
+                    return False  # interpolation
+                index += 1
+            elif token.kind == IDENT:
+                next_index = self._constant_operand_end(index)
+                if next_index is None:
+                    return False
+                index = next_index
+            elif token.kind == PUNCT and text in _CONST_PUNCT:
+                index += 1
+            else:
+                return False
+        return True
+
+    def _constant_operand_end(self, index):
+        """Index after the constant operand starting at an identifier, or None."""
+        tokens = self.tokens
+        found = constructor_at(tokens, index)
+        if found is not None:
+            key, open_index = found
+            close_index = self.pairs.get(open_index)
+            if key in self.constructors and close_index is not None \
+                    and self.is_constant_range(open_index + 1, close_index):
+                return close_index + 1
+            return None
+
+        name = tokens[index].text
+        if (index + 2 < len(tokens) and tokens[index + 1].text == '.'
+                and tokens[index + 2].kind == IDENT):
+            after = tokens[index + 3].text if index + 3 < len(tokens) else ''
+            if after in ('.', '[', '(', '?', '!'):
+                return None
+            member = tokens[index + 2].text
+            if (name in FRAMEWORK_CONST_NAMESPACES or (name, None) in self.members
+                    or (name, member) in self.members):
+                return index + 3
+            return None
+
+        if name in self.top_level:
+            return index + 1
+        return None
+
+    def insertions(self):
+        """Token indices of constructor calls that can legally take `const`."""
+        tokens = self.tokens
+        result = []
+        index = 0
+        class_names = self.class_names
+        while index < len(tokens):
+            if tokens[index].text not in class_names or self.in_const[index]:
+                index += 1
+                continue
+            found = constructor_at(tokens, index)
+            if found is None or found[0] not in self.constructors or not self._starts_expression(index):
+                index += 1
+                continue
+            key, open_index = found
+            close_index = self.pairs.get(open_index)
+            if close_index is not None and self.is_constant_range(open_index + 1, close_index):
+                result.append(index)
+                index = close_index + 1
+            else:
+                index += 1
+        return result
+
+    def _starts_expression(self, index):
+        if index == 0:
+            return False
+        previous = self.tokens[index - 1].text
+        if previous == '>':
+            # `=>`; other `>` end type arguments or comparisons
+            return index > 1 and self.tokens[index - 2].text == '='
+        return previous in _EXPRESSION_START
+
+    def edits(self, insertions=None):
+        """Edits inserting `const` and dropping consts the new one makes redundant."""
+        edits = []
+        for index in self.insertions() if insertions is None else insertions:
+            token = self.tokens[index]
+            edits.append((token.start, token.start, 'const '))
+            close_index = self.pairs[constructor_at(self.tokens, index)[1]]
+            for inner in range(index + 1, close_index):
+                inner_token = self.tokens[inner]
+                if inner_token.kind == IDENT and inner_token.text == 'const':
+                    end = inner_token.end
+                    while end < len(self.source) and self.source[end].isspace():
+                        end += 1
+                    edits.append((inner_token.start, end, ''))
+        return edits
+
+    def is_legal_const_call(self, index):
+        """Whether `const` before the constructor call at index would be legal."""
+        found = constructor_at(self.tokens, index)
+        if found is None or found[0] not in self.constructors:
+            return False
+        if self.in_const[index] or (index > 0 and self.tokens[index - 1].text == 'const'):
+            return False
+        close_index = self.pairs.get(found[1])
+        return close_index is not None and self.is_constant_range(found[1] + 1, close_index)
+
+
+def insert_const(source, path, symbols):
+    """Prefix `const` to every constructor call where it is legal. Returns (source, count)."""
+    analysis = ConstAnalysis(source, path, symbols)
+    insertions = analysis.insertions()
+    if not insertions:
+        return source, 0
+    return replace_spans(source, analysis.edits(insertions)), len(insertions)
+
+
+def compare_with_heuristic(rule_set, patterns=DEFAULT_PATTERNS):
+    """Count the heuristic RuleSet's const insertions against insert_const's.
+
+    Returns a dict of totals; nothing is written.
+    """
+    symbols = const_symbols(patterns)
+    totals = {'files': 0, 'heuristic': 0, 'heuristic_legal': 0, 'heuristic_illegal': 0, 'symbol_table': 0}
+    for path in dart_files(patterns):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        totals['files'] += 1
+        analysis = ConstAnalysis(source, path, symbols)
+        starts = {token.start: index for index, token in enumerate(analysis.tokens)}
+        for rule in rule_set.rules:
+            if rule.literal or not rule.replacement.startswith('const '):
+                continue
+            for match in rule.pattern.finditer(source):
+                totals['heuristic'] += 1
+                index = starts.get(match.start())
+                legal = index is not None and analysis.is_legal_const_call(index)
+                totals['heuristic_legal' if legal else 'heuristic_illegal'] += 1
+        totals['symbol_table'] += len(analysis.insertions())
+    return totals
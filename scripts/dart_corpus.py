@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Shared in-memory source corpus for the Dart codemod scripts.
+
+Loads every Dart file under lib/ once, runs all registered rules over each
+file's text in a single pass and writes each changed file at most once.
+"""
+import contextlib
+import functools
+import glob
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import rule_profile
+import source_writer
+
+DEFAULT_PATTERNS = ('lib/**/*.dart',)
+
+
+def resolve_jobs(jobs):
+    """Turn a --jobs value into a worker count; 0 means one per CPU core."""
+    if jobs is None or jobs < 0:
+        return 1
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def add_jobs_argument(parser):
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1, metavar='N',
+        help='number of worker processes (0 = one per CPU core, default 1)',
+    )
+
+
+def _call_captured(func, item):
+    """Run func(item) in a worker, returning its result, output, writes and rule timings."""
+    buffer = io.StringIO()
+    marker = source_writer.snapshot()
+    profile_marker = rule_profile.snapshot()
+    with contextlib.redirect_stdout(buffer):
+        result = func(item)
+    return result, buffer.getvalue(), source_writer.since(marker), rule_profile.since(profile_marker)
+
+
+def map_files(func, items, jobs=1):
+    """Apply a per-file function to every item, in input order.
+
+    With jobs > 1 the items are spread across a process pool. Anything the
+    function prints is replayed in input order, so the output matches a
+    serial run exactly, and the files it writes and the rules it profiles
+    are reported back to this process.
+    """
+    items = list(items)
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    # Imported lazily: the pool machinery is only needed for parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        worker = functools.partial(_call_captured, func)
+        for result, output, writes, timings in executor.map(worker, items, chunksize=chunksize):
+            if output:
+                sys.stdout.write(output)
+            source_writer.merge(*writes)
+            rule_profile.merge(timings)
+            results.append(result)
+    return results
+
+
+def dart_files(patterns=DEFAULT_PATTERNS):
+    """Return the files matching the glob patterns in a stable order."""
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern, recursive=True))
+    return sorted(paths)
+
+
+def glob_regex(pattern):
+    """Compile a glob with `**` (any directories, including none) to a regex."""
+    parts = []
+    for piece in re.split(r'(\*\*/|\*|\?)', pattern):
+        if piece == '**/':
+            parts.append('(?:.*/)?')
+        elif piece == '*':
+            parts.append('[^/]*')
+        elif piece == '?':
+            parts.append('[^/]')
+        else:
+            parts.append(re.escape(piece))
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def _apply_rules(rules, item):
+    """Run every rule over one file's text; used by serial and pooled runs."""
+    path, content = item
+    changed_by = []
+    for name, rule in rules:
+        try:
+            new_content, _ = rule_profile.profile_rule(name, path, lambda text: (rule(text, path), None), content)
+        except Exception as e:
+            print(f"❌ Error applying {name} to {path}: {e}")
+            continue
+        if new_content != content:
+            content = new_content
+            changed_by.append(name)
+    return content, changed_by
+
+
+class DartFile:
+    """A single Dart source file held in memory."""
+
+    __slots__ = ('path', 'original', 'content')
+
+    def __init__(self, path, content):
+        self.path = path
+        self.original = content
+        self.content = content
+
+    @property
+    def changed(self):
+        return self.content != self.original
+
+
+class DartCorpus:
+    """The set of Dart files a codemod run operates on."""
+
+    def __init__(self, files):
+        self.files = files
+
+    @classmethod
+    def load(cls, patterns=DEFAULT_PATTERNS):
+        """Read every file matching the glob patterns exactly once."""
+        files = []
+        for path in dart_files(patterns):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    files.append(DartFile(path, f.read()))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"❌ Error reading {path}: {e}")
+        return cls(files)
+
+    def apply(self, rules, jobs=1):
+        """Run (name, rule) pairs over every file in one pass.
+
+        A rule takes (content, path) and returns the new content; rules must
+        be module-level functions so they can be sent to worker processes.
+        Returns a dict mapping each rule name to the number of files it
+        changed.
+        """
+        counts = {name: 0 for name, _ in rules}
+        items = [(f.path, f.content) for f in self.files]
+        results = map_files(functools.partial(_apply_rules, rules), items, jobs)
+        for dart_file, (content, changed_by) in zip(self.files, results):
+            dart_file.content = content
+            for name in changed_by:
+                counts[name] += 1
+        return counts
+
+    def changed_files(self):
+        return [f for f in self.files if f.changed]
+
+    def write(self):
+        """Write every changed file back to disk once. Returns the file count."""
+        written = 0
+        for dart_file in self.changed_files():
+            if source_writer.write_source(dart_file.path, dart_file.content, dart_file.original):
+                written += 1
+            dart_file.original = dart_file.content
+        return written
+
+
+def run_rules(rules, patterns=DEFAULT_PATTERNS, jobs=1):
+    """Load the corpus, apply all rules in one pass and write the result."""
+    corpus = DartCorpus.load(patterns)
+    counts = corpus.apply(rules, jobs)
+    corpus.write()
+    return counts
+
+
+def _all_rules():
+    """Collect every corpus rule exposed by the codemod scripts."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import fix_critical_errors
+    import optimize_performance
+    import production_cleanup
+
+    return (
+        production_cleanup.CORPUS_RULES
+        + fix_critical_errors.CORPUS_RULES
+        + optimize_performance.CORPUS_RULES
+    )
+
+
+def compare_passes(source_dir='lib', repeat=3):
+    """Time one-corpus-per-rule (the old layout) against a single shared pass.
+
+    Both variants run on throwaway copies of source_dir so the real tree is
+    never modified.
+    """
+    rules = _all_rules()
+    results = {}
+
+    for label in ('per-rule passes', 'single pass'):
+        best = None
+        for _ in range(repeat):
+            workdir = tempfile.mkdtemp(prefix='dart_corpus_')
+            shutil.copytree(source_dir, os.path.join(workdir, 'lib'))
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                start = time.perf_counter()
+                if label == 'single pass':
+                    run_rules(rules)
+                else:
+                    for rule in rules:
+                        run_rules([rule])
+                elapsed = time.perf_counter() - start
+            finally:
+                os.chdir(cwd)
+                shutil.rmtree(workdir)
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = best
+
+    before = results['per-rule passes']
+    after = results['single pass']
+    print(f"📊 {len(rules)} rules over {source_dir}/ (best of {repeat})")
+    print(f"   Per-rule passes: {before * 1000:.1f} ms")
+    print(f"   Single pass:     {after * 1000:.1f} ms")
+    if after > 0:
+        print(f"   Speed-up:        {before / after:.2f}x")
+    return results
+
+
+if __name__ == '__main__':
+    compare_passes(sys.argv[1] if len(sys.argv) > 1 else 'lib')
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Brace-matched class and method index for a Dart source file.
+
+One linear pass over the code tokens records every class and every method
+or function with a block body (`build`, `_build*` helpers and the rest),
+with character offsets for the declaration, the opening `{` and the end of
+the body. Fixers use it to edit exactly one method body without searching
+the file again. Edits are collected against the original offsets and
+applied together, so no edit shifts another.
+"""
+from collections import namedtuple
+
+from dart_lexer import IDENT, PUNCT, code_tokens, replace_spans
+
+# start: first character of the declaration (annotations included)
+# type_start: offset of the return type, or of the name when there is none
+# body_start: offset of the opening `{`; body_end: offset just past `}`
+Span = namedtuple(
+    'Span',
+    'kind name start type_start name_start return_type params body_start body_end body_tokens class_name',
+)
+
+_BODY_MODIFIERS = {'async', 'sync', '*'}
+
+
+class SourceIndex:
+    """Classes and block-bodied methods of one Dart source."""
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = code_tokens(source)
+        self.classes = []
+        self.methods = []
+        self._build()
+
+    def _build(self):
+        tokens = self.tokens
+        source = self.source
+        # Each frame: [kind, name, start, type_start, name_start, return_type,
+        #              params, open_token_index, class_name]
+        stack = []
+        member_start = 0
+        pending_class = None
+        # Signature being read at member level: [name_index, paren_depth, close_index]
+        signature = None
+
+        for index, token in enumerate(tokens):
+            text = token.text
+
+            # Reading a parameter list: braces here are named parameters
+            if signature is not None and signature[2] is None:
+                if text == '(':
+                    signature[1] += 1
+                elif text == ')':
+                    signature[1] -= 1
+                    if signature[1] == 0:
+                        signature[2] = index
+                continue
+
+            if token.kind == PUNCT and text == '{':
+                frame = None
+                if pending_class is not None:
+                    name_index = pending_class
+                    name_start = tokens[name_index].start
+                    frame = ['class', tokens[name_index].text, member_start,
+                             name_start, name_start, None, None, index, None]
+                    pending_class = None
+                elif signature is not None and signature[2] is not None:
+                    name_index, _, close_index = signature
+                    name_start = tokens[name_index].start
+                    type_token = tokens[name_index - 1] if name_index > 0 else None
+                    if type_token is not None and type_token.kind == IDENT and type_token.start >= member_start:
+                        return_type, type_start = type_token.text, type_token.start
+                    else:
+                        return_type, type_start = None, name_start
+                    params = source[tokens[name_index + 1].end:tokens[close_index].start]
+                    class_name = next((f[1] for f in reversed(stack) if f[0] == 'class'), None)
+                    frame = ['method', tokens[name_index].text, member_start, type_start,
+                             name_start, return_type, params, index, class_name]
+                signature = None
+                stack.append(frame if frame is not None else ['block', None, None, None, None, None, None, index, None])
+                if frame is None or frame[0] == 'class':
+                    member_start = token.end
+                continue
+
+            if token.kind == PUNCT and text == '}':
+                if stack:
+                    frame = stack.pop()
+                    if frame[0] in ('class', 'method'):
+                        open_index = frame[7]
+                        span = Span(*frame[:7], tokens[open_index].start, token.end,
+                                    (open_index, index), frame[8])
+                        (self.classes if frame[0] == 'class' else self.methods).append(span)
+                signature = None
+                if not stack or stack[-1][0] == 'class':
+                    member_start = token.end
+                continue
+
+            if stack and stack[-1][0] != 'class':
+                continue
+
+            if token.kind == PUNCT and text == ';':
+                signature = None
+                pending_class = None
+                member_start = token.end
+                continue
+
+            if token.kind == IDENT and text in ('class', 'mixin', 'extension') and index + 1 < len(tokens):
+                pending_class = index + 1
+                continue
+
+            if signature is None:
+                if (token.kind == IDENT and index + 1 < len(tokens)
+                        and tokens[index + 1].text == '(' and pending_class is None):
+                    signature = [index, 0, None]
+                continue
+
+            # Between the parameter list and the body only modifiers may appear
+            if text not in _BODY_MODIFIERS:
+                # `=> expr;`, initializer lists and the like have no block body here
+                signature = None
+                if token.kind == IDENT and index + 1 < len(tokens) and tokens[index + 1].text == '(':
+                    signature = [index, 0, None]
+
+    def method(self, name, class_name=None):
+        """Return the first method called name (optionally within class_name)."""
+        for span in self.methods:
+            if span.name == name and (class_name is None or span.class_name == class_name):
+                return span
+        return None
+
+    def build_methods(self):
+        """`@override Widget build(BuildContext context)` methods."""
+        return [
+            span for span in self.methods
+            if span.name == 'build' and span.return_type == 'Widget'
+            and span.params.strip() == 'BuildContext context'
+            and '@override' in self.header(span)
+        ]
+
+    def helper_methods(self, prefix='_build'):
+        """Widget-returning helpers such as `_buildHeader` or `_buildAppBar`."""
+        return [
+            span for span in self.methods
+            if span.name.startswith(prefix) and (span.return_type or '').endswith('Widget')
+        ]
+
+    def body_tokens(self, span):
+        """Code tokens strictly inside the method or class body."""
+        first, last = span.body_tokens
+        return self.tokens[first + 1:last]
+
+    def header(self, span):
+        """Declaration text up to, not including, the opening brace."""
+        return self.source[span.start:span.body_start]
+
+
+def body_start_edits(spans, text):
+    """Edits inserting text right after the opening brace of each body."""
+    return [(span.body_start + 1, span.body_start + 1, text) for span in spans]
+
+
+def insert_at_body_start(source, spans, text):
+    """Insert text right after the opening brace of each span's body."""
+    return replace_spans(source, body_start_edits(spans, text))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Small streaming Dart tokenizer for the fixer scripts.
+
+Splits Dart source into identifier, number, string, comment and punctuation
+tokens in one linear pass. String literals (raw, triple-quoted and with
+${...} interpolation) and nested block comments are single tokens, so
+fixers can match code tokens only and never rewrite text inside strings or
+comments.
+"""
+import re
+from collections import namedtuple
+
+IDENT = 'ident'
+NUMBER = 'number'
+STRING = 'string'
+COMMENT = 'comment'
+PUNCT = 'punct'
+
+Token = namedtuple('Token', 'kind start end text')
+
+# Leading whitespace is skipped by the same match; strings and block
+# comments are only recognised here and then scanned by hand.
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>[rR]?['"])
+  | (?P<number>0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<punct>\S)
+)""", re.VERBOSE)
+
+_KINDS = {
+    'line_comment': COMMENT,
+    'number': NUMBER,
+    'ident': IDENT,
+    'punct': PUNCT,
+}
+
+
+def _scan_block_comment(source, pos):
+    """Return the end of the (possibly nested) block comment starting at pos."""
+    depth = 0
+    length = len(source)
+    while pos < length:
+        if source.startswith('/*', pos):
+            depth += 1
+            pos += 2
+        elif source.startswith('*/', pos):
+            depth -= 1
+            pos += 2
+            if depth == 0:
+                return pos
+        else:
+            pos += 1
+    return length
+
+
+def _scan_string(source, pos):
+    """Return the end of the string literal whose prefix or quote is at pos."""
+    raw = source[pos] in 'rR'
+    if raw:
+        pos += 1
+    quote = source[pos]
+    triple = source.startswith(quote * 3, pos)
+    delimiter = quote * 3 if triple else quote
+    pos += len(delimiter)
+    length = len(source)
+
+    while pos < length:
+        char = source[pos]
+        if source.startswith(delimiter, pos):
+            return pos + len(delimiter)
+        if char == '\n' and not triple:
+            # Unterminated single-line string: stop at the end of the line
+            return pos
+        if char == '\\' and not raw:
+            pos += 2
+        elif char == '$' and not raw and source.startswith('${', pos):
+            pos = _scan_interpolation(source, pos + 2)
+        else:
+            pos += 1
+    return length
+
+
+def _scan_interpolation(source, pos):
+    """Return the position just past the '}' closing a ${...} interpolation."""
+    depth = 1
+    for token in _tokens_from(source, pos):
+        if token.kind == PUNCT:
+            if token.text == '{':
+                depth += 1
+            elif token.text == '}':
+                depth -= 1
+                if depth == 0:
+                    return token.end
+    return len(source)
+
+
+def _tokens_from(source, pos):
+    length = len(source)
+    match_token = _TOKEN.match
+    while pos < length:
+        match = match_token(source, pos)
+        if match is None:
+            return  # only trailing whitespace left
+        kind = match.lastgroup
+        start = match.start(kind)
+        if kind == 'string':
+            end = _scan_string(source, start)
+            yield Token(STRING, start, end, source[start:end])
+        elif kind == 'block_comment':
+            end = _scan_block_comment(source, start)
+            yield Token(COMMENT, start, end, source[start:end])
+        else:
+            end = match.end()
+            yield Token(_KINDS[kind], start, end, source[start:end])
+        pos = end
+
+
+def tokenize(source):
+    """Yield every token of the Dart source, skipping whitespace."""
+    return _tokens_from(source, 0)
+
+
+def code_tokens(source):
+    """Return the tokens that are neither strings nor comments."""
+    return [token for token in tokenize(source) if token.kind not in (STRING, COMMENT)]
+
+
+def mask_non_code(source):
+    """Return source with string and comment contents blanked out.
+
+    The result has the same length and line breaks, so regex offsets found
+    in it are valid offsets into the original source.
+    """
+    parts = []
+    last = 0
+    for token in tokenize(source):
+        if token.kind in (STRING, COMMENT):
+            parts.append(source[last:token.start])
+            parts.append(re.sub(r'[^\n]', ' ', token.text))
+            last = token.end
+    parts.append(source[last:])
+    return ''.join(parts)
+
+
+def sub_code(pattern, replacement, source, flags=0):
+    """re.subn() that only replaces matches lying entirely in code.
+
+    Returns (new_source, count).
+    """
+    regex = re.compile(pattern, flags)
+    masked = mask_non_code(source)
+    parts = []
+    last = 0
+    count = 0
+    for match in regex.finditer(masked):
+        start, end = match.span()
+        if masked[start:end] != source[start:end]:
+            continue  # touches a string or comment
+        parts.append(source[last:start])
+        parts.append(match.expand(replacement) if isinstance(replacement, str) else replacement(match))
+        last = end
+        count += 1
+    parts.append(source[last:])
+    return ''.join(parts), count
+
+
+def match_sequence(tokens, index, texts):
+    """True when the tokens starting at index have exactly the given texts."""
+    if index + len(texts) > len(tokens):
+        return False
+    return all(tokens[index + offset].text == text for offset, text in enumerate(texts))
+
+
+def replace_spans(source, edits):
+    """Apply non-overlapping (start, end, text) edits to source."""
+    parts = []
+    last = 0
+    for start, end, text in sorted(edits):
+        parts.append(source[last:start])
+        parts.append(text)
+        last = end
+    parts.append(source[last:])
+    return ''.join(parts)
+
+
+def drop_const_where(source, predicate, require_semicolon=True):
+    """Remove `const ` keywords whose statement contains a matching token.
+
+    The statement runs from the `const` keyword to the next `;` code token.
+    predicate(tokens, index) is tested against every code token in that
+    range. Like the regexes this replaces, a removed `const` consumes the
+    rest of its statement, so later consts in it are left alone. Runs in
+    linear time: the next `;` and the number of matching tokens before any
+    index are precomputed. Returns (new_source, count).
+    """
+    tokens = code_tokens(source)
+    count = len(tokens)
+
+    next_semicolon = [count] * (count + 1)
+    for index in range(count - 1, -1, -1):
+        is_semicolon = tokens[index].kind == PUNCT and tokens[index].text == ';'
+        next_semicolon[index] = index if is_semicolon else next_semicolon[index + 1]
+
+    hits_before = [0] * (count + 1)
+    for index in range(count):
+        hits_before[index + 1] = hits_before[index] + (1 if predicate(tokens, index) else 0)
+
+    edits = []
+    index = 0
+    while index < count:
+        token = tokens[index]
+        if token.kind == IDENT and token.text == 'const':
+            stop = next_semicolon[index]
+            if stop == count and require_semicolon:
+                index += 1
+                continue
+            if hits_before[stop] - hits_before[index + 1] > 0:
+                end = token.end
+                while end < len(source) and source[end].isspace():
+                    end += 1
+                edits.append((token.start, end, ''))
+                index = stop + 1
+                continue
+        index += 1
+
+    return replace_spans(source, edits), len(edits)
+
+
+def ident_contains(fragment):
+    """Predicate: the token is an identifier containing fragment."""
+    def predicate(tokens, index):
+        token = tokens[index]
+        return token.kind == IDENT and fragment in token.text
+    return predicate
+
+
+def member_access(receiver):
+    """Predicate: an identifier ending in receiver, followed by `.`.
+
+    member_access('Colors') matches both `Colors.` and `AppColors.`.
+    """
+    def predicate(tokens, index):
+        token = tokens[index]
+        return (
+            token.kind == IDENT
+            and token.text.endswith(receiver)
+            and index + 1 < len(tokens)
+            and tokens[index + 1].text == '.'
+        )
+    return predicate
+
+
+THEME_OF_CONTEXT = ('Theme', '.', 'of', '(', 'context', ')')
+
+
+def theme_of_context(tokens, index):
+    """Predicate: `Theme.of(context)` starts at the token."""
+    return match_sequence(tokens, index, THEME_OF_CONTEXT)
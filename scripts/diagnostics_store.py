@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+SQLite store of analyzer runs, for querying and diffing diagnostics.
+
+Each ingested `flutter analyze` output (any format analyzer_diagnostics
+understands, from a file or stdin) becomes a run. Its diagnostics are
+indexed by run, file, rule id and severity. Ingestion streams the input in
+batches, so outputs of any size are never held in memory at once.
+
+    flutter analyze --machine 2>&1 | python3 scripts/diagnostics_store.py ingest -
+    python3 scripts/diagnostics_store.py new
+    python3 scripts/diagnostics_store.py top --member withOpacity
+
+Fixers accept the store in place of a text dump:
+--from-analysis .dart_tool/zyraflow_codemods/diagnostics.sqlite3 targets the
+latest run.
+"""
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from itertools import islice
+
+from analyzer_diagnostics import Diagnostic, DiagnosticIndex, deprecated_member, parse_diagnostics, project_path
+from codemod_cache import CACHE_DIR
+
+DEFAULT_STORE = os.path.join(CACHE_DIR, 'diagnostics.sqlite3')
+
+BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    label TEXT,
+    created REAL NOT NULL,
+    diagnostic_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS diagnostics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL,
+    severity TEXT NOT NULL,
+    code TEXT,
+    member TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS diagnostics_run_path ON diagnostics (run_id, path);
+CREATE INDEX IF NOT EXISTS diagnostics_run_code ON diagnostics (run_id, code, path);
+CREATE INDEX IF NOT EXISTS diagnostics_run_member ON diagnostics (run_id, member, path);
+CREATE INDEX IF NOT EXISTS diagnostics_run_severity ON diagnostics (run_id, severity, path);
+"""
+
+
+class DiagnosticsStore:
+    """Analyzer runs kept in one SQLite file."""
+
+    def __init__(self, path=DEFAULT_STORE, read_only=False):
+        """Open the store, creating it unless read_only.
+
+        A read-only open of a missing file fails instead of querying a new,
+        empty store, which would look like a run without diagnostics.
+        """
+        self.path = path
+        if read_only:
+            if not os.path.isfile(path):
+                raise SystemExit(f"❌ No diagnostics store at {path}; run `diagnostics_store.py ingest` first")
+            self.db = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def ingest(self, lines, source, label=None, created=None, root='.'):
+        """Store the diagnostics in an iterable of output lines as a new run.
+
+        Returns (run_id, diagnostic_count).
+        """
+        with self.db:
+            cursor = self.db.execute(
+                'INSERT INTO runs (source, label, created) VALUES (?, ?, ?)',
+                (source, label, created if created is not None else time.time()),
+            )
+            run_id = cursor.lastrowid
+            rows = (
+                (run_id, project_path(d.path, root) or d.path, d.line, d.column,
+                 d.severity, d.code, deprecated_member(d), d.message)
+                for d in parse_diagnostics(lines)
+            )
+            count = 0
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+                self.db.executemany('INSERT INTO diagnostics VALUES (?, ?, ?, ?, ?, ?, ?, ?)', batch)
+                count += len(batch)
+            self.db.execute('UPDATE runs SET diagnostic_count = ? WHERE id = ?', (count, run_id))
+        return run_id, count
+
+    def runs(self):
+        return self.db.execute(
+            'SELECT id, source, label, created, diagnostic_count FROM runs ORDER BY id'
+        ).fetchall()
+
+    def latest_run(self, before=None):
+        """Id of the newest run (older than run id before, if given), or None."""
+        if before is None:
+            row = self.db.execute('SELECT MAX(id) FROM runs').fetchone()
+        else:
+            row = self.db.execute('SELECT MAX(id) FROM runs WHERE id < ?', (before,)).fetchone()
+        return row[0]
+
+    def new_since(self, run_id=None, previous_id=None):
+        """Diagnostics in run_id that previous_id did not have.
+
+        Diagnostics are compared per file by rule and message, not by line,
+        so code that merely moved is not reported as new. Returns
+        (path, code, message, new_count, lines) rows.
+        """
+        run_id = run_id if run_id is not None else self.latest_run()
+        previous_id = previous_id if previous_id is not None else self.latest_run(before=run_id)
+        return self.db.execute(
+            """
+            WITH current AS (
+                SELECT path, IFNULL(code, '') AS code, message, COUNT(*) AS n,
+                       GROUP_CONCAT(line) AS lines
+                FROM diagnostics WHERE run_id = ? GROUP BY path, code, message
+            ), previous AS (
+                SELECT path, IFNULL(code, '') AS code, message, COUNT(*) AS n
+                FROM diagnostics WHERE run_id = ? GROUP BY path, code, message
+            )
+            SELECT c.path, c.code, c.message, c.n - IFNULL(p.n, 0), c.lines
+            FROM current c LEFT JOIN previous p
+              ON p.path = c.path AND p.code = c.code AND p.message = c.message
+            WHERE c.n > IFNULL(p.n, 0)
+            ORDER BY c.path, c.code
+            """,
+            (run_id, previous_id if previous_id is not None else -1),
+        ).fetchall()
+
+    def _filters(self, run_id, code=None, member=None, severity=None):
+        clauses = ['run_id = ?']
+        params = [run_id if run_id is not None else self.latest_run()]
+        for column, value in (('code', code), ('member', member), ('severity', severity)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        return ' AND '.join(clauses), params
+
+    def top_files(self, run_id=None, code=None, member=None, severity=None, limit=10):
+        """(path, count) for the files with the most matching diagnostics."""
+        where, params = self._filters(run_id, code, member, severity)
+        return self.db.execute(
+            f'SELECT path, COUNT(*) FROM diagnostics WHERE {where} '
+            'GROUP BY path ORDER BY COUNT(*) DESC, path LIMIT ?',
+            params + [limit],
+        ).fetchall()
+
+    def rule_counts(self, run_id=None):
+        """(severity, code, count) per rule, most frequent first."""
+        where, params = self._filters(run_id)
+        return self.db.execute(
+            f"SELECT severity, IFNULL(code, '?'), COUNT(*) FROM diagnostics WHERE {where} "
+            'GROUP BY severity, code ORDER BY COUNT(*) DESC',
+            params,
+        ).fetchall()
+
+    def index(self, run_id=None, root='.'):
+        """A DiagnosticIndex over one run (the latest by default)."""
+        run_id = run_id if run_id is not None else self.latest_run()
+        row = self.db.execute('SELECT created FROM runs WHERE id = ?', (run_id,)).fetchone()
+        if row is None:
+            return DiagnosticIndex([], root)
+        cursor = self.db.execute(
+            'SELECT severity, code, message, path, line, column FROM diagnostics WHERE run_id = ?',
+            (run_id,),
+        )
+        return DiagnosticIndex((Diagnostic(*r) for r in cursor), root, row[0])
+
+
+def _ingest(store, args):
+    if args.output == '-':
+        run_id, count = store.ingest(sys.stdin, 'stdin', args.label)
+    else:
+        with open(args.output, 'r', encoding='utf-8', errors='replace') as f:
+            run_id, count = store.ingest(f, args.output, args.label, os.path.getmtime(args.output))
+    print(f"📥 Stored run {run_id}: {count} diagnostics from {args.output}")
+
+
+def _runs(store, args):
+    for run_id, source, label, created, count in store.runs():
+        stamp = time.strftime('%Y-%m-%d %H:%M', time.localtime(created))
+        print(f"   #{run_id:<4} {stamp}  {count:>7} diagnostics  {source}" + (f"  ({label})" if label else ""))
+
+
+def _new(store, args):
+    rows = store.new_since(args.run, args.since)
+    print(f"🆕 {sum(row[3] for row in rows)} new diagnostics")
+    for path, code, message, count, lines in rows:
+        print(f"   {path}:{lines.split(',')[0]}  {code or '?'}  ×{count}  {message}")
+
+
+def _top(store, args):
+    for path, count in store.top_files(args.run, args.code, args.member, args.severity, args.limit):
+        print(f"   {count:>6}  {path}")
+
+
+def _rules(store, args):
+    for severity, code, count in store.rule_counts(args.run):
+        print(f"   {count:>6}  {severity:<8} {code}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Store and query analyzer runs')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'SQLite file (default {DEFAULT_STORE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='store analyzer output as a new run')
+    ingest.add_argument('output', help="analyzer output file, or - for stdin")
+    ingest.add_argument('--label', help='free-form note, e.g. a commit hash')
+    ingest.set_defaults(func=_ingest)
+
+    runs = commands.add_parser('runs', help='list stored runs')
+    runs.set_defaults(func=_runs)
+
+    new = commands.add_parser('new', help='diagnostics new since the previous run')
+    new.add_argument('--run', type=int, help='run to inspect (default latest)')
+    new.add_argument('--since', type=int, help='run to compare against (default the one before)')
+    new.set_defaults(func=_new)
+
+    top = commands.add_parser('top', help='files with the most diagnostics')
+    top.add_argument('--run', type=int)
+    top.add_argument('--code', help='rule id, e.g. deprecated_member_use')
+    top.add_argument('--member', help='deprecated member, e.g. withOpacity')
+    top.add_argument('--severity', help='info, warning or error')
+    top.add_argument('--limit', type=int, default=10)
+    top.set_defaults(func=_top)
+
+    rules = commands.add_parser('rules', help='diagnostic counts per rule')
+    rules.add_argument('--run', type=int)
+    rules.set_defaults(func=_rules)
+
+    args = parser.parse_args()
+    # Only ingest creates the store; the queries need an existing one
+    store = DiagnosticsStore(args.store, read_only=args.command != 'ingest')
+    try:
+        args.func(store, args)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import re
-from pathlib import Path
+
+from dart_corpus import run_rules
+from dart_index import SourceIndex, body_start_edits, insert_at_body_start
+from dart_lexer import drop_const_where, ident_contains, member_access, replace_spans, sub_code, theme_of_context
+from project_config import add_root_argument, enter_project_root
+from rule_profile import add_profile_argument, enable_profile, profile_rule, report_profile, subn
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+THEME_DECLARATION = '\n    final theme = Theme.of(context);'
 
 def fix_tracking_summary_card():
     """Fix tracking summary card theme references and const issues."""
@@ -12,36 +21,34 @@ def fix_tracking_summary_card():
     if os.path.exists(file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
+        original = content
+        
+        index = SourceIndex(content)
+        edits = []
         
         # Add theme variable to build method
         if 'Widget build(BuildContext context)' in content and 'final theme = Theme.of(context);' not in content:
-            content = re.sub(
-                r'(@override\s+Widget build\(BuildContext context\)\s*{)',
-                r'\1\n    final theme = Theme.of(context);',
-                content
-            )
+            edits += body_start_edits(index.build_methods(), THEME_DECLARATION)
         
         # Add theme to other widget methods that use theme
         widget_methods = ['_buildHeader', '_buildContent', '_buildStatistics']
         for method in widget_methods:
-            pattern = f'Widget {method}\\([^{{]*\\)\\s*{{'
-            if re.search(pattern, content) and f'{method}' in content:
-                replacement = f'Widget {method}(BuildContext context) {{\n    final theme = Theme.of(context);'
-                content = re.sub(pattern, replacement, content)
+            span = index.method(method)
+            if span is not None and (span.return_type or '').endswith('Widget'):
+                replacement = f'{method}(BuildContext context) {{{THEME_DECLARATION}'
+                edits.append((span.name_start, span.body_start + 1, replacement))
         
-        # Fix invalid const expressions
-        const_fixes = [
-            (r'const Container\([^)]*theme\.[^}]*\)', lambda m: m.group(0).replace('const ', '')),
-            (r'const\s+([^;]*theme[^;]*;)', r'\1'),
-            (r'const\s+([^;]*Theme\.of\(context\)[^;]*;)', r'\1'),
-        ]
+        content = replace_spans(content, edits)
         
-        for pattern, replacement in const_fixes:
-            content = re.sub(pattern, replacement, content)
+        # Fix invalid const expressions (code only, never strings or comments)
+        content, _ = sub_code(r'const Container\([^)]*theme\.[^}]*\)', lambda m: m.group(0).replace('const ', ''), content)
+        content, _ = drop_const_where(content, ident_contains('theme'))
+        content, _ = drop_const_where(content, theme_of_context)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"  ✅ Fixed {file_path}")
+        if write_source(file_path, content, original):
+            print(f"  ✅ Fixed {file_path}")
+        else:
+            print(f"  ⏭️ No changes needed in {file_path}")
 
 def fix_biometric_widgets():
     """Fix remaining biometric widgets."""
@@ -57,42 +64,45 @@ def fix_biometric_widgets():
         if os.path.exists(widget_path):
             with open(widget_path, 'r', encoding='utf-8') as f:
                 content = f.read()
+            original = content
+            
+            index = SourceIndex(content)
+            spans = []
             
             # Add theme to build method if missing
             if 'Widget build(BuildContext context)' in content:
                 if 'final theme = Theme.of(context);' not in content:
-                    content = re.sub(
-                        r'(@override\s+Widget build\(BuildContext context\)\s*{)',
-                        r'\1\n    final theme = Theme.of(context);',
-                        content
-                    )
+                    spans += index.build_methods()
             
             # Add theme to widget methods that need it
-            widget_method_pattern = r'(Widget _build\w+\([^{]*\)\s*{)'
-            content = re.sub(
-                widget_method_pattern,
-                r'\1\n    final theme = Theme.of(context);',
-                content
+            spans += index.helper_methods()
+            content, _ = profile_rule(
+                'fix_biometric_widgets:theme_declarations', widget_path,
+                lambda text: (insert_at_body_start(text, spans, THEME_DECLARATION), len(spans)), content,
             )
             
-            # Remove invalid const expressions
-            const_patterns = [
-                (r'const\s+Container\([^)]*theme\.[^}]*\)', lambda m: m.group(0).replace('const ', '')),
-                (r'const\s+([^;]*Theme\.of\(context\)[^;]*)', r'\1'),
-                (r'const\s+(.*?)\s*\(\s*color:\s*theme\.[^)]*\)', r'\1(color: theme.'),
-                (r'invalid_constant', ''),
-                (r'const_with_non_const', ''),
-            ]
+            # Remove invalid const expressions (code only, never strings or comments)
+            content, _ = profile_rule(
+                'fix_biometric_widgets:const_container_theme', widget_path,
+                lambda text: sub_code(r'const\s+Container\([^)]*theme\.[^}]*\)', lambda m: m.group(0).replace('const ', ''), text), content,
+            )
+            content, _ = profile_rule(
+                'fix_biometric_widgets:const_theme_of_context', widget_path,
+                lambda text: drop_const_where(text, theme_of_context, require_semicolon=False), content,
+            )
+            content, _ = profile_rule(
+                'fix_biometric_widgets:const_color_theme', widget_path,
+                lambda text: sub_code(r'const\s+(.*?)\s*\(\s*color:\s*theme\.[^)]*\)', r'\1(color: theme.', text), content,
+            )
             
-            for pattern, replacement in const_patterns:
-                if callable(replacement):
-                    content = re.sub(pattern, replacement, content)
-                else:
-                    content = re.sub(pattern, replacement, content)
+            # Drop the matching analyzer ignore comments
+            for pattern in (r'invalid_constant', r'const_with_non_const'):
+                content, _ = subn(f'fix_biometric_widgets:{pattern}', widget_path, pattern, '', content)
             
-            with open(widget_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"  ✅ Fixed {widget_path}")
+            if write_source(widget_path, content, original):
+                print(f"  ✅ Fixed {widget_path}")
+            else:
+                print(f"  ⏭️ No changes needed in {widget_path}")
 
 def fix_cycle_phase_indicator():
     """Fix cycle phase indicator const issue."""
@@ -102,70 +112,91 @@ def fix_cycle_phase_indicator():
     if os.path.exists(file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
+        original = content
         
         # Remove const from expressions with dynamic values
-        content = re.sub(r'const\s+([^;]*phase\.[^;]*)', r'\1', content)
-        content = re.sub(r'const\s+([^;]*Colors\.[^;]*)', r'\1', content)
+        content, _ = drop_const_where(content, member_access('phase'), require_semicolon=False)
+        content, _ = drop_const_where(content, member_access('Colors'), require_semicolon=False)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"  ✅ Fixed {file_path}")
+        if write_source(file_path, content, original):
+            print(f"  ✅ Fixed {file_path}")
+        else:
+            print(f"  ⏭️ No changes needed in {file_path}")
+
+def fix_remaining_withopacity_rule(content, file_path):
+    """Replace .withOpacity(x) with .withValues(alpha: x)."""
+    if '.withOpacity(' in content:
+        content = re.sub(r'\.withOpacity\(([^)]+)\)', r'.withValues(alpha: \1)', content)
+    return content
+
+def fix_unused_variables_rule(content, file_path):
+    """Drop obviously unused variables and repair self-referencing theme variables."""
+    lines = content.splitlines(keepends=True)
+    
+    new_lines = []
+    for line in lines:
+        # Skip unused theme variables
+        if 'final theme = theme;' in line:
+            new_lines.append('    final theme = Theme.of(context);\n')
+        elif re.search(r'final \w+ = [^;]+;\s*$', line) and 'unused' in line.lower():
+            continue  # Skip obviously unused variables
+        else:
+            new_lines.append(line)
+    
+    # Only lines that were dropped count as a change
+    if len(new_lines) != len(lines):
+        return ''.join(new_lines)
+    return content
+
+CORPUS_RULES = [
+    ('fix_remaining_withopacity', fix_remaining_withopacity_rule),
+    ('fix_unused_variables', fix_unused_variables_rule),
+]
 
 def fix_remaining_withopacity():
     """Fix remaining withOpacity usage."""
     print("⚠️ Fixing remaining withOpacity usage...")
-    
-    dart_files = list(Path('lib').rglob('*.dart'))
-    
-    for file_path in dart_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        if '.withOpacity(' in content:
-            content = re.sub(r'\.withOpacity\(([^)]+)\)', r'.withValues(alpha: \1)', content)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    run_rules(CORPUS_RULES[0:1])
 
 def fix_unused_variables():
     """Remove common unused variables."""
     print("🧹 Removing unused variables...")
-    
-    dart_files = list(Path('lib').rglob('*.dart'))
-    
-    for file_path in dart_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        new_lines = []
-        for line in lines:
-            # Skip unused theme variables
-            if 'final theme = theme;' in line:
-                new_lines.append('    final theme = Theme.of(context);\n')
-            elif re.search(r'final \w+ = [^;]+;\s*$', line) and 'unused' in line.lower():
-                continue  # Skip obviously unused variables
-            else:
-                new_lines.append(line)
-        
-        if len(new_lines) != len(lines):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+    run_rules(CORPUS_RULES[1:2])
+
+def run_corpus_fixes():
+    """Run every tree-wide fix in a single pass over lib/."""
+    print("⚠️ Fixing remaining withOpacity usage and unused variables...")
+    counts = run_rules(CORPUS_RULES)
+    for name, files_changed in counts.items():
+        if files_changed:
+            print(f"  ✅ {name}: {files_changed} files")
 
 def main():
+    parser = argparse.ArgumentParser(description='Fix critical analyzer errors in lib/')
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
+    
     print("🚀 Starting Critical Error Fixes...")
     print("=" * 50)
     
     # Change to project directory
-    os.chdir('/Users/ronos/development/FlowSense')
+    enter_project_root(args.root)
     
     # Apply fixes
     fix_tracking_summary_card()
     fix_biometric_widgets()
     fix_cycle_phase_indicator() 
-    fix_remaining_withopacity()
-    fix_unused_variables()
+    run_corpus_fixes()
     
     print("=" * 50)
+    print_summary()
+    report_profile()
     print("✅ Critical error fixes completed!")
     print("🔍 Run 'flutter analyze' to check remaining issues.")
 
@@ -1,54 +1,123 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import re
-import glob
 
-def fix_with_opacity_in_file(file_path):
-    """Replace .withOpacity(value) with .withValues(alpha: value) in a file"""
+from analyzer_diagnostics import DiagnosticIndex, add_analysis_argument, fix_lines, is_deprecated
+from codemod_cache import CleanFileCache, add_cache_argument, rules_version, run_cached
+from dart_corpus import add_jobs_argument, dart_files, map_files
+from project_config import add_root_argument, enter_project_root
+from rule_profile import add_profile_argument, enable_profile, profile_rule, report_profile, subn
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+# Pattern to match .withOpacity(number) where number can be decimal
+WITH_OPACITY_PATTERN = re.compile(r'\.withOpacity\(([0-9]*\.?[0-9]+)\)')
+WITH_OPACITY_REPLACEMENT = r'.withValues(alpha: \1)'
+
+def fix_with_opacity_in_file(file_path, lines=None):
+    """Replace .withOpacity(value) with .withValues(alpha: value) in a file
+
+    With lines, only those 1-based lines are rewritten.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Pattern to match .withOpacity(number) where number can be decimal
-        pattern = r'\.withOpacity\(([0-9]*\.?[0-9]+)\)'
-        replacement = r'.withValues(alpha: \1)'
-        
-        # Count matches before replacement
-        matches = re.findall(pattern, content)
+        if lines is None:
+            # Replace all occurrences, counting them in the same scan
+            new_content, matches = subn('fix_with_opacity', file_path, WITH_OPACITY_PATTERN, WITH_OPACITY_REPLACEMENT, content)
+        else:
+            new_content, matches = profile_rule(
+                'fix_with_opacity:flagged_lines', file_path,
+                lambda text: fix_lines(text, lines, lambda line: WITH_OPACITY_PATTERN.subn(WITH_OPACITY_REPLACEMENT, line)),
+                content,
+            )
         if not matches:
             return 0
         
-        # Replace all occurrences
-        new_content = re.sub(pattern, replacement, content)
-        
         # Write back to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        write_source(file_path, new_content, content)
         
-        print(f"✅ Fixed {len(matches)} withOpacity calls in {file_path}")
-        return len(matches)
+        print(f"✅ Fixed {matches} withOpacity calls in {file_path}")
+        return matches
     
     except Exception as e:
         print(f"❌ Error processing {file_path}: {e}")
-        return 0
+        # None, not 0: a file that could not be processed is not clean
+        return None
+
+def fix_flagged_with_opacity(target):
+    """Fix one (file_path, lines) target taken from analyzer output"""
+    file_path, lines = target
+    return fix_with_opacity_in_file(file_path, lines)
+
+def flagged_targets(analysis_path):
+    """(file_path, lines) for every file the analyzer flagged for withOpacity.
+
+    Files edited after the analysis ran are rescanned whole, since their
+    line numbers may have moved.
+    """
+    index = DiagnosticIndex.load(analysis_path)
+    targets = []
+    for file_path, lines in index.locations(is_deprecated('withOpacity')).items():
+        targets.append((file_path, None if index.is_stale(file_path) else lines))
+    stale = sum(1 for _, lines in targets if lines is None)
+    print(f"🎯 {len(targets)} files flagged in {analysis_path}"
+          + (f" ({stale} changed since, rescanned whole)" if stale else ""))
+    return targets
 
 def main():
     """Fix all withOpacity calls in Dart files"""
-    print("🔧 Fixing deprecated withOpacity calls...")
+    parser = argparse.ArgumentParser(description='Fix all withOpacity calls in Dart files')
+    add_jobs_argument(parser)
+    add_cache_argument(parser)
+    add_analysis_argument(parser)
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
+    # An analysis file given relative to the working directory; otherwise relative to the root
+    if args.from_analysis and os.path.isfile(args.from_analysis):
+        args.from_analysis = os.path.abspath(args.from_analysis)
+    enter_project_root(args.root)
     
-    # Find all Dart files in lib directory
-    dart_files = glob.glob('lib/**/*.dart', recursive=True)
+    print("🔧 Fixing deprecated withOpacity calls...")
     
     total_fixes = 0
     files_processed = 0
+    cache = None
     
-    for file_path in dart_files:
-        fixes = fix_with_opacity_in_file(file_path)
-        if fixes > 0:
+    if args.from_analysis:
+        # Only files with a withOpacity diagnostic are opened
+        results = map_files(fix_flagged_with_opacity, flagged_targets(args.from_analysis), args.jobs)
+    else:
+        # Find all Dart files in lib directory, in a stable order
+        dart_file_paths = dart_files()
+        
+        # Skip files already known to be clean for the current rules
+        cache = CleanFileCache('fix_with_opacity', rules_version(fix_with_opacity_in_file, WITH_OPACITY_PATTERN)) if args.use_cache else None
+        results = run_cached(
+            cache,
+            lambda paths: map_files(fix_with_opacity_in_file, paths, args.jobs),
+            dart_file_paths,
+        )
+    
+    for fixes in results:
+        if fixes:
             total_fixes += fixes
             files_processed += 1
     
+    if cache is not None and cache.hits:
+        print(f"\n⚡ Skipped {cache.hits} files cached as clean")
+    
+    print()
+    print_summary()
+    report_profile()
     print(f"\n🎉 Complete!")
     print(f"📊 Fixed {total_fixes} withOpacity calls across {files_processed} files")
     print(f"🚀 Your app is now using the modern withValues API!")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Fixed-point engine for fixer rules that feed into or undo each other.
+
+The theme fixers used to run as separate full-tree passes that partly
+reverse one another: optimize_theme_usage introduces `theme` variables,
+fix_all_theme_errors rewrites `theme.` back to `Theme.of(context).`, and
+fix_biometric_errors swaps some of those back again. Here each of their
+rules is a FixRule that names the rules it runs after (`after`) and the
+rules it must not be combined with on one file (`conflicts`).
+
+Each file is rewritten in memory, round after round in dependency order,
+until a round changes nothing, and is written at most once. A rule is
+skipped on a file a conflicting rule has already changed. When a file
+comes back to a text it already had, the rules in between are undoing
+each other: the engine stops there and reports them as oscillating pairs
+instead of writing every intermediate state.
+
+    python3 scripts/fixed_point.py --dry-run     # report, write nothing
+"""
+import argparse
+import functools
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dart_corpus import DEFAULT_PATTERNS, DartCorpus, add_jobs_argument, glob_regex, map_files
+from dart_lexer import IDENT, theme_of_context
+from project_config import add_root_argument, enter_project_root
+from rule_profile import add_profile_argument, enable_profile, profile_rule, report_profile
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary
+from theme_scope import theme_scope
+
+DEFAULT_MAX_ROUNDS = 8
+
+
+class RegexFix:
+    """A (pattern, replacement) pair as a fix function; picklable for worker processes."""
+
+    def __init__(self, pattern, replacement, flags=0):
+        self.pattern = re.compile(pattern, flags)
+        self.replacement = replacement
+
+    def __call__(self, content, file_path=None):
+        return self.pattern.sub(self.replacement, content)
+
+
+class FixRule:
+    """A content fixer with the rules it depends on and conflicts with."""
+
+    def __init__(self, name, fix, after=(), conflicts=(), patterns=DEFAULT_PATTERNS):
+        self.name = name
+        self.fix = fix
+        self.after = tuple(after)
+        self.conflicts = set(conflicts)
+        self.patterns = [glob_regex(pattern) for pattern in patterns]
+
+    def __repr__(self):
+        return f'FixRule({self.name!r})'
+
+    def applies(self, path):
+        return any(pattern.match(path) for pattern in self.patterns)
+
+
+class FileResult:
+    """Outcome of running the engine over one file."""
+
+    __slots__ = ('path', 'content', 'rounds', 'changed_by', 'skipped', 'oscillations', 'unstable')
+
+    def __init__(self, path, content, rounds=0, changed_by=(), skipped=(), oscillations=(), unstable=()):
+        self.path = path
+        self.content = content
+        self.rounds = rounds
+        # Rule names in the order they first changed the file
+        self.changed_by = list(changed_by)
+        # (winner, loser) for each rule skipped because of a declared conflict
+        self.skipped = list(skipped)
+        # (rule, rule) pairs that brought the file back to an earlier text
+        self.oscillations = list(oscillations)
+        # Rules still changing the file when max_rounds ran out
+        self.unstable = list(unstable)
+
+    @property
+    def converged(self):
+        return not self.oscillations and not self.unstable
+
+
+def _cycle_pairs(cycle):
+    """Adjacent (rule, next rule) pairs around a cycle of rule applications."""
+    if len(cycle) == 1:
+        return [(cycle[0], cycle[0])]
+    pairs = []
+    for position, name in enumerate(cycle):
+        pair = (name, cycle[(position + 1) % len(cycle)])
+        if pair[0] != pair[1] and pair not in pairs and pair[::-1] not in pairs:
+            pairs.append(pair)
+    return pairs
+
+
+class FixedPointEngine:
+    """Runs FixRules over a file's text until it stops changing."""
+
+    def __init__(self, rules, max_rounds=DEFAULT_MAX_ROUNDS):
+        by_name = {rule.name: rule for rule in rules}
+        for rule in rules:
+            for other in rule.after + tuple(rule.conflicts):
+                if other not in by_name:
+                    raise ValueError(f"{rule.name} refers to unknown rule {other}")
+            # Conflicts hold both ways
+            for other in rule.conflicts:
+                by_name[other].conflicts.add(rule.name)
+        self.rules = self._order(rules)
+        self.max_rounds = max_rounds
+
+    @staticmethod
+    def _order(rules):
+        """Dependency order, otherwise keeping the order the rules were given in."""
+        ordered = []
+        placed = set()
+        pending = list(rules)
+        while pending:
+            for rule in pending:
+                if all(name in placed for name in rule.after):
+                    break
+            else:
+                raise ValueError(f"Dependency cycle between {', '.join(rule.name for rule in pending)}")
+            pending.remove(rule)
+            ordered.append(rule)
+            placed.add(rule.name)
+        return ordered
+
+    def run(self, path, content):
+        rules = [rule for rule in self.rules if rule.applies(path)]
+        # Every text the file has had, with the number of rule changes before it
+        seen = {content: 0}
+        trail = []
+        changed_by = []
+        skipped = []
+        single_pass = content
+
+        for round_number in range(1, self.max_rounds + 1):
+            changed_this_round = []
+            for rule in rules:
+                winner = next((name for name in changed_by if name in rule.conflicts), None)
+                if winner is not None:
+                    if (winner, rule.name) not in skipped:
+                        skipped.append((winner, rule.name))
+                    continue
+
+                new_content, _ = profile_rule(rule.name, path, lambda text: (rule.fix(text, path), None), content)
+                if new_content == content:
+                    continue
+                trail.append(rule.name)
+                changed_this_round.append(rule.name)
+                if rule.name not in changed_by:
+                    changed_by.append(rule.name)
+                if new_content in seen:
+                    # Back to an earlier text: stop there instead of going round again
+                    pairs = _cycle_pairs(trail[seen[new_content]:])
+                    return FileResult(path, new_content, round_number, changed_by, skipped, oscillations=pairs)
+                seen[new_content] = len(trail)
+                content = new_content
+
+            if round_number == 1:
+                single_pass = content
+            if not changed_this_round:
+                return FileResult(path, content, round_number, changed_by, skipped)
+
+        # Still growing: keep what one pass over the rules produced
+        return FileResult(path, single_pass, self.max_rounds, changed_by, skipped, unstable=changed_this_round)
+
+
+def undeclared_theme_uses(content):
+    """Line numbers of bare `theme` references with no declaration in scope.
+
+    A reference is covered by a declaration earlier in the same method
+    (its parameters included), or by one outside any method body in the
+    same class or at the top level. Named arguments (`theme:`) and member
+    accesses (`x.theme`) are not references.
+    """
+    if 'theme' not in content:
+        return []
+    scope = theme_scope(content)
+    declarations = set(scope.declarations)
+    tokens = scope.index.tokens
+    lines = []
+    for position, token in enumerate(tokens):
+        if token.kind != IDENT or token.text != 'theme' or token.end in declarations:
+            continue
+        if position > 0 and tokens[position - 1].text in ('.', '?.'):
+            continue
+        if position + 1 < len(tokens) and tokens[position + 1].text == ':':
+            continue
+        if not scope.theme_declared(token.start):
+            lines.append(content.count('\n', 0, token.start) + 1)
+    return lines
+
+
+def misplaced_theme_lookups(content):
+    """Line numbers of `Theme.of(context)` where `context` is not a BuildContext."""
+    if 'Theme.of(context)' not in content:
+        return []
+    scope = theme_scope(content)
+    tokens = scope.index.tokens
+    return [
+        content.count('\n', 0, tokens[position].start) + 1
+        for position in range(len(tokens))
+        if theme_of_context(tokens, position) and not scope.build_context(tokens[position].start)
+    ]
+
+
+def _run_file(engine, item):
+    """Run the engine over one (path, content) pair; used by serial and pooled runs."""
+    path, content = item
+    try:
+        return engine.run(path, content)
+    except Exception as e:
+        print(f"❌ Error applying rules to {path}: {e}")
+        return FileResult(path, content)
+
+
+def introduced_theme_errors(items, results):
+    """{path: line numbers} for changed files with more broken theme references than before.
+
+    Broken are `theme` references with no declaration in scope and
+    `Theme.of(context)` lookups whose `context` is not a BuildContext.
+    """
+    errors = {}
+    for (path, original), result in zip(items, results):
+        if result.content == original:
+            continue
+        for check in (undeclared_theme_uses, misplaced_theme_lookups):
+            lines = check(result.content)
+            if len(lines) > len(check(original)):
+                errors.setdefault(path, []).extend(lines)
+    return errors
+
+
+def run_corpus(engine, patterns=DEFAULT_PATTERNS, jobs=1):
+    """Bring every file to its fixed point in memory and write each changed file once.
+
+    Nothing is written if the rules leave a file referring to a `theme`
+    that is not declared where it is used, or looking up Theme.of with a
+    `context` that is not a BuildContext.
+    """
+    corpus = DartCorpus.load(patterns)
+    items = [(f.path, f.content) for f in corpus.files]
+    results = map_files(functools.partial(_run_file, engine), items, jobs)
+    errors = introduced_theme_errors(items, results)
+    if errors:
+        print("❌ The rules left `theme` or Theme.of(context) where it does not resolve; nothing was written")
+        for path, lines in errors.items():
+            print(f"   {path}: lines {', '.join(map(str, lines))}")
+        raise SystemExit(1)
+    for dart_file, result in zip(corpus.files, results):
+        dart_file.content = result.content
+    corpus.write()
+    return results
+
+
+def theme_rules():
+    """The theme rules of optimize_performance, fix_all_theme_errors and fix_biometric_errors."""
+    import fix_all_theme_errors
+    import fix_biometric_errors
+    import optimize_performance
+
+    rules = [
+        # Introduces `theme`; the two rules below turn `theme.` back into Theme.of(context).
+        FixRule(
+            'optimize_theme_usage', optimize_performance.optimize_theme_usage_rule,
+            conflicts=['fix_all_theme_errors:theme_before_declaration', 'fix_biometric_errors:theme_to_context'],
+        ),
+    ]
+    for name, pattern, replacement in fix_all_theme_errors.THEME_ERROR_RULES:
+        rules.append(FixRule(
+            f'fix_all_theme_errors:{name}', RegexFix(pattern, replacement),
+            patterns=fix_all_theme_errors.TARGET_PATTERNS,
+        ))
+    # helpers_use_theme edits the Theme.of(context) lookups theme_to_context writes
+    after = {'helpers_use_theme': ['fix_biometric_errors:theme_to_context']}
+    for name, fix in fix_biometric_errors.BIOMETRIC_RULES:
+        rules.append(FixRule(
+            f'fix_biometric_errors:{name}', fix, after=after.get(name, ()),
+            patterns=[fix_biometric_errors.DASHBOARD_FILE],
+        ))
+    return rules
+
+
+def print_report(results, engine):
+    changed = [result for result in results if result.changed_by]
+    rounds = {}
+    for result in changed:
+        rounds[result.rounds] = rounds.get(result.rounds, 0) + 1
+    print(f"🔁 {len(engine.rules)} rules over {len(results)} files: {len(changed)} changed")
+    if rounds:
+        print("   Rounds to settle: " + ', '.join(f"{count} files in {number}" for number, count in sorted(rounds.items())))
+
+    per_rule = {}
+    for result in changed:
+        for name in result.changed_by:
+            per_rule[name] = per_rule.get(name, 0) + 1
+    for rule in engine.rules:
+        if rule.name in per_rule:
+            print(f"   {per_rule[rule.name]:4d}  {rule.name}")
+
+    sections = [
+        ('⚔️  Declared conflicts (kept ⟵ skipped)', 'skipped', ' ⟵ '),
+        ('⚠️  Oscillating rule pairs (rule ⇄ the rule that undid it)', 'oscillations', ' ⇄ '),
+    ]
+    for title, field, joiner in sections:
+        files = {}
+        for result in results:
+            for pair in getattr(result, field):
+                files.setdefault(pair, []).append(result.path)
+        if files:
+            print(f"\n{title}")
+            for pair, paths in sorted(files.items(), key=lambda item: -len(item[1])):
+                print(f"   {joiner.join(pair)}: {len(paths)} files, e.g. {paths[0]}")
+
+    unstable = [result for result in results if result.unstable]
+    if unstable:
+        print(f"\n⏳ Still changing after {engine.max_rounds} rounds (kept the single-pass result)")
+        for result in unstable:
+            print(f"   {result.path}: {', '.join(result.unstable)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the theme fixers to a fixed point per file')
+    add_jobs_argument(parser)
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    parser.add_argument('--max-rounds', type=int, default=DEFAULT_MAX_ROUNDS, metavar='N',
+                        help=f'give up on a file after N rounds (default {DEFAULT_MAX_ROUNDS})')
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
+    enter_project_root(args.root)
+
+    engine = FixedPointEngine(theme_rules(), args.max_rounds)
+    results = run_corpus(engine, jobs=args.jobs)
+    print_report(results, engine)
+    print()
+    print_summary()
+    report_profile()
+
+
+if __name__ == '__main__':
+    main()
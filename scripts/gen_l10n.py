@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Generate lib/generated/app_localizations*.dart from the ARB files.
+
+`flutter gen-l10n` rewrites the abstract class and every locale file for a
+one-key change. This produces the same Dart, byte for byte, from l10n.yaml
+(arb-dir, template-arb-file, output-dir, output-localization-file,
+output-class, use-deferred-loading, nullable-getter,
+preferred-supported-locales, header / header-file), laid out as
+`dart format` leaves gen-l10n's output.
+
+Each output is cached (arb_store.ArbCache) under the content hashes of
+the ARB files it is made from: a locale file under its own ARB and the
+template (untranslated messages fall back to English), the abstract class
+under the template and the list of locales. Editing one locale's ARB file
+regenerates that locale's file only; the abstract class is regenerated
+when the template or the set of locales changes. Outputs go through
+source_writer, so a file is only replaced when its bytes change.
+
+With --delta, each locale class extends the template locale's class
+(AppLocalizationsEn) and overrides only the messages its ARB file
+defines, instead of repeating the English text of every untranslated
+message; the lines and bytes this saves are reported per locale.
+`flutter gen-l10n` writes the full classes again.
+
+Plain messages and `{placeholder}` substitution are supported, which is
+what the project's ARB files use. Plural, select and formatted
+placeholders, and locales with a script or country code, are left to
+`flutter gen-l10n`.
+
+    python3 scripts/gen_l10n.py            # regenerate what changed
+    python3 scripts/gen_l10n.py --check    # compare with lib/generated/, write nothing
+    python3 scripts/gen_l10n.py --delta    # locale classes inherit untranslated messages
+"""
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from arb_store import CACHE_DIR, ArbCache, arb_paths, is_metadata
+from project_config import add_root_argument, enter_project_root, l10n_config
+from source_writer import add_dry_run_argument, dry_run_enabled, enable_dry_run, print_summary, write_source
+
+CACHE_NAME = 'gen_l10n'
+CACHE_VERSION = 1
+LINE_LENGTH = 80
+
+# Language subtag names as gen-l10n prints them in the class comments
+LANGUAGE_NAMES = {
+    'af': 'Afrikaans', 'ar': 'Arabic', 'bg': 'Bulgarian', 'bn': 'Bengali Bangla',
+    'ca': 'Catalan Valencian', 'cs': 'Czech', 'cy': 'Welsh', 'da': 'Danish',
+    'de': 'German', 'el': 'Modern Greek', 'en': 'English', 'es': 'Spanish Castilian',
+    'et': 'Estonian', 'eu': 'Basque', 'fa': 'Persian', 'fi': 'Finnish',
+    'fil': 'Filipino Pilipino', 'fr': 'French', 'ga': 'Irish', 'gl': 'Galician',
+    'gu': 'Gujarati', 'he': 'Hebrew', 'hi': 'Hindi', 'hr': 'Croatian',
+    'hu': 'Hungarian', 'hy': 'Armenian', 'id': 'Indonesian', 'is': 'Icelandic',
+    'it': 'Italian', 'ja': 'Japanese', 'ka': 'Georgian', 'kk': 'Kazakh',
+    'km': 'Khmer Central Khmer', 'kn': 'Kannada', 'ko': 'Korean', 'lt': 'Lithuanian',
+    'lv': 'Latvian', 'mk': 'Macedonian', 'ml': 'Malayalam', 'mn': 'Mongolian',
+    'mr': 'Marathi', 'ms': 'Malay', 'mt': 'Maltese', 'nb': 'Norwegian Bokmål',
+    'ne': 'Nepali (macrolanguage)', 'nl': 'Dutch Flemish', 'no': 'Norwegian',
+    'pa': 'Panjabi Punjabi', 'pl': 'Polish', 'pt': 'Portuguese',
+    'ro': 'Romanian Moldavian Moldovan', 'ru': 'Russian', 'sk': 'Slovak',
+    'sl': 'Slovenian', 'sq': 'Albanian', 'sr': 'Serbian', 'sv': 'Swedish',
+    'sw': 'Swahili (macrolanguage)', 'ta': 'Tamil', 'te': 'Telugu', 'th': 'Thai',
+    'tl': 'Tagalog', 'tr': 'Turkish', 'uk': 'Ukrainian', 'ur': 'Urdu',
+    'uz': 'Uzbek', 'vi': 'Vietnamese', 'zh': 'Chinese', 'zu': 'Zulu',
+}
+
+# ARB placeholder type -> Dart parameter type
+PLACEHOLDER_TYPES = {'String': 'String', 'int': 'int', 'double': 'double', 'num': 'num', 'Object': 'Object'}
+
+_ESCAPES = {'\\': '\\\\', "'": "\\'", '$': '\\$', '\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+_ESCAPED = re.compile(r"[\\'$\n\r\t\b\f]")
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+_UNSUPPORTED_MESSAGE = re.compile(r'\{\s*\w+\s*,\s*(plural|select|date|time|number)\b')
+
+
+class Unsupported(Exception):
+    """ARB content this generator leaves to flutter gen-l10n."""
+
+
+def _escape(text):
+    return _ESCAPED.sub(lambda match: _ESCAPES[match.group()], text)
+
+
+def dart_length(line):
+    """Length as dart format counts it, in UTF-16 code units."""
+    return len(line.encode('utf-16-le')) // 2
+
+
+def _fits(*lines):
+    return all(dart_length(line) <= LINE_LENGTH for line in lines)
+
+
+def dart_string(text, placeholders=()):
+    """text as a single-quoted Dart literal, interpolating the named placeholders."""
+    if not placeholders:
+        return f"'{_escape(text)}'"
+    pieces = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text):
+        name = match.group(1)
+        if name not in placeholders:
+            continue
+        pieces.append(_escape(text[position:match.start()]))
+        following = text[match.end():match.end() + 1]
+        # Braces only where the next character would continue the identifier
+        pieces.append(f'${{{name}}}' if re.match(r'[A-Za-z0-9_]', following) else f'${name}')
+        position = match.end()
+    pieces.append(_escape(text[position:]))
+    return "'" + ''.join(pieces) + "'"
+
+
+def class_name(output_class, code):
+    return output_class + code[:1].upper() + code[1:].lower()
+
+
+def language_name(code):
+    return LANGUAGE_NAMES.get(code, code)
+
+
+class Settings:
+    """The l10n.yaml options the generated Dart depends on."""
+
+    def __init__(self, root='.', delta=False):
+        config = l10n_config(root)
+        self.root = root
+        self.delta = delta
+        self.arb_dir = config['arb-dir']
+        self.template_file = config['template-arb-file']
+        self.output_dir = config.get('output-dir') or self.arb_dir
+        self.output_file = config['output-localization-file']
+        self.output_class = config['output-class']
+        self.deferred = config.get('use-deferred-loading') is True
+        self.nullable = config.get('nullable-getter', True) is not False
+        self.preferred = config.get('preferred-supported-locales') or []
+        if isinstance(self.preferred, str):
+            self.preferred = [self.preferred]
+        self.header = config.get('header') or ''
+        if config.get('header-file'):
+            with open(os.path.join(root, self.arb_dir, config['header-file']), 'r', encoding='utf-8') as f:
+                self.header = f.read()
+
+    @property
+    def stem(self):
+        return self.output_file[:-len('.dart')] if self.output_file.endswith('.dart') else self.output_file
+
+    def locale_file(self, code):
+        return f'{self.stem}_{code}.dart'
+
+    def path(self, name):
+        return os.path.join(self.root, self.output_dir, name)
+
+    def key(self):
+        """Hash of the options, part of every cache key."""
+        options = {name: value for name, value in vars(self).items() if name != 'root'}
+        return hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:12]
+
+    def import_path(self):
+        """How the app imports the output, for the usage example in the class comment."""
+        directory = os.path.relpath(self.output_dir, 'lib')
+        return self.output_file if directory == '.' else f'{directory}/{self.output_file}'.replace(os.sep, '/')
+
+
+class Message:
+    """One template message: its key, English text, description and parameters."""
+
+    __slots__ = ('key', 'value', 'description', 'parameters')
+
+    def __init__(self, key, value, metadata):
+        if not isinstance(value, str):
+            raise Unsupported(f'{key} is not a string')
+        if _UNSUPPORTED_MESSAGE.search(value):
+            raise Unsupported(f'{key} uses a plural, select or formatted placeholder')
+        self.key = key
+        self.value = value
+        self.description = metadata.get('description')
+        self.parameters = []
+        for name, placeholder in (metadata.get('placeholders') or {}).items():
+            placeholder = placeholder or {}
+            kind = placeholder.get('type', 'Object')
+            if kind not in PLACEHOLDER_TYPES or placeholder.get('format'):
+                raise Unsupported(f'{key}: placeholder {name} has type {kind} / format {placeholder.get("format")}')
+            self.parameters.append((PLACEHOLDER_TYPES[kind], name))
+
+    @property
+    def names(self):
+        return [name for _, name in self.parameters]
+
+    def signature(self):
+        return ', '.join(f'{kind} {name}' for kind, name in self.parameters)
+
+
+def template_messages(data):
+    """Messages of the template ARB data, in file order."""
+    return [Message(key, value, data.get('@' + key) or {})
+            for key, value in data.items() if not is_metadata(key)]
+
+
+def _parameter_lines(start, parameters, end):
+    """A declaration split one parameter per line, as dart format does when it is too long."""
+    lines = [f'{start}(']
+    lines += [f'    {kind} {name},' for kind, name in parameters]
+    lines.append(f'  ){end}')
+    return lines
+
+
+def render_member(message, value):
+    """The override of one message in a locale class."""
+    literal = dart_string(value, message.names)
+    lines = ['  @override']
+    if not message.parameters:
+        line = f'  String get {message.key} => {literal};'
+        if _fits(line):
+            lines.append(line)
+        else:
+            lines += [f'  String get {message.key} =>', f'      {literal};']
+    else:
+        line = f'  String {message.key}({message.signature()}) {{'
+        lines += [line] if _fits(line) else _parameter_lines(f'  String {message.key}', message.parameters, ' {')
+        lines += [f'    return {literal};', '  }']
+    return '\n'.join(lines) + '\n'
+
+
+def render_declaration(message):
+    """The documented abstract getter or method of one message."""
+    lines = [f'  /// {line}'.rstrip() for line in (message.description or f'No description provided for @{message.key}.').split('\n')]
+    lines += ['  ///', '  /// In en, this message translates to:', f"  /// **'{_escape(message.value)}'**"]
+    if not message.parameters:
+        lines.append(f'  String get {message.key};')
+    else:
+        line = f'  String {message.key}({message.signature()});'
+        lines += [line] if _fits(line) else _parameter_lines(f'  String {message.key}', message.parameters, ';')
+    return '\n'.join(lines) + '\n'
+
+
+def _header(settings):
+    return settings.header.rstrip('\n') + '\n' if settings.header else ''
+
+
+def render_locale(settings, code, messages, data, template=None):
+    """app_localizations_<code>.dart: every template message, untranslated ones in English.
+
+    With template (delta mode) the class extends the template locale's class
+    instead and overrides only the messages data defines.
+    """
+    name = class_name(settings.output_class, code)
+    parent = class_name(settings.output_class, template) if template else settings.output_class
+    parts = [
+        _header(settings),
+        "// ignore: unused_import\n"
+        "import 'package:intl/intl.dart' as intl;\n"
+        f"import '{settings.locale_file(template) if template else settings.output_file}';\n"
+        "\n"
+        "// ignore_for_file: type=lint\n"
+        "\n"
+        f"/// The translations for {language_name(code)} (`{code}`).\n",
+    ]
+    if template:
+        parts.append(f"///\n/// Messages without a translation are inherited from [{parent}].\n")
+    declaration = f'class {name} extends {parent} {{'
+    parts.append(declaration + '\n' if _fits(declaration) else f'class {name}\n    extends {parent} {{\n')
+    parts.append(f"  {name}([String locale = '{code}']) : super(locale);\n")
+    for message in messages:
+        value = data.get(message.key)
+        if not isinstance(value, str):
+            if template:
+                continue
+            value = message.value
+        parts.append('\n')
+        parts.append(render_member(message, value))
+    parts.append('}\n')
+    return ''.join(parts)
+
+
+def size(content):
+    """(lines, bytes) of a generated file."""
+    return content.count('\n'), len(content.encode('utf-8'))
+
+
+def supported_locales(settings, codes):
+    """The preferred locales first, then the rest by code."""
+    preferred = [code for code in settings.preferred if code in codes]
+    return preferred + sorted(code for code in codes if code not in preferred)
+
+
+def _lookup_case(settings, code):
+    name = class_name(settings.output_class, code)
+    if not settings.deferred:
+        return f"    case '{code}':\n      return {name}();\n"
+    library = settings.locale_file(code)[:-len('.dart')]
+    line = f'      return {library}.loadLibrary().then((dynamic _) => {library}.{name}());'
+    if _fits(line):
+        return f"    case '{code}':\n{line}\n"
+    return (
+        f"    case '{code}':\n"
+        f"      return {library}.loadLibrary().then(\n"
+        f"        (dynamic _) => {library}.{name}(),\n"
+        f"      );\n"
+    )
+
+
+def render_base(settings, messages, codes):
+    """The abstract class, its delegate and the lookup function."""
+    cls = settings.output_class
+    delegate = f'_{cls}Delegate'
+    lookup = f'lookup{cls}'
+    codes = sorted(codes)
+    parts = [_header(settings), "import 'dart:async';\n\n"]
+    if not settings.deferred:
+        parts.append("import 'package:flutter/foundation.dart';\n")
+    parts.append(
+        "import 'package:flutter/widgets.dart';\n"
+        "import 'package:flutter_localizations/flutter_localizations.dart';\n"
+        "import 'package:intl/intl.dart' as intl;\n"
+        "\n"
+    )
+    for code in codes:
+        file_name = settings.locale_file(code)
+        if settings.deferred:
+            parts.append(f"import '{file_name}' deferred as {file_name[:-len('.dart')]};\n")
+        else:
+            parts.append(f"import '{file_name}';\n")
+    parts.append(
+        "\n"
+        "// ignore_for_file: type=lint\n"
+        "\n"
+        f"/// Callers can lookup localized strings with an instance of {cls}\n"
+        f"/// returned by `{cls}.of(context)`.\n"
+        "///\n"
+        f"/// Applications need to include `{cls}.delegate()` in their app's\n"
+        "/// `localizationDelegates` list, and the locales they support in the app's\n"
+        "/// `supportedLocales` list. For example:\n"
+        "///\n"
+        "/// ```dart\n"
+        f"/// import '{settings.import_path()}';\n"
+        "///\n"
+        "/// return MaterialApp(\n"
+        f"///   localizationsDelegates: {cls}.localizationsDelegates,\n"
+        f"///   supportedLocales: {cls}.supportedLocales,\n"
+        "///   home: MyApplicationHome(),\n"
+        "/// );\n"
+        "/// ```\n"
+        "///\n"
+        "/// ## Update pubspec.yaml\n"
+        "///\n"
+        "/// Please make sure to update your pubspec.yaml to include the following\n"
+        "/// packages:\n"
+        "///\n"
+        "/// ```yaml\n"
+        "/// dependencies:\n"
+        "///   # Internationalization support.\n"
+        "///   flutter_localizations:\n"
+        "///     sdk: flutter\n"
+        "///   intl: any # Use the pinned version from flutter_localizations\n"
+        "///\n"
+        "///   # Rest of dependencies\n"
+        "/// ```\n"
+        "///\n"
+        "/// ## iOS Applications\n"
+        "///\n"
+        "/// iOS applications define key application metadata, including supported\n"
+        "/// locales, in an Info.plist file that is built into the application bundle.\n"
+        "/// To configure the locales supported by your app, you’ll need to edit this\n"
+        "/// file.\n"
+        "///\n"
+        "/// First, open your project’s ios/Runner.xcworkspace Xcode workspace file.\n"
+        "/// Then, in the Project Navigator, open the Info.plist file under the Runner\n"
+        "/// project’s Runner folder.\n"
+        "///\n"
+        "/// Next, select the Information Property List item, select Add Item from the\n"
+        "/// Editor menu, then select Localizations from the pop-up menu.\n"
+        "///\n"
+        "/// Select and expand the newly-created Localizations item then, for each\n"
+        "/// locale your application supports, add a new item and select the locale\n"
+        "/// you wish to add from the pop-up menu in the Value field. This list should\n"
+        f"/// be consistent with the languages listed in the {cls}.supportedLocales\n"
+        "/// property.\n"
+        f"abstract class {cls} {{\n"
+        f"  {cls}(String locale)\n"
+        "    : localeName = intl.Intl.canonicalizedLocale(locale.toString());\n"
+        "\n"
+        "  final String localeName;\n"
+        "\n"
+    )
+    if settings.nullable:
+        parts.append(
+            f"  static {cls}? of(BuildContext context) {{\n"
+            f"    return Localizations.of<{cls}>(context, {cls});\n"
+            "  }\n"
+        )
+    else:
+        parts.append(
+            f"  static {cls} of(BuildContext context) {{\n"
+            f"    return Localizations.of<{cls}>(context, {cls})!;\n"
+            "  }\n"
+        )
+    line = f'  static const LocalizationsDelegate<{cls}> delegate = {delegate}();'
+    parts.append('\n' + (line + '\n' if _fits(line) else
+                         f'  static const LocalizationsDelegate<{cls}> delegate =\n      {delegate}();\n'))
+    parts.append(
+        "\n"
+        "  /// A list of this localizations delegate along with the default localizations\n"
+        "  /// delegates.\n"
+        "  ///\n"
+        "  /// Returns a list of localizations delegates containing this delegate along with\n"
+        "  /// GlobalMaterialLocalizations.delegate, GlobalCupertinoLocalizations.delegate,\n"
+        "  /// and GlobalWidgetsLocalizations.delegate.\n"
+        "  ///\n"
+        "  /// Additional delegates can be added by appending to this list in\n"
+        "  /// MaterialApp. This list does not have to be used at all if a custom list\n"
+        "  /// of delegates is preferred or required.\n"
+        "  static const List<LocalizationsDelegate<dynamic>> localizationsDelegates =\n"
+        "      <LocalizationsDelegate<dynamic>>[\n"
+        "        delegate,\n"
+        "        GlobalMaterialLocalizations.delegate,\n"
+        "        GlobalCupertinoLocalizations.delegate,\n"
+        "        GlobalWidgetsLocalizations.delegate,\n"
+        "      ];\n"
+        "\n"
+        "  /// A list of this localizations delegate's supported locales.\n"
+        "  static const List<Locale> supportedLocales = <Locale>[\n"
+    )
+    parts.extend(f"    Locale('{code}'),\n" for code in supported_locales(settings, codes))
+    parts.append("  ];\n")
+    for message in messages:
+        parts.append('\n')
+        parts.append(render_declaration(message))
+    parts.append('}\n\n')
+
+    declaration = f'class {delegate} extends LocalizationsDelegate<{cls}> {{'
+    parts.append(declaration + '\n' if _fits(declaration) else
+                 f'class {delegate}\n    extends LocalizationsDelegate<{cls}> {{\n')
+    parts.append(
+        f"  const {delegate}();\n"
+        "\n"
+        "  @override\n"
+        f"  Future<{cls}> load(Locale locale) {{\n"
+    )
+    if settings.deferred:
+        parts.append(f"    return {lookup}(locale);\n")
+    else:
+        line = f'    return SynchronousFuture<{cls}>({lookup}(locale));'
+        parts.append(line + '\n' if _fits(line) else f'    return SynchronousFuture<{cls}>(\n      {lookup}(locale),\n    );\n')
+    parts.append(
+        "  }\n"
+        "\n"
+        "  @override\n"
+        "  bool isSupported(Locale locale) => <String>[\n"
+    )
+    parts.extend(f"    '{code}',\n" for code in codes)
+    parts.append(
+        "  ].contains(locale.languageCode);\n"
+        "\n"
+        "  @override\n"
+        f"  bool shouldReload({delegate} old) => false;\n"
+        "}\n"
+        "\n"
+    )
+    result = f'Future<{cls}>' if settings.deferred else cls
+    parts.append(
+        f"{result} {lookup}(Locale locale) {{\n"
+        "  // Lookup logic when only language code is specified.\n"
+        "  switch (locale.languageCode) {\n"
+    )
+    parts.extend(_lookup_case(settings, code) for code in codes)
+    parts.append(
+        "  }\n"
+        "\n"
+        "  throw FlutterError(\n"
+        f"    '{cls}.delegate failed to load unsupported locale \"$locale\". This is likely '\n"
+        "    'an issue with the localizations generation tool. Please file an issue '\n"
+        "    'on GitHub with a reproducible sample app and the gen-l10n configuration '\n"
+        "    'that was used.',\n"
+        "  );\n"
+        "}\n"
+    )
+    return ''.join(parts)
+
+
+class Generator:
+    """Renders the outputs whose inputs changed since the last run.
+
+    The cache holds an entry per ARB file (its hash) and per output (its
+    hash, the key of the inputs it was rendered from and, in delta mode,
+    its size next to the full file's).
+    """
+
+    def __init__(self, root='.', use_cache=True, delta=False):
+        self.settings = Settings(root, delta)
+        self.paths = arb_paths(os.path.join(root, self.settings.arb_dir), self.settings.template_file)
+        self.template = next(iter(self.paths))
+        for code in self.paths:
+            if not re.fullmatch(r'[a-z]{2,3}', code):
+                raise Unsupported(f'locale {code}: only language codes are supported')
+        self.cache = ArbCache(CACHE_NAME, CACHE_VERSION, root)
+        if not use_cache:
+            self.cache.entries = {}
+        self.hashes = {}
+        self._data = {}
+        self._messages = None
+        # Locale -> (full lines, full bytes, delta lines, delta bytes), in delta mode
+        self.savings = {}
+
+    def _fingerprint(self, code):
+        """Content hash of a locale's ARB file; its bytes are kept if they had to be read."""
+        if code not in self.hashes:
+            path = self.paths[code]
+            digest, data = self.cache.fingerprint(path)
+            self.hashes[code] = digest
+            if data is not None:
+                self._data[code] = data
+            if self.cache.get(path, digest) is None:
+                self.cache.put(path, digest, digest, True)
+        return self.hashes[code]
+
+    def data(self, code):
+        if code not in self._data:
+            with open(self.paths[code], 'rb') as f:
+                self._data[code] = f.read()
+        return json.loads(self._data[code])
+
+    def messages(self):
+        if self._messages is None:
+            self._messages = template_messages(self.data(self.template))
+        return self._messages
+
+    def outputs(self):
+        """(locale or None for the abstract class, output path, key of its inputs) for every file."""
+        prefix = f'{self.settings.key()}:{self._fingerprint(self.template)}'
+        yield None, self.settings.path(self.settings.output_file), f'{prefix}:{",".join(sorted(self.paths))}'
+        for code in self.paths:
+            yield code, self.settings.path(self.settings.locale_file(code)), f'{prefix}:{self._fingerprint(code)}'
+
+    def render(self, code):
+        """The text of one output; in delta mode, records the size saved on a locale file."""
+        if code is None:
+            return render_base(self.settings, self.messages(), list(self.paths))
+        data = self.data(code)
+        full = render_locale(self.settings, code, self.messages(), data)
+        if not self.settings.delta or code == self.template:
+            return full
+        # A locale that translates every message has nothing to inherit
+        if all(isinstance(data.get(message.key), str) for message in self.messages()):
+            content = full
+        else:
+            content = render_locale(self.settings, code, self.messages(), data, self.template)
+        self.savings[code] = size(full) + size(content)
+        return content
+
+    def fresh(self, output, key):
+        """Whether output was rendered from key and has not been edited since."""
+        entry = self.cache.entry(output)
+        if not entry or entry['key'] != key or not os.path.exists(output):
+            return False
+        digest, _ = self.cache.fingerprint(output)
+        return digest == entry['hash']
+
+    def run(self, check=False):
+        """Regenerate the stale outputs; with check, render all of them and compare with disk.
+
+        Returns {output path: whether it changed (with check: differs)} for the
+        rendered outputs.
+        """
+        rendered = {}
+        for code, output, key in self.outputs():
+            if not check and self.fresh(output, key):
+                if isinstance(self.cache.entry(output)['result'], list):
+                    self.savings[code] = tuple(self.cache.entry(output)['result'])
+                continue
+            content = self.render(code)
+            if check:
+                rendered[output] = _differs(output, content)
+                continue
+            rendered[output] = write_source(output, content)
+            if not dry_run_enabled():
+                result = list(self.savings[code]) if code in self.savings else True
+                self.cache.put(output, hashlib.sha1(content.encode('utf-8')).hexdigest(), key, result)
+        if not check and not dry_run_enabled():
+            self.cache.save()
+        return rendered
+
+
+def _differs(path, content):
+    """Whether content differs from the file; prints the first differing lines."""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            current = f.read()
+    except FileNotFoundError:
+        print(f"   ❌ {path}: missing")
+        return True
+    if current == content:
+        return False
+    diff = list(difflib.unified_diff(current.splitlines(), content.splitlines(),
+                                     fromfile=path, tofile='generated', lineterm='', n=1))
+    print(f"   ❌ {path}: differs")
+    for line in diff[:12]:
+        print(f"      {line}")
+    return True
+
+
+def print_savings(savings):
+    """Lines and bytes the delta classes save per locale, largest saving first."""
+    if not savings:
+        return
+    print("📉 Delta classes vs. full overrides (lines, KB):")
+    rows = sorted(savings.items(), key=lambda item: item[1][3] - item[1][1])
+    for code, (full_lines, full_bytes, lines, size_bytes) in rows:
+        print(f"   {code:>3}: {full_lines:6,} → {lines:6,} lines ({lines - full_lines:+,}), "
+              f"{full_bytes / 1024:5.1f} → {size_bytes / 1024:5.1f} KB ({(size_bytes - full_bytes) / 1024:+.1f})")
+    full_lines, full_bytes, lines, size_bytes = (sum(column) for column in zip(*savings.values()))
+    print(f"   Total: {full_lines - lines:,} lines and {(full_bytes - size_bytes) / 1024:.1f} KB saved "
+          f"across {len(savings)} locales ({100 * (full_bytes - size_bytes) / full_bytes:.0f}% of their bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the localization Dart files from the ARB files')
+    add_root_argument(parser)
+    add_dry_run_argument(parser)
+    parser.add_argument('--check', action='store_true',
+                        help='render every file and compare it with the output directory; exit 1 on any difference')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help=f'regenerate every file instead of trusting {CACHE_DIR}/')
+    parser.add_argument('--delta', action='store_true',
+                        help='make each locale class extend the template locale\'s and override only its own messages')
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    enter_project_root(args.root)
+
+    start = time.perf_counter()
+    try:
+        generator = Generator(use_cache=args.use_cache, delta=args.delta)
+        rendered = generator.run(check=args.check)
+    except Unsupported as e:
+        sys.exit(f"❌ {e}; run `flutter gen-l10n` instead")
+    elapsed = (time.perf_counter() - start) * 1000
+    changed = sum(rendered.values())
+    print_savings(generator.savings)
+
+    if args.check:
+        if changed:
+            sys.exit(f"❌ {changed} of {len(rendered)} files differ from the ARB files ({elapsed:.1f} ms)")
+        print(f"✅ {len(rendered)} files match the ARB files byte for byte ({elapsed:.1f} ms)")
+        return
+    print(f"🔁 Rendered {len(rendered)} of {len(generator.paths) + 1} files in {elapsed:.1f} ms")
+    print_summary()
+
+
+if __name__ == '__main__':
+    main()
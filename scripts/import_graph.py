@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Import graph of lib/ and the startup closure of lib/main.dart.
+
+Every `import`, `export` and `part` directive under lib/ becomes an edge;
+`deferred as` imports are kept but not followed. Everything reachable from
+main.dart over eager edges is loaded before the first frame, so the
+closure is weighted by source size. The report gives:
+
+  startup closure   files and bytes main.dart pulls in eagerly
+  deferral ranking  per feature module (lib/features/<name>), the bytes that
+                    leave the closure if every import into it from outside
+                    were made `deferred as`, and the import sites to change
+  cycles            strongly connected groups of files
+  history           closure size at other commits, read straight from git
+
+    python3 scripts/import_graph.py
+    python3 scripts/import_graph.py --compare HEAD~5
+    python3 scripts/import_graph.py --history 10 --json import_graph.json
+"""
+import argparse
+import json
+import os
+import posixpath
+import re
+import subprocess
+
+from project_config import package_name
+
+ROOT = 'lib'
+DEFAULT_ENTRY = 'lib/main.dart'
+FEATURES = 'lib/features/'
+
+# `import 'a.dart' if (dart.library.io) 'b.dart' deferred as x;` keeps its first URI
+_DIRECTIVE = re.compile(r"^[ \t]*(import|export|part)\s+(['\"])([^'\"]+)\2([^;]*);", re.M)
+
+
+def iter_directives(source):
+    """(kind, uri, rest, start, end) for each import/export/part directive in source.
+
+    rest is the text between the URI and the `;` (prefix, combinators,
+    `deferred`); start and end span the whole directive.
+    """
+    for match in _DIRECTIVE.finditer(source):
+        yield match.group(1), match.group(3), match.group(4), match.start(), match.end()
+
+
+def parse_directives(source):
+    """(uri, deferred) for each import/export/part directive in source."""
+    return [
+        (uri, kind == 'import' and re.search(r'\bdeferred\s+as\b', rest) is not None)
+        for kind, uri, rest, _, _ in iter_directives(source)
+    ]
+
+
+def resolve(importer, uri, package, root=ROOT):
+    """Project path a directive points at, 'package:name' for other packages, or None for dart:."""
+    if uri.startswith('dart:'):
+        return None
+    if uri.startswith('package:'):
+        name, _, rest = uri[len('package:'):].partition('/')
+        if name == package:
+            return posixpath.join(root, rest)
+        return f'package:{name}'
+    return posixpath.normpath(posixpath.join(posixpath.dirname(importer), uri))
+
+
+def feature_module(path):
+    """'community' for lib/features/community/..., else None."""
+    if not path.startswith(FEATURES):
+        return None
+    name = path[len(FEATURES):].split('/', 1)[0]
+    return name if '/' in path[len(FEATURES):] else None
+
+
+class ImportGraph:
+    """Dart files, their sizes and their import edges."""
+
+    def __init__(self, sizes, directives, package, root=ROOT):
+        self.sizes = sizes
+        self.package = package
+        # path -> [(target, deferred)]; targets outside the project are 'package:x'
+        self.edges = {}
+        for path, found in directives.items():
+            targets = []
+            for uri, deferred in found:
+                target = resolve(path, uri, package, root)
+                if target is not None and (target in sizes or target.startswith('package:')):
+                    targets.append((target, deferred))
+            self.edges[path] = targets
+
+    @classmethod
+    def from_tree(cls, root=ROOT, package=None):
+        package = package or package_name()
+        sizes = {}
+        directives = {}
+        for directory, subdirs, files in os.walk(root):
+            subdirs.sort()
+            for name in sorted(files):
+                if not name.endswith('.dart'):
+                    continue
+                path = posixpath.join(directory.replace(os.sep, '/'), name)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                except OSError as e:
+                    print(f"❌ Error reading {path}: {e}")
+                    continue
+                sizes[path] = len(data)
+                directives[path] = parse_directives(data.decode('utf-8', errors='replace'))
+        return cls(sizes, directives, package, root)
+
+    @classmethod
+    def from_revision(cls, revision, root=ROOT, package=None, _parsed={}):
+        """The graph as committed at revision; blobs are parsed once per process."""
+        package = package or package_name()
+        listing = subprocess.run(
+            ['git', 'ls-tree', '-r', '-l', '-z', revision, '--', root],
+            capture_output=True, check=True,
+        ).stdout.decode('utf-8').split('\0')
+        blobs = {}
+        sizes = {}
+        for entry in filter(None, listing):
+            meta, path = entry.split('\t', 1)
+            _, kind, sha, size = meta.split()
+            if kind == 'blob' and path.endswith('.dart'):
+                blobs[path] = sha
+                sizes[path] = int(size)
+
+        missing = sorted({sha for sha in blobs.values() if sha not in _parsed})
+        if missing:
+            output = subprocess.run(
+                ['git', 'cat-file', '--batch'], input=''.join(f'{sha}\n' for sha in missing).encode(),
+                capture_output=True, check=True,
+            ).stdout
+            offset = 0
+            for sha in missing:
+                header_end = output.index(b'\n', offset)
+                size = int(output[offset:header_end].split()[2])
+                data = output[header_end + 1:header_end + 1 + size]
+                offset = header_end + 1 + size + 1
+                _parsed[sha] = parse_directives(data.decode('utf-8', errors='replace'))
+        return cls(sizes, {path: _parsed[sha] for path, sha in blobs.items()}, package, root)
+
+    def closure(self, entry=DEFAULT_ENTRY, cut=frozenset()):
+        """Files (and packages) reachable from entry over eager edges not in cut."""
+        seen = {entry} if entry in self.sizes else set()
+        stack = list(seen)
+        while stack:
+            path = stack.pop()
+            for target, deferred in self.edges.get(path, ()):
+                if deferred or target in seen or (path, target) in cut:
+                    continue
+                seen.add(target)
+                stack.append(target)
+        return seen
+
+    def weight(self, paths):
+        return sum(self.sizes.get(path, 0) for path in paths)
+
+    def deferral_candidates(self, entry=DEFAULT_ENTRY):
+        """Per feature module, what deferring every import into it from outside would save."""
+        closure = self.closure(entry)
+        total = self.weight(closure)
+        modules = {}
+        for path in closure:
+            module = feature_module(path)
+            if module is not None:
+                modules.setdefault(module, []).append(path)
+
+        candidates = []
+        for module, files in modules.items():
+            sites = [
+                (path, target) for path in closure for target, deferred in self.edges.get(path, ())
+                if not deferred and feature_module(target) == module and feature_module(path) != module
+            ]
+            remaining = self.closure(entry, frozenset(sites))
+            left = closure - remaining
+            candidates.append({
+                'module': module,
+                'files_in_closure': len(files),
+                'bytes_in_closure': self.weight(files),
+                'saved_files': len([p for p in left if not p.startswith('package:')]),
+                'saved_bytes': total - self.weight(remaining),
+                'import_sites': sorted({f'{path} -> {target}' for path, target in sites}),
+                'importers': sorted({path for path, _ in sites}),
+            })
+        return sorted(candidates, key=lambda c: (c['saved_bytes'], -len(c['import_sites'])), reverse=True)
+
+    def cycles(self, eager_only=False):
+        """Strongly connected groups of two or more files (Tarjan, iterative)."""
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        groups = []
+        counter = 0
+        for start in sorted(self.sizes):
+            if start in index:
+                continue
+            work = [(start, iter(self._local_targets(start, eager_only)))]
+            index[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, targets = work[-1]
+                advanced = False
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self._local_targets(target, eager_only))))
+                        advanced = True
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    group = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        group.append(member)
+                        if member == node:
+                            break
+                    if len(group) > 1:
+                        groups.append(sorted(group))
+        return sorted(groups, key=lambda g: (-len(g), g))
+
+    def _local_targets(self, path, eager_only):
+        return [
+            target for target, deferred in self.edges.get(path, ())
+            if target in self.sizes and not (eager_only and deferred)
+        ]
+
+
+def closure_summary(graph, entry=DEFAULT_ENTRY):
+    closure = graph.closure(entry)
+    files = [path for path in closure if not path.startswith('package:')]
+    return {
+        'files': len(files),
+        'bytes': graph.weight(files),
+        'packages': sorted(path[len('package:'):] for path in closure if path.startswith('package:')),
+        'project_files': len(graph.sizes),
+        'project_bytes': graph.weight(graph.sizes),
+    }
+
+
+def _kb(size):
+    return f"{size / 1024:,.1f} KB"
+
+
+def print_report(graph, entry=DEFAULT_ENTRY, top=10, cycle_limit=10):
+    summary = closure_summary(graph, entry)
+    share = summary['bytes'] * 100 // max(summary['project_bytes'], 1)
+    print(f"🚀 Startup closure of {entry}: {summary['files']} of {summary['project_files']} files, "
+          f"{_kb(summary['bytes'])} of {_kb(summary['project_bytes'])} ({share}%), "
+          f"{len(summary['packages'])} packages")
+
+    candidates = graph.deferral_candidates(entry)
+    print(f"\n📦 Feature modules to load with `deferred as` (top {min(top, len(candidates))})")
+    print(f"   {'saves':>10} {'files':>6} {'in closure':>11} {'sites':>6}  module (importers)")
+    for candidate in candidates[:top]:
+        importers = ', '.join(posixpath.relpath(p, ROOT) for p in candidate['importers'][:3])
+        more = len(candidate['importers']) - 3
+        if more > 0:
+            importers += f", +{more}"
+        print(f"   {_kb(candidate['saved_bytes']):>10} {candidate['saved_files']:>6} "
+              f"{_kb(candidate['bytes_in_closure']):>11} {len(candidate['import_sites']):>6}  "
+              f"{candidate['module']} ({importers})")
+
+    cycles = graph.cycles()
+    eager = {path for group in graph.cycles(eager_only=True) for path in group}
+    print(f"\n🔁 {len(cycles)} import cycles")
+    for group in cycles[:cycle_limit]:
+        names = ', '.join(posixpath.relpath(p, ROOT) for p in group[:4])
+        more = f", +{len(group) - 4}" if len(group) > 4 else ""
+        # Cycles closed only by `deferred as` edges never load together
+        note = "" if eager.intersection(group) else "  (through deferred imports only)"
+        print(f"   {len(group):>3} files: {names}{more}{note}")
+    return summary, candidates, cycles
+
+
+def compare(before, after, entry=DEFAULT_ENTRY, label='before', limit=10):
+    """Print how the startup closure changed from graph before to graph after."""
+    old = {p for p in before.closure(entry) if not p.startswith('package:')}
+    new = {p for p in after.closure(entry) if not p.startswith('package:')}
+    delta = after.weight(new) - before.weight(old)
+    print(f"\n📈 Startup closure vs {label}: {len(old)} → {len(new)} files, "
+          f"{_kb(before.weight(old))} → {_kb(after.weight(new))} ({'+' if delta >= 0 else '-'}{_kb(abs(delta))})")
+    added = sorted(new - old, key=lambda p: -after.sizes[p])
+    removed = sorted(old - new, key=lambda p: -before.sizes[p])
+    for path in added[:limit]:
+        print(f"   + {path} ({_kb(after.sizes[path])})")
+    for path in removed[:limit]:
+        print(f"   - {path} ({_kb(before.sizes[path])})")
+    return {'files': len(new) - len(old), 'bytes': delta, 'added': added, 'removed': removed}
+
+
+def history(count, entry=DEFAULT_ENTRY, root=ROOT):
+    """(commit, subject, summary) for the last count commits that touched root."""
+    log = subprocess.run(
+        ['git', 'log', f'-{count}', '--format=%h%x00%s', '--', root],
+        capture_output=True, check=True, text=True,
+    ).stdout.splitlines()
+    rows = []
+    for line in log:
+        commit, subject = line.split('\0', 1)
+        rows.append((commit, subject, closure_summary(ImportGraph.from_revision(commit, root), entry)))
+    print(f"\n🕰️  Startup closure over the last {len(rows)} commits touching {root}/")
+    for commit, subject, summary in rows:
+        print(f"   {commit}  {summary['files']:>4} files  {_kb(summary['bytes']):>10}  {subject[:60]}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze the import graph and startup closure of lib/main.dart')
+    parser.add_argument('--entry', default=DEFAULT_ENTRY, help=f'entry point (default {DEFAULT_ENTRY})')
+    parser.add_argument('--top', type=int, default=10, help='feature modules to rank (default 10)')
+    parser.add_argument('--cycles', type=int, default=10, help='cycles to list (default 10)')
+    parser.add_argument('--compare', metavar='REV', help='compare the working tree with a git revision')
+    parser.add_argument('--history', type=int, metavar='N', help='closure size at the last N commits touching lib/')
+    parser.add_argument('--json', metavar='PATH', help='also write the report as JSON to PATH')
+    args = parser.parse_args()
+
+    graph = ImportGraph.from_tree()
+    summary, candidates, cycles = print_report(graph, args.entry, args.top, args.cycles)
+    report = {'closure': summary, 'deferral_candidates': candidates, 'cycles': cycles}
+    if args.compare:
+        report['compare'] = compare(ImportGraph.from_revision(args.compare), graph, args.entry, args.compare)
+    if args.history:
+        report['history'] = [
+            {'commit': commit, 'subject': subject, **row}
+            for commit, subject, row in history(args.history, args.entry)
+        ]
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"   Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
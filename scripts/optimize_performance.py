@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 
-import os
+import argparse
 import re
-import glob
+
+from const_analysis import compare_with_heuristic, const_symbols, insert_const
+from dart_corpus import add_jobs_argument, run_rules
+from dart_index import SourceIndex
+from dart_lexer import IDENT, THEME_OF_CONTEXT, replace_spans, theme_of_context
+from project_config import add_root_argument, enter_project_root
+from rule_registry import Rule, RuleSet, add_report_argument, enable_report
+from rule_profile import add_profile_argument, enable_profile, profile_rule, report_profile
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
 
 def optimize_app_startup():
     """Optimize main.dart for faster app startup"""
@@ -29,8 +37,7 @@ def optimize_app_startup():
                 content = re.sub(pattern, replacement, content)
         
         if content != original_content:
-            with open(main_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_source(main_file, content)
             print("✅ Optimized app startup performance")
             return True
     
@@ -39,36 +46,59 @@ def optimize_app_startup():
     
     return False
 
+# The previous add_const_constructors heuristic. It prefixed const without
+# looking at the arguments (or at an existing const); kept for --compare-const.
+HEURISTIC_CONST_RULES = RuleSet('add_const_constructors', [
+    Rule('SizedBox', r'(SizedBox\()\s*(height|width):', r'const \1\2:',
+         anchors=['SizedBox('], flags=re.MULTILINE),
+    Rule('Padding', r'(Padding\()\s*padding:', r'const \1padding:',
+         anchors=['Padding('], flags=re.MULTILINE),
+    Rule('EdgeInsets', r'(EdgeInsets\.)(\w+)', r'\1\2',
+         anchors=['EdgeInsets.'], flags=re.MULTILINE),
+    Rule('Text', r'(Text\()\s*(["\'][^"\']*["\'])\s*\)', r'const \1\2)',
+         anchors=['Text('], flags=re.MULTILINE),
+])
+
+def add_const_constructors_rule(content, file_path):
+    """Add const to constructor calls whose arguments are all compile-time constants"""
+    content, _ = profile_rule(
+        'add_const_constructors:insert_const', file_path,
+        lambda text: insert_const(text, file_path, const_symbols()), content,
+    )
+    return content
+
+def optimize_theme_usage_rule(content, file_path):
+    """Cache theme access at the start of build methods"""
+    if 'Theme.of(context)' not in content or 'build(' not in content:
+        return content
+
+    index = SourceIndex(content)
+    edits = []
+    for span in index.build_methods():
+        body = index.body_tokens(span)
+        # Builds that already use a theme are left alone, so a second run changes nothing
+        if any(token.kind == IDENT and token.text == 'theme' for token in body):
+            continue
+        # Only lookups inside this build can see the variable declared at its start
+        uses = [position for position in range(len(body)) if theme_of_context(body, position)]
+        if not uses:
+            continue
+        line_start = content.rfind('\n', 0, span.type_start) + 1
+        indent = content[line_start:span.type_start] + '  '
+        edits.append((span.body_start + 1, span.body_start + 1, f'\n{indent}final theme = Theme.of(context);'))
+        for position in uses:
+            edits.append((body[position].start, body[position + len(THEME_OF_CONTEXT) - 1].end, 'theme'))
+
+    return replace_spans(content, edits) if edits else content
+
+CORPUS_RULES = [
+    ('add_const_constructors', add_const_constructors_rule),
+    ('optimize_theme_usage', optimize_theme_usage_rule),
+]
+
 def add_const_constructors():
     """Add const constructors where possible for better performance"""
-    dart_files = glob.glob('lib/**/*.dart', recursive=True)
-    fixes = 0
-    
-    for file_path in dart_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            # Add const to common constructors that should be const
-            const_patterns = [
-                (r'(SizedBox\()\s*(height|width):', r'const \1\2:'),
-                (r'(Padding\()\s*padding:', r'const \1padding:'),
-                (r'(EdgeInsets\.)(\w+)', r'\1\2'),
-                (r'(Text\()\s*(["\'][^"\']*["\'])\s*\)', r'const \1\2)'),
-            ]
-            
-            for pattern, replacement in const_patterns:
-                content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
-            
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                fixes += 1
-        
-        except Exception as e:
-            continue
+    fixes = run_rules(CORPUS_RULES[0:1])['add_const_constructors']
     
     if fixes > 0:
         print(f"✅ Added const constructors to {fixes} files")
@@ -77,40 +107,35 @@ def add_const_constructors():
 
 def optimize_theme_usage():
     """Optimize theme access patterns for better performance"""
-    dart_files = glob.glob('lib/**/*.dart', recursive=True)
-    fixes = 0
-    
-    for file_path in dart_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            # Cache theme access in build methods
-            if 'Theme.of(context)' in content and 'build(' in content:
-                # Add theme caching at the start of build methods
-                build_pattern = r'(Widget build\(BuildContext context\) \{)\s*\n'
-                if re.search(build_pattern, content):
-                    replacement = r'\1\n    final theme = Theme.of(context);\n'
-                    content = re.sub(build_pattern, replacement, content)
-                    
-                    # Replace Theme.of(context) with theme variable
-                    content = re.sub(r'Theme\.of\(context\)', 'theme', content)
-            
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                fixes += 1
-        
-        except Exception as e:
-            continue
+    fixes = run_rules(CORPUS_RULES[1:2])['optimize_theme_usage']
     
     if fixes > 0:
         print(f"✅ Optimized theme usage in {fixes} files")
     
     return fixes
 
+def optimize_source_patterns(jobs=1):
+    """Add const constructors and cache theme access in a single pass over lib/"""
+    # Built before the pass so worker processes inherit the symbol table
+    const_symbols()
+    counts = run_rules(CORPUS_RULES, jobs=jobs)
+    
+    if counts['add_const_constructors'] > 0:
+        print(f"✅ Added const constructors to {counts['add_const_constructors']} files")
+    if counts['optimize_theme_usage'] > 0:
+        print(f"✅ Optimized theme usage in {counts['optimize_theme_usage']} files")
+    
+    return sum(counts.values())
+
+def compare_const_insertions():
+    """Report legal const insertions against the previous heuristic, writing nothing"""
+    totals = compare_with_heuristic(HEURISTIC_CONST_RULES)
+    print(f"📊 const insertions over {totals['files']} files")
+    print(f"   Previous heuristic: {totals['heuristic']} "
+          f"({totals['heuristic_legal']} legal, {totals['heuristic_illegal']} invalid or redundant)")
+    print(f"   Symbol table:       {totals['symbol_table']} (all legal)")
+    return totals
+
 def add_lazy_loading():
     """Add lazy loading to heavy widgets"""
     home_screen = "lib/features/cycle/screens/home_screen.dart"
@@ -164,8 +189,7 @@ class _LazyWidgetState extends State<_LazyWidget> {
             class_pattern = r'(class HomeScreen extends StatefulWidget)'
             content = re.sub(class_pattern, lazy_widget_code + r'\n\1', content)
             
-            with open(home_screen, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_source(home_screen, content)
             
             print("✅ Added lazy loading to home screen")
             return True
@@ -193,8 +217,7 @@ class ImageCacheConfig {
 '''
         
         cache_file = "lib/core/utils/image_cache_config.dart"
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(cache_config)
+        write_source(cache_file, cache_config)
         
         # Add to main.dart initialization
         main_file = "lib/main.dart"
@@ -216,8 +239,7 @@ class ImageCacheConfig {
                     '_initializeCriticalServices() async {\n  ImageCacheConfig.configure();'
                 )
             
-            with open(main_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_source(main_file, content)
         
         print("✅ Added image caching optimization")
         return True
@@ -229,12 +251,32 @@ class ImageCacheConfig {
 
 def main():
     """Run all performance optimizations"""
+    parser = argparse.ArgumentParser(description='Run performance optimizations over lib/')
+    add_jobs_argument(parser)
+    add_report_argument(parser)
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    parser.add_argument('--compare-const', action='store_true',
+                        help='compare const insertions with the previous heuristic and exit')
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.report_rules:
+        enable_report()
+    if args.profile:
+        enable_profile(args.profile)
+    enter_project_root(args.root)
+    
+    if args.compare_const:
+        compare_const_insertions()
+        return
+    
     print("🚀 Running comprehensive performance optimizations...\n")
     
     optimizations = [
         ("App startup", optimize_app_startup),
-        ("Const constructors", add_const_constructors),
-        ("Theme usage", optimize_theme_usage),
+        ("Const constructors and theme usage", lambda: optimize_source_patterns(args.jobs)),
         ("Lazy loading", add_lazy_loading),
         ("Image caching", optimize_image_loading),
     ]
@@ -248,6 +290,8 @@ def main():
             total_improvements += 1 if isinstance(result, bool) else result
         print()
     
+    print_summary()
+    report_profile()
     print(f"🎉 Performance optimization complete!")
     print(f"📊 Applied {total_improvements} performance improvements")
     print(f"🚀 Your app should now start faster and run smoother!")
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import re
 import sys
-from pathlib import Path
+
+from analyzer_diagnostics import DiagnosticIndex, add_analysis_argument, fix_lines, is_deprecated
+from dart_corpus import run_rules
+from dart_index import SourceIndex, insert_at_body_start
+from project_config import add_root_argument, enter_project_root
+from rule_registry import Rule, RuleSet
+from rule_profile import add_profile_argument, enable_profile, report_profile
+from source_writer import add_dry_run_argument, dry_run_enabled, enable_dry_run, print_summary, write_source
+
+THEME_DECLARATION = '\n    final theme = Theme.of(context);'
 
 def fix_theme_references():
     """Fix undefined theme references by adding proper theme declarations."""
@@ -23,18 +33,18 @@ def fix_theme_references():
             
             # Check if theme is used but not declared
             if 'theme.' in content and 'final theme = ' not in content:
-                # Find the build method and add theme declaration
-                build_pattern = r'(@override\s+Widget build\(BuildContext context\)\s*{)'
-                if re.search(build_pattern, content):
-                    replacement = r'\1\n    final theme = Theme.of(context);'
-                    content = re.sub(build_pattern, replacement, content)
-                    
-                    # Also add theme declarations in other widget methods
-                    widget_method_pattern = r'(Widget _build\w+\([^{]*\)\s*{)'
-                    content = re.sub(widget_method_pattern, r'\1\n    final theme = Theme.of(context);', content)
+                # Find the build methods and widget helpers in one pass
+                index = SourceIndex(content)
+                build_methods = index.build_methods()
+                if build_methods:
+                    # Add theme declarations to build and the other widget methods
+                    content = insert_at_body_start(
+                        content,
+                        build_methods + index.helper_methods(),
+                        THEME_DECLARATION,
+                    )
                     
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
+                    write_source(file_path, content)
                     print(f"  ✅ Fixed theme references in {file_path}")
 
 def fix_auth_service_methods():
@@ -79,8 +89,7 @@ def fix_auth_service_methods():
             # Insert before the last closing brace
             content = content.replace('}', methods_to_add + '}')
             
-            with open(auth_service_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_source(auth_service_path, content)
             print("  ✅ Added missing authentication methods")
 
 def fix_user_preferences():
@@ -108,100 +117,119 @@ def fix_user_preferences():
                 # Add to constructor
                 content = re.sub(r'(\s+required this\.\w+,?\s*)', r'\1' + constructor_param, content, count=1)
                 
-                with open(user_prefs_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                write_source(user_prefs_path, content)
                 print("  ✅ Added biometric properties to user preferences")
 
+def remove_unused_variables_rule(content, file_path):
+    """Drop lines marked unused and repair self-referencing theme variables."""
+    lines = content.splitlines(keepends=True)
+    new_lines = []
+    
+    for line in lines:
+        # Skip lines with unused local variables (simple cases)
+        if re.search(r'final \w+ = [^;]+;\s*//.*unused', line):
+            continue
+        # Remove unused theme variables that are immediately declared
+        if re.search(r'final theme = theme;', line):
+            new_lines.append('    final theme = Theme.of(context);\n')
+            continue
+            
+        new_lines.append(line)
+    
+    return ''.join(new_lines)
+
+def fix_const_issues_rule(content, file_path):
+    """Remove duplicated and unnecessary const keywords."""
+    patterns = [
+        (r'const const ', 'const '),  # Double const
+        (r'unnecessary_const', ''),   # Remove unnecessary const comments
+    ]
+    
+    for pattern, replacement in patterns:
+        content = re.sub(pattern, replacement, content)
+    
+    return content
+
+# Deprecated API usage and its current equivalent
+DEPRECATED_RULES = RuleSet('fix_deprecated_usage', [
+    # Fix withOpacity -> withValues
+    Rule('withOpacity', r'\.withOpacity\(([^)]+)\)', r'.withValues(alpha: \1)',
+         anchors=['.withOpacity(']),
+    # Fix deprecated theme properties
+    Rule('background', 'background:', 'surface:', literal=True),
+    Rule('onBackground', 'onBackground:', 'onSurface:', literal=True),
+    Rule('surfaceVariant', 'surfaceVariant:', 'surfaceContainerHighest:', literal=True),
+])
+
+def fix_deprecated_usage_rule(content, file_path):
+    """Replace deprecated API usage with the current equivalents."""
+    content, _ = DEPRECATED_RULES.apply(content, file_path)
+    return content
+
+# Members DEPRECATED_RULES knows how to replace
+DEPRECATED_MEMBERS = ('withOpacity', 'background', 'onBackground', 'surfaceVariant')
+
+def fix_deprecated_line(line):
+    """Apply DEPRECATED_RULES to a single line; returns (line, fix_count)."""
+    line, fired = DEPRECATED_RULES.apply(line)
+    return line, len(fired)
+
+CORPUS_RULES = [
+    ('remove_unused_variables', remove_unused_variables_rule),
+    ('fix_const_issues', fix_const_issues_rule),
+    ('fix_deprecated_usage', fix_deprecated_usage_rule),
+]
+
 def remove_unused_variables():
     """Remove unused variables and imports."""
     print("🧹 Removing unused variables...")
-    
-    dart_files = list(Path('lib').rglob('*.dart'))
-    
-    for file_path in dart_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        modified = False
-        new_lines = []
-        
-        for line in lines:
-            # Skip lines with unused local variables (simple cases)
-            if re.search(r'final \w+ = [^;]+;\s*//.*unused', line):
-                modified = True
-                continue
-            # Remove unused theme variables that are immediately declared
-            if re.search(r'final theme = theme;', line):
-                new_lines.append('    final theme = Theme.of(context);\n')
-                modified = True
-                continue
-                
-            new_lines.append(line)
-        
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+    run_rules(CORPUS_RULES[0:1])
 
 def fix_const_issues():
     """Fix const keyword issues."""
     print("🔧 Fixing const keyword issues...")
-    
-    dart_files = list(Path('lib').rglob('*.dart'))
-    
-    for file_path in dart_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        modified = False
-        
-        # Remove unnecessary const keywords
-        patterns = [
-            (r'const const ', 'const '),  # Double const
-            (r'unnecessary_const', ''),   # Remove unnecessary const comments
-        ]
-        
-        for pattern, replacement in patterns:
-            if re.search(pattern, content):
-                content = re.sub(pattern, replacement, content)
-                modified = True
-        
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    run_rules(CORPUS_RULES[1:2])
 
 def fix_deprecated_usage():
     """Fix deprecated API usage."""
     print("⚠️ Fixing deprecated API usage...")
+    run_rules(CORPUS_RULES[2:3])
+
+def fix_flagged_deprecated_usage(analysis_path):
+    """Fix deprecated API usage only at the lines flagged in analyzer output.
+
+    Files without a matching diagnostic are never opened; files changed
+    since the analysis ran are fixed whole, as their lines may have moved.
+    """
+    print(f"⚠️ Fixing deprecated API usage flagged in {analysis_path}...")
+    index = DiagnosticIndex.load(analysis_path)
     
-    dart_files = list(Path('lib').rglob('*.dart'))
-    
-    for file_path in dart_files:
+    for file_path, lines in index.locations(is_deprecated(*DEPRECATED_MEMBERS)).items():
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        modified = False
-        
-        # Fix withOpacity -> withValues
-        withopacity_pattern = r'\.withOpacity\(([^)]+)\)'
-        if re.search(withopacity_pattern, content):
-            content = re.sub(withopacity_pattern, r'.withValues(alpha: \1)', content)
-            modified = True
+        if index.is_stale(file_path):
+            new_content = fix_deprecated_usage_rule(content, file_path)
+        else:
+            new_content, _ = fix_lines(content, lines, fix_deprecated_line)
         
-        # Fix deprecated theme properties
-        deprecated_replacements = [
-            ('background:', 'surface:'),
-            ('onBackground:', 'onSurface:'),
-            ('surfaceVariant:', 'surfaceContainerHighest:'),
-        ]
-        
-        for old, new in deprecated_replacements:
-            if old in content:
-                content = content.replace(old, new)
-                modified = True
-        
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if write_source(file_path, new_content, content):
+            print(f"  ✅ Fixed deprecated usage in {file_path}")
+
+def run_corpus_fixes(analysis_path=None):
+    """Run every tree-wide fix in a single pass over lib/.
+
+    With analysis_path, deprecated usage is fixed from the analyzer output
+    instead of by scanning every file.
+    """
+    rules = CORPUS_RULES if analysis_path is None else CORPUS_RULES[:2]
+    print("🧹 Removing unused variables, fixing const and deprecated usage...")
+    counts = run_rules(rules)
+    for name, files_changed in counts.items():
+        if files_changed:
+            print(f"  ✅ {name}: {files_changed} files")
+    if analysis_path is not None:
+        fix_flagged_deprecated_usage(analysis_path)
 
 def create_missing_directories():
     """Create missing asset directories."""
@@ -214,26 +242,42 @@ def create_missing_directories():
     ]
     
     for directory in directories:
-        os.makedirs(directory, exist_ok=True)
+        if os.path.isdir(directory):
+            continue
+        if dry_run_enabled():
+            print(f"  📝 Would create directory: {directory}")
+            continue
+        os.makedirs(directory)
         print(f"  ✅ Created directory: {directory}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Run production cleanup fixes over lib/')
+    add_analysis_argument(parser)
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
+    
     print("🚀 Starting FlowSense Production Cleanup...")
     print("=" * 50)
     
     # Change to project directory
-    os.chdir('/Users/ronos/development/FlowSense')
+    enter_project_root(args.root)
     
     # Run cleanup functions
     fix_theme_references()
     fix_auth_service_methods() 
     fix_user_preferences()
-    remove_unused_variables()
-    fix_const_issues()
-    fix_deprecated_usage()
+    run_corpus_fixes(args.from_analysis)
     create_missing_directories()
     
     print("=" * 50)
+    print_summary()
+    report_profile()
     print("✅ Production cleanup completed!")
     print("🔍 Run 'flutter analyze' to check remaining issues.")
 
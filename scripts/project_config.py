@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Project root and configuration shared by the scripts.
+
+The root is, in order: an explicit --root, $ZYRAFLOW_ROOT, the nearest
+directory at or above the working directory with a pubspec.yaml, and
+finally the checkout these scripts live in. Once resolved the root is
+exported in $ZYRAFLOW_ROOT, so worker processes and nested tools agree.
+Scripts work with paths relative to the root (lib/..., assets/...), so
+entering the root once replaces per-script hard-coded checkouts.
+
+Only os and re are imported here; zyratools needs this at startup.
+"""
+import os
+import re
+
+ROOT_ENV = 'ZYRAFLOW_ROOT'
+PUBSPEC = 'pubspec.yaml'
+L10N_CONFIG = 'l10n.yaml'
+
+_CHECKOUT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_project_root(start=None):
+    """Nearest directory at or above start (default: cwd) with a pubspec.yaml, else None."""
+    directory = os.path.abspath(start or os.getcwd())
+    while True:
+        if os.path.isfile(os.path.join(directory, PUBSPEC)):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def project_root(explicit=None):
+    """The project root (see module docstring)."""
+    for candidate in (explicit, os.environ.get(ROOT_ENV)):
+        if candidate:
+            root = os.path.abspath(os.path.expanduser(candidate))
+            if not os.path.isfile(os.path.join(root, PUBSPEC)):
+                raise SystemExit(f"❌ {root} is not a Flutter project (no {PUBSPEC})")
+            return root
+    return find_project_root() or _CHECKOUT
+
+
+def enter_project_root(explicit=None):
+    """chdir to the project root and export it for child processes. Returns the root."""
+    root = project_root(explicit)
+    os.chdir(root)
+    os.environ[ROOT_ENV] = root
+    return root
+
+
+def add_root_argument(parser):
+    parser.add_argument(
+        '--root', metavar='DIR',
+        help=f'Flutter project root (default ${ROOT_ENV}, else the nearest directory with a {PUBSPEC})',
+    )
+
+
+def read_simple_yaml(path):
+    """Top-level keys of a flat YAML file such as l10n.yaml or pubspec.yaml.
+
+    Handles scalars, `[a, b]` flow lists and `|` / `>` block scalars, which
+    is all the project's own config files use; nested mappings are skipped.
+    """
+    values = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return values
+    index = 0
+    while index < len(lines):
+        match = re.match(r'^([A-Za-z_][\w-]*)\s*:\s*(.*?)\s*$', lines[index])
+        index += 1
+        if not match or not match.group(2) or match.group(2).startswith('#'):
+            continue
+        key, value = match.groups()
+        if value in ('|', '|-', '>', '>-'):
+            block = []
+            while index < len(lines) and (not lines[index].strip() or lines[index][:1] in ' \t'):
+                block.append(lines[index].strip())
+                index += 1
+            joiner = '\n' if value.startswith('|') else ' '
+            value = joiner.join(block).strip()
+        elif value.startswith('['):
+            value = [item.strip().strip('\'"') for item in value.strip('[]').split(',') if item.strip()]
+        else:
+            value = re.sub(r'\s+#.*$', '', value)
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+                value = value[1:-1]
+            elif value in ('true', 'false'):
+                value = value == 'true'
+        values[key] = value
+    return values
+
+
+def package_name(root='.'):
+    return read_simple_yaml(os.path.join(root, PUBSPEC)).get('name')
+
+
+def l10n_config(root='.'):
+    """l10n.yaml with Flutter's defaults filled in."""
+    config = {
+        'arb-dir': 'lib/l10n',
+        'template-arb-file': 'app_en.arb',
+        'output-localization-file': 'app_localizations.dart',
+        'output-class': 'AppLocalizations',
+    }
+    config.update(read_simple_yaml(os.path.join(root, L10N_CONFIG)))
+    return config
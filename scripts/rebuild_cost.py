@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Static rebuild-cost report for widget build methods.
+
+Scores every `build` method and Widget-returning `_build*` helper under
+lib/features/ by the work a rebuild repeats:
+
+  inherited lookups    Theme.of, MediaQuery.of, AppLocalizations.of, ...
+                       (each one also subscribes the widget to that ancestor)
+  non-const widgets    constructor calls outside any const context
+  closures             function literals allocated on every build
+  nesting depth        deepest chain of nested constructor calls
+
+Helpers called from a method are folded into its inclusive score, so a
+`build` that delegates to `_buildHeader` and friends is ranked by the
+whole tree it produces.
+
+    python3 scripts/rebuild_cost.py
+    python3 scripts/rebuild_cost.py --top 40 --json rebuild_cost.json
+"""
+import argparse
+import bisect
+import json
+
+from const_analysis import ConstAnalysis, constructor_at, const_symbols
+from dart_corpus import dart_files
+from dart_index import SourceIndex
+from dart_lexer import IDENT, PUNCT
+
+DEFAULT_PATTERNS = ('lib/features/**/*.dart',)
+
+# Receiver -> weight of an X.of(context)-style lookup; MediaQuery.of
+# depends on every metric, so it rebuilds far more often than the rest
+INHERITED_LOOKUPS = {
+    'Theme': 3,
+    'MediaQuery': 5,
+    'AppLocalizations': 3,
+    'Localizations': 3,
+    'Provider': 4,
+    'ScaffoldMessenger': 2,
+    'Navigator': 2,
+    'DefaultTextStyle': 3,
+}
+CONTEXT_LOOKUPS = {'watch': 4, 'select': 2, 'read': 0, 'dependOnInheritedWidgetOfExactType': 3}
+
+WIDGET_WEIGHT = 1
+CLOSURE_WEIGHT = 2
+# Nesting beyond this depth costs DEPTH_WEIGHT per level
+DEPTH_ALLOWANCE = 8
+DEPTH_WEIGHT = 2
+
+_CLOSURE_PRECEDERS = {'(', ',', ':', '=', '[', '?', 'return'}
+
+
+class MethodCost:
+    """Rebuild cost of one build method or helper."""
+
+    def __init__(self, path, span, line):
+        self.path = path
+        self.span = span
+        self.line = line
+        self.lookups = {}
+        self.widgets = 0
+        self.const_widgets = 0
+        self.closures = 0
+        self.depth = 0
+        self.calls = set()
+        self.inclusive = None
+
+    @property
+    def name(self):
+        return f'{self.span.class_name}.{self.span.name}' if self.span.class_name else self.span.name
+
+    @property
+    def lookup_count(self):
+        return sum(self.lookups.values())
+
+    @property
+    def repeated_lookups(self):
+        """Lookups of an ancestor already looked up in this method (hoistable)."""
+        return sum(count - 1 for count in self.lookups.values())
+
+    @property
+    def score(self):
+        lookup_cost = sum(_lookup_weight(key) * count for key, count in self.lookups.items())
+        return (
+            lookup_cost
+            + WIDGET_WEIGHT * self.widgets
+            + CLOSURE_WEIGHT * self.closures
+            + DEPTH_WEIGHT * max(0, self.depth - DEPTH_ALLOWANCE)
+        )
+
+    def as_dict(self):
+        return {
+            'method': self.name,
+            'file': self.path,
+            'line': self.line,
+            'score': self.score,
+            'inclusive_score': self.inclusive,
+            'lookups': dict(self.lookups),
+            'repeated_lookups': self.repeated_lookups,
+            'non_const_widgets': self.widgets,
+            'const_widgets': self.const_widgets,
+            'closures': self.closures,
+            'max_depth': self.depth,
+            'calls': sorted(self.calls),
+        }
+
+
+def _lookup_weight(key):
+    receiver, _, member = key.partition('.')
+    if receiver == 'context':
+        return CONTEXT_LOOKUPS.get(member, 1)
+    return INHERITED_LOOKUPS.get(receiver, 1)
+
+
+def _lookup_at(tokens, index):
+    """'Theme.of' / 'context.watch' style key when a lookup starts at index."""
+    token = tokens[index]
+    if token.kind != IDENT or index + 3 >= len(tokens) or tokens[index + 1].text != '.':
+        return None
+    member = tokens[index + 2].text
+    if token.text in INHERITED_LOOKUPS and (member == 'of' or member.endswith('Of')):
+        if tokens[index + 3].text in ('(', '<'):
+            return f'{token.text}.{member}'
+    if token.text == 'context' and member in CONTEXT_LOOKUPS and tokens[index + 3].text in ('(', '<'):
+        return f'context.{member}'
+    return None
+
+
+def widget_call(analysis, index):
+    """(key, open_index, close_index) when a widget/object constructor call starts at index."""
+    found = constructor_at(analysis.tokens, index)
+    if found is None:
+        return None
+    key, open_index = found
+    if not (key in analysis.constructors or ('.' not in key and key[0].isupper())):
+        return None
+    close_index = analysis.pairs.get(open_index)
+    if close_index is None:
+        return None
+    return key, open_index, close_index
+
+
+def closure_at(analysis, index):
+    """Index of the last body token when a function literal's `(` is at index, else None."""
+    tokens = analysis.tokens
+    if index == 0 or tokens[index].text != '(' or tokens[index - 1].text not in _CLOSURE_PRECEDERS:
+        return None
+    close_index = analysis.pairs.get(index)
+    if close_index is None:
+        return None
+    after = close_index + 1
+    if after < len(tokens) and tokens[after].text in ('async', 'sync'):
+        after += 1
+    if after >= len(tokens):
+        return None
+    if tokens[after].text == '{':
+        return analysis.pairs.get(after)
+    if tokens[after].text == '=' and after + 1 < len(tokens) and tokens[after + 1].text == '>':
+        # Expression body: up to the `,` `)` `]` or `;` that ends it
+        position = after + 2
+        while position < len(tokens) and tokens[position].text not in (',', ')', ']', ';', '}'):
+            text = tokens[position].text
+            position = analysis.pairs.get(position, position) + 1 if text in '([{' else position + 1
+        return position - 1
+    return None
+
+
+def _measure(method, analysis, first, last, helper_names):
+    """Fill method's counters from analysis.tokens[first:last]."""
+    tokens = analysis.tokens
+    open_widgets = []
+
+    for index in range(first, last):
+        token = tokens[index]
+        while open_widgets and index > open_widgets[-1]:
+            open_widgets.pop()
+
+        key = _lookup_at(tokens, index)
+        if key is not None:
+            method.lookups[key] = method.lookups.get(key, 0) + 1
+            continue
+
+        if token.kind == IDENT:
+            if token.text in helper_names and index + 1 < last and tokens[index + 1].text == '(':
+                method.calls.add(token.text)
+                continue
+            found = widget_call(analysis, index)
+            if found is None:
+                continue
+            if analysis.in_const[index]:
+                method.const_widgets += 1
+            else:
+                method.widgets += 1
+            open_widgets.append(found[2])
+            method.depth = max(method.depth, len(open_widgets))
+        elif token.kind == PUNCT and closure_at(analysis, index) is not None:
+            method.closures += 1
+
+
+def _inclusive(method, by_name, seen):
+    """Score of method plus the helpers it calls, each helper counted once."""
+    total = method.score
+    for name in sorted(method.calls):
+        helper = by_name.get(name)
+        if helper is not None and name not in seen:
+            seen.add(name)
+            total += _inclusive(helper, by_name, seen)
+    return total
+
+
+def analyze_file(path, source, symbols):
+    """MethodCost for every build method and widget helper in one file."""
+    index = SourceIndex(source)
+    spans = index.build_methods() + index.helper_methods()
+    if not spans:
+        return []
+    analysis = ConstAnalysis(source, path, symbols)
+    starts = [token.start for token in analysis.tokens]
+
+    methods = []
+    for span in spans:
+        line = source.count('\n', 0, span.start) + 1
+        method = MethodCost(path, span, line)
+        first = bisect.bisect_right(starts, span.body_start)
+        last = bisect.bisect_left(starts, span.body_end - 1)
+        helper_names = {s.name for s in spans if s.class_name == span.class_name and s is not span}
+        _measure(method, analysis, first, last, helper_names)
+        methods.append(method)
+
+    for method in methods:
+        by_name = {m.span.name: m for m in methods if m.span.class_name == method.span.class_name}
+        method.inclusive = _inclusive(method, by_name, {method.span.name})
+    return methods
+
+
+def analyze(patterns=DEFAULT_PATTERNS):
+    symbols = const_symbols()
+    methods = []
+    for path in dart_files(patterns):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading {path}: {e}")
+            continue
+        methods.extend(analyze_file(path, source, symbols))
+    return methods
+
+
+def print_report(methods, top=25):
+    ranked = sorted(methods, key=lambda m: (m.inclusive, m.score), reverse=True)
+    print(f"🏗️  Rebuild cost of {len(methods)} build methods and helpers (top {min(top, len(ranked))})")
+    print(f"   {'incl':>5} {'own':>5} {'lookups':>8} {'repeat':>6} {'widgets':>8} {'closures':>8} {'depth':>5}  method")
+    for method in ranked[:top]:
+        print(
+            f"   {method.inclusive:>5} {method.score:>5} {method.lookup_count:>8} {method.repeated_lookups:>6}"
+            f" {method.widgets:>8} {method.closures:>8} {method.depth:>5}  {method.name} ({method.path}:{method.line})"
+        )
+    hoistable = sum(m.repeated_lookups for m in methods)
+    print(f"\n   {hoistable} repeated inherited lookups could be hoisted into a local")
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank widget build methods by static rebuild cost')
+    parser.add_argument('patterns', nargs='*', default=list(DEFAULT_PATTERNS),
+                        help=f'glob patterns to analyze (default {DEFAULT_PATTERNS[0]})')
+    parser.add_argument('--top', type=int, default=25, help='methods to list (default 25)')
+    parser.add_argument('--json', metavar='PATH', help='also write every method as JSON to PATH')
+    args = parser.parse_args()
+
+    methods = analyze(args.patterns)
+    ranked = print_report(methods, args.top)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([method.as_dict() for method in ranked], f, indent=2)
+        print(f"   Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
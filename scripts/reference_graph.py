@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Declaration and usage index of lib/, for unused imports and dead code.
+
+Each Dart file gets a table of the top-level names it declares (classes,
+mixins, enums, extensions with their members, typedefs, functions and
+variables). The whole tree gets an index of the identifiers each file
+uses, including ones inside string interpolations and `[Name]` doc
+references. From the two:
+
+  unused imports   project imports none of whose exported names (after
+                   `show`/`hide`, through `export`s) the importing library
+                   uses; `as` imports are unused when the prefix is
+  dead files       Dart files main.dart cannot reach through imports,
+                   exports or parts, and editor/backup leftovers such as
+                   main_original.dart.bak
+  dead names       top-level declarations in live files that no live file
+                   references
+
+Imports of packages and dart: libraries are left alone; their exports are
+not in this tree.
+
+    python3 scripts/reference_graph.py
+    python3 scripts/reference_graph.py --fix --dry-run
+"""
+import argparse
+import fnmatch
+import json
+import os
+import posixpath
+import re
+from collections import Counter
+
+from dart_lexer import COMMENT, IDENT, STRING, tokenize
+from import_graph import DEFAULT_ENTRY, ROOT, iter_directives, resolve
+from project_config import package_name
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+# Left behind by editors and manual backups; never part of the build
+LEFTOVER_PATTERNS = ('*.bak', '*.bak[0-9]*', '*.orig', '*.old', '*.rej', '*~', '*_original.dart*')
+# Generated code is regenerated wholesale; its names are not worth flagging
+GENERATED = ('lib/generated/', 'lib/firebase_options.dart')
+
+_TYPE_KEYWORDS = {'class', 'mixin', 'enum', 'extension', 'typedef'}
+_INTERPOLATION = re.compile(r'\$(?:\{([^}]*)\}|([A-Za-z_]\w*))')
+_NAME = re.compile(r'(?<![\w$])[A-Za-z_]\w*')
+_DOC_REFERENCE = re.compile(r'\[([A-Za-z_][\w.]*)\]')
+
+
+class Declaration:
+    """A top-level name declared in a file."""
+
+    def __init__(self, name, kind, line):
+        self.name = name
+        self.kind = kind
+        self.line = line
+        self.members = set()
+
+    @property
+    def private(self):
+        return self.name.startswith('_')
+
+
+class DartFile:
+    """Directives, declarations and used identifiers of one Dart file."""
+
+    def __init__(self, path, source, package):
+        self.path = path
+        self.source = source
+        self.imports = []
+        self.exports = []
+        self.parts = []
+        self.part_of = False
+        for kind, uri, rest, start, end in iter_directives(source):
+            target = resolve(path, uri, package)
+            if kind == 'part':
+                if re.match(r'\s*of\b', rest) or uri == 'of':
+                    self.part_of = True
+                elif target:
+                    self.parts.append(target)
+                continue
+            entry = Import(uri, target, rest, start, end)
+            (self.imports if kind == 'import' else self.exports).append(entry)
+        if re.search(r'^\s*part\s+of\b', source, re.M):
+            self.part_of = True
+        tokens = list(tokenize(source))
+        self.declarations = _declarations([t for t in tokens if t.kind not in (STRING, COMMENT)], source)
+        self.uses = _uses(tokens, self.declarations)
+
+    @property
+    def has_main(self):
+        return 'main' in self.declarations
+
+    @property
+    def extension_members(self):
+        members = set()
+        for declaration in self.declarations.values():
+            if declaration.kind == 'extension':
+                members |= declaration.members
+        return members
+
+
+class Import:
+    """One import or export directive."""
+
+    def __init__(self, uri, target, rest, start, end):
+        self.uri = uri
+        self.target = target
+        self.start = start
+        self.end = end
+        prefix = re.search(r'\bas\s+(\w+)', rest)
+        self.prefix = prefix.group(1) if prefix else None
+        self.deferred = re.search(r'\bdeferred\b', rest) is not None
+        self.show = _combinator(rest, 'show')
+        self.hide = _combinator(rest, 'hide') or set()
+
+    @property
+    def local(self):
+        return self.target is not None and not self.target.startswith('package:')
+
+
+def _combinator(rest, keyword):
+    match = re.search(rf'\b{keyword}\s+([\w\s,]+?)(?=\b(?:show|hide)\b|$)', rest.strip())
+    if not match:
+        return None
+    return {name.strip() for name in match.group(1).split(',') if name.strip()}
+
+
+def _declarations(tokens, source):
+    """{name: Declaration} for the top-level declarations among the code tokens."""
+    found = {}
+
+    def declare(index, kind):
+        token = tokens[index]
+        if token.kind == IDENT and token.text not in found:
+            found[token.text] = Declaration(token.text, kind, source.count('\n', 0, token.start) + 1)
+            return found[token.text]
+        return None
+
+    depth = 0
+    statement = []
+    body_owner = None
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        text = token.text
+        if depth == 0 and text == '@':
+            # Annotation: @name, @a.b, optionally with arguments
+            index += 2
+            while index + 1 < len(tokens) and tokens[index].text == '.':
+                index += 2
+            if index < len(tokens) and tokens[index].text == '(':
+                nesting = 0
+                while index < len(tokens):
+                    nesting += {'(': 1, ')': -1}.get(tokens[index].text, 0)
+                    index += 1
+                    if nesting == 0:
+                        break
+            continue
+        if text in '([{':
+            if depth == 0 and text == '{' and '=' not in statement:
+                body_owner = _declare_statement(statement, tokens, declare)
+                statement = []
+            elif depth == 0:
+                statement.append(text)
+                statement.append(index)
+            depth += 1
+        elif text in ')]}':
+            depth -= 1
+            if depth == 0:
+                body_owner = None
+        elif depth == 0:
+            if text == ';':
+                _declare_statement(statement, tokens, declare)
+                statement = []
+            else:
+                statement.append(text)
+                statement.append(index)
+        elif depth == 1 and body_owner is not None and body_owner.kind == 'extension':
+            # Extension members are used as `x.member`, never by the extension's name
+            following = tokens[index + 1].text if index + 1 < len(tokens) else ''
+            previous = tokens[index - 1].text if index else ''
+            if token.kind == IDENT and (following in ('(', '=', '{') or previous == 'get'):
+                body_owner.members.add(text)
+        index += 1
+    return found
+
+
+def _declare_statement(statement, tokens, declare):
+    """Record the name a depth-0 statement (flattened as text, index pairs) declares."""
+    texts = statement[0::2]
+    indexes = statement[1::2]
+    if not texts or texts[0] in ('import', 'export', 'part', 'library'):
+        return None
+    for keyword in _TYPE_KEYWORDS:
+        if keyword in texts:
+            position = texts.index(keyword) + 1
+            if position >= len(texts) or (keyword == 'extension' and texts[position] == 'on'):
+                return None
+            return declare(indexes[position], keyword)
+    if 'get' in texts and texts.index('get') + 1 < len(texts):
+        return declare(indexes[texts.index('get') + 1], 'getter')
+    if 'set' in texts and texts.index('set') + 1 < len(texts):
+        return declare(indexes[texts.index('set') + 1], 'setter')
+    stops = [texts.index(stop) for stop in ('(', '=') if stop in texts]
+    end = min(stops) if stops else len(texts)
+    if end == 0:
+        return None
+    kind = 'function' if '(' in texts and texts.index('(') == end else 'variable'
+    return declare(indexes[end - 1], kind)
+
+
+def _uses(tokens, declarations):
+    """Counter of the identifiers a file uses (declaration sites excluded)."""
+    uses = Counter()
+    declared_at = {(d.name, d.line) for d in declarations.values()}
+    for token in tokens:
+        if token.kind == IDENT:
+            uses[token.text] += 1
+        elif token.kind == STRING and '$' in token.text:
+            for braced, bare in _INTERPOLATION.findall(token.text):
+                names = [bare] if bare else _NAME.findall(braced)
+                uses.update(names)
+        elif token.kind == COMMENT and token.text.startswith('///'):
+            for reference in _DOC_REFERENCE.findall(token.text):
+                uses.update(reference.split('.'))
+    for name, _ in declared_at:
+        uses[name] -= 1
+    return +uses
+
+
+class ReferenceGraph:
+    """Declarations, uses and directives of every Dart file under lib/."""
+
+    def __init__(self, files, others=()):
+        self.files = files
+        self.others = list(others)
+        self._exported = {}
+
+    @classmethod
+    def build(cls, root=ROOT, package=None):
+        package = package or package_name()
+        files = {}
+        others = []
+        for directory, subdirs, names in os.walk(root):
+            subdirs.sort()
+            for name in sorted(names):
+                path = posixpath.join(directory.replace(os.sep, '/'), name)
+                if not name.endswith('.dart'):
+                    others.append(path)
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        files[path] = DartFile(path, f.read(), package)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"❌ Error reading {path}: {e}")
+        return cls(files, others)
+
+    def library(self, path):
+        """A file and its parts."""
+        dart_file = self.files[path]
+        return [dart_file] + [self.files[part] for part in dart_file.parts if part in self.files]
+
+    def exported(self, path, trail=frozenset()):
+        """(names, extension members) a library exports, following its export directives."""
+        if path in self._exported:
+            return self._exported[path]
+        if path not in self.files or path in trail:
+            return set(), set()
+        names = set()
+        members = set()
+        for dart_file in self.library(path):
+            names |= {name for name, d in dart_file.declarations.items() if not d.private}
+            members |= dart_file.extension_members
+        for export in self.files[path].exports:
+            if export.local:
+                more, more_members = self.exported(export.target, trail | {path})
+                if export.show is not None:
+                    more = more & export.show
+                names |= more - export.hide
+                members |= more_members
+        self._exported[path] = names, members
+        return names, members
+
+    def is_unused(self, path, directive):
+        """True when nothing in the library at path uses what directive imports."""
+        if not directive.local or directive.target not in self.files:
+            return False
+        uses = Counter()
+        for dart_file in self.library(path):
+            uses.update(dart_file.uses)
+        if directive.prefix:
+            return uses[directive.prefix] == 0
+        names, members = self.exported(directive.target)
+        if directive.show is not None:
+            names = names & directive.show
+        names = names - directive.hide
+        return not any(uses[name] for name in names) and not any(uses[name] for name in members)
+
+    def unused_imports(self):
+        """{path: [Import]} of the project imports nothing uses."""
+        result = {}
+        for path, dart_file in self.files.items():
+            unused = [directive for directive in dart_file.imports if self.is_unused(path, directive)]
+            if unused:
+                result[path] = unused
+        return result
+
+    def reachable(self, entries=(DEFAULT_ENTRY,)):
+        seen = {entry for entry in entries if entry in self.files}
+        stack = list(seen)
+        while stack:
+            dart_file = self.files[stack.pop()]
+            targets = [d.target for d in dart_file.imports + dart_file.exports if d.local] + dart_file.parts
+            for target in targets:
+                if target in self.files and target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    def dead_files(self, entries=(DEFAULT_ENTRY,)):
+        """(unreachable Dart files, leftover non-Dart files)."""
+        live = self.reachable(entries)
+        unreachable = sorted(path for path in self.files if path not in live)
+        leftovers = sorted(
+            path for path in self.others
+            if any(fnmatch.fnmatch(posixpath.basename(path), pattern) for pattern in LEFTOVER_PATTERNS)
+        )
+        return unreachable, leftovers
+
+    def dead_declarations(self, entries=(DEFAULT_ENTRY,)):
+        """(path, Declaration) for top-level names no live file references."""
+        live = self.reachable(entries)
+        used = Counter()
+        for path in live:
+            used.update(self.files[path].uses)
+        dead = []
+        for path in sorted(live):
+            if path.startswith(GENERATED):
+                continue
+            for declaration in self.files[path].declarations.values():
+                if declaration.name == 'main' or used[declaration.name]:
+                    continue
+                if declaration.members and any(used[member] for member in declaration.members):
+                    continue
+                dead.append((path, declaration))
+        return dead
+
+
+def remove_imports(dart_file, directives):
+    """Source of dart_file without the given directives (each with its line break)."""
+    source = dart_file.source
+    for directive in sorted(directives, key=lambda d: -d.start):
+        end = directive.end
+        if source[end:end + 1] == '\n':
+            end += 1
+        source = source[:directive.start] + source[end:]
+    return source
+
+
+def remove_unused_imports(graph):
+    """Drop every unused project import. Returns the number removed."""
+    removed = 0
+    for path, directives in graph.unused_imports().items():
+        dart_file = graph.files[path]
+        if write_source(path, remove_imports(dart_file, directives), dart_file.source):
+            removed += len(directives)
+            print(f"✂️  {path}: removed {', '.join(repr(d.uri) for d in directives)}")
+    return removed
+
+
+def print_report(graph, limit=20):
+    unused = graph.unused_imports()
+    unreachable, leftovers = graph.dead_files()
+    dead = graph.dead_declarations()
+    main_files = [path for path in unreachable if graph.files[path].has_main]
+    total = sum(len(directives) for directives in unused.values())
+    print(f"🕸️  {len(graph.files)} Dart files: {total} unused project imports in {len(unused)} files, "
+          f"{len(unreachable)} unreachable files, {len(leftovers)} leftovers, {len(dead)} unreferenced declarations")
+    for path, directives in list(unused.items())[:limit]:
+        print(f"   import  {path}: {', '.join(d.uri for d in directives)}")
+    for path in unreachable[:limit]:
+        note = ' (has its own main())' if path in main_files else ''
+        print(f"   file    {path}{note} ({len(graph.files[path].source):,} bytes)")
+    for path in leftovers:
+        print(f"   backup  {path} ({os.path.getsize(path):,} bytes)")
+    for path, declaration in dead[:limit]:
+        print(f"   {declaration.kind:<7} {declaration.name} ({path}:{declaration.line})")
+    if len(dead) > limit:
+        print(f"   ... and {len(dead) - limit} more unreferenced declarations")
+    return {
+        'unused_imports': {path: [d.uri for d in directives] for path, directives in unused.items()},
+        'unreachable_files': unreachable,
+        'leftovers': leftovers,
+        'unreferenced': [
+            {'file': path, 'name': d.name, 'kind': d.kind, 'line': d.line} for path, d in dead
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find unused imports, dead files and unreferenced declarations in lib/')
+    parser.add_argument('--fix', action='store_true', help='remove the unused project imports')
+    parser.add_argument('--limit', type=int, default=20, help='entries to list per section (default 20)')
+    parser.add_argument('--json', metavar='PATH', help='also write the full report as JSON to PATH')
+    add_dry_run_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+
+    graph = ReferenceGraph.build()
+    report = print_report(graph, args.limit)
+    if args.fix:
+        removed = remove_unused_imports(graph)
+        print(f"✅ Removed {removed} unused imports")
+        print_summary()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"   Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
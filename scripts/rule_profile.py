@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-rule profiling for the fixer scripts.
+
+With --profile PATH every rule application is timed and recorded with the
+rule name, file, bytes scanned, match count and whether it changed the
+file. At the end of the run a table sorted by total time is printed and
+PATH is written as JSON: per-rule totals under "rules" and one complete
+event per application under "traceEvents", so the same file opens in
+chrome://tracing or Perfetto. Without the flag a rule costs one
+environment lookup.
+"""
+import json
+import os
+import re
+import time
+
+PROFILE_ENV = 'ZYRAFLOW_RULE_PROFILE'
+
+# (rule, path, start_ns, duration_ns, bytes, matches, modified, pid) per application
+records = []
+
+
+def enable_profile(path):
+    """Record rule timings into path, including in worker processes."""
+    os.environ[PROFILE_ENV] = os.path.abspath(path)
+
+
+def profile_enabled():
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+def add_profile_argument(parser):
+    parser.add_argument(
+        '--profile', metavar='TRACE_JSON',
+        help='time every rule and write a JSON / Chrome trace file to TRACE_JSON',
+    )
+
+
+def record(rule, path, start_ns, duration_ns, scanned, matches, modified):
+    records.append((rule, path, start_ns, duration_ns, scanned, matches, modified, os.getpid()))
+
+
+def profile_rule(rule, path, func, content):
+    """Run func(content) -> (new_content, match_count), recording it when profiling."""
+    if not profile_enabled():
+        return func(content)
+    start = time.perf_counter_ns()
+    new_content, count = func(content)
+    duration = time.perf_counter_ns() - start
+    record(rule, path, start, duration, len(content), count, new_content != content)
+    return new_content, count
+
+
+def subn(rule, path, pattern, replacement, content, flags=0):
+    """re.subn() recorded under the rule name; returns (new_content, count)."""
+    return profile_rule(rule, path, lambda text: re.subn(pattern, replacement, text, flags=flags), content)
+
+
+def snapshot():
+    """Marker used to collect the records a worker process made."""
+    return len(records)
+
+
+def since(marker):
+    return records[marker:]
+
+
+def merge(new_records):
+    """Fold records reported by a worker process into this process."""
+    records.extend(new_records)
+
+
+def summarize(entries=None):
+    """Per-rule totals, slowest rule first."""
+    totals = {}
+    for rule, path, _, duration, scanned, matches, modified, _ in records if entries is None else entries:
+        total = totals.setdefault(rule, {
+            'rule': rule, 'calls': 0, 'seconds': 0.0, 'bytes': 0, 'matches': None,
+            'files_modified': 0, 'slowest_file': None, 'slowest_seconds': 0.0,
+        })
+        seconds = duration / 1e9
+        total['calls'] += 1
+        total['seconds'] += seconds
+        total['bytes'] += scanned
+        # Rules that only return new text report no count
+        if matches is not None:
+            total['matches'] = (total['matches'] or 0) + matches
+        if modified:
+            total['files_modified'] += 1
+        if seconds > total['slowest_seconds']:
+            total['slowest_seconds'] = seconds
+            total['slowest_file'] = path
+    return sorted(totals.values(), key=lambda total: total['seconds'], reverse=True)
+
+
+def trace_events(entries=None):
+    """Chrome trace "complete" events, one per rule application."""
+    entries = records if entries is None else entries
+    origin = min((entry[2] for entry in entries), default=0)
+    return [
+        {
+            'name': rule,
+            'cat': 'rule',
+            'ph': 'X',
+            'ts': (start - origin) / 1000,
+            'dur': duration / 1000,
+            'pid': pid,
+            'tid': pid,
+            'args': {'file': path, 'bytes': scanned, 'matches': matches, 'modified': modified},
+        }
+        for rule, path, start, duration, scanned, matches, modified, pid in entries
+    ]
+
+
+def print_table(totals):
+    print(f"\n⏱️  Rule profile ({len(records)} rule applications)")
+    print(f"   {'rule':<44} {'calls':>6} {'total ms':>9} {'max ms':>8} {'MB':>7} {'MB/s':>7} {'matches':>8} {'files':>6}  slowest file")
+    for total in totals:
+        seconds = total['seconds']
+        megabytes = total['bytes'] / (1024 * 1024)
+        rate = f"{megabytes / seconds:.1f}" if seconds > 0 else '-'
+        matches = '-' if total['matches'] is None else total['matches']
+        print(
+            f"   {total['rule'][:44]:<44} {total['calls']:>6} {seconds * 1000:>9.1f}"
+            f" {total['slowest_seconds'] * 1000:>8.2f} {megabytes:>7.2f} {rate:>7}"
+            f" {matches:>8} {total['files_modified']:>6}  {total['slowest_file']}"
+        )
+
+
+def report_profile():
+    """Print the per-rule table and write the trace file, if profiling is on."""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return None
+    totals = summarize()
+    print_table(totals)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'rules': totals, 'traceEvents': trace_events(), 'displayTimeUnit': 'ms'}, f, indent=1)
+    print(f"   Trace written to {path}")
+    return totals
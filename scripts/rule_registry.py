@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Rule registry with a literal-anchor prefilter for the Dart fixers.
+
+Each rule declares the literal strings its pattern cannot match without
+(for example '.withOpacity(' or 'surfaceVariant:'). Before running a
+rule's regex the registry checks whether any of its anchors occur in the
+file, sharing the result between rules with the same anchor, and skips
+rules that cannot fire.
+"""
+import os
+import re
+
+from rule_profile import profile_rule
+
+REPORT_ENV = 'ZYRAFLOW_RULE_REPORT'
+
+
+def enable_report():
+    """Print per-file executed/skipped rule counts, including in worker processes."""
+    os.environ[REPORT_ENV] = '1'
+
+
+def report_enabled():
+    return os.environ.get(REPORT_ENV) == '1'
+
+
+def add_report_argument(parser):
+    parser.add_argument(
+        '--report-rules', action='store_true',
+        help='print how many rules each file executed versus skipped',
+    )
+
+
+class Rule:
+    """A single find/replace rule guarded by literal anchors."""
+
+    def __init__(self, name, pattern, replacement, anchors=(), flags=0, literal=False, message=None):
+        # name is a short stable id for reports and profiles; message is for people
+        self.name = name
+        self.message = message or name
+        self.literal = literal
+        self.pattern = pattern if literal else re.compile(pattern, flags)
+        self.replacement = replacement
+        # A literal rule is its own anchor
+        self.anchors = tuple(anchors) or ((pattern,) if literal else ())
+
+    def __repr__(self):
+        # Stable across runs so it can feed codemod_cache.rules_version()
+        pattern = self.pattern if self.literal else (self.pattern.pattern, self.pattern.flags)
+        replacement = getattr(self.replacement, '__qualname__', self.replacement)
+        return f'Rule({self.name!r}, {pattern!r}, {replacement!r}, {self.anchors!r})'
+
+    def apply(self, content):
+        """Return (new_content, match_count)."""
+        if self.literal:
+            count = content.count(self.pattern)
+            if count:
+                content = content.replace(self.pattern, self.replacement)
+            return content, count
+        return self.pattern.subn(self.replacement, content)
+
+
+class RuleSet:
+    """An ordered list of rules applied with the anchor prefilter."""
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = list(rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def message(self, name):
+        """The human-readable message of the rule called name."""
+        return next(rule.message for rule in self.rules if rule.name == name)
+
+    def __repr__(self):
+        return f'RuleSet({self.name!r}, {self.rules!r})'
+
+    def apply(self, content, file_path=None):
+        """Apply every rule that can fire; returns (content, fired_rule_names)."""
+        present = {}
+        fired = []
+        executed = skipped = 0
+
+        for rule in self.rules:
+            if rule.anchors:
+                can_fire = False
+                for anchor in rule.anchors:
+                    if anchor not in present:
+                        present[anchor] = anchor in content
+                    if present[anchor]:
+                        can_fire = True
+                        break
+                if not can_fire:
+                    skipped += 1
+                    continue
+
+            executed += 1
+            new_content, count = profile_rule(f'{self.name}:{rule.name}', file_path, rule.apply, content)
+            if count:
+                fired.append(rule.name)
+                if new_content != content:
+                    content = new_content
+                    # A replacement may introduce or remove anchors
+                    present.clear()
+
+        if file_path is not None and report_enabled():
+            print(f"   🔎 {self.name} {file_path}: {executed} rules executed, {skipped} skipped")
+        return content, fired
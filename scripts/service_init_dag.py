@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Schedule the service initializations in lib/main.dart as dependency waves.
+
+Finds every class under lib/ with an `initialize()` method and the other
+services (and Firebase) it references while initializing: the initialize
+body, the methods of the class it calls and the field initializers. The
+init tasks awaited by `_initializeCriticalServices` and
+`_initializeNonCriticalServices` are then ordered by that graph.
+`Future.wait` waves replace the fixed sequence, and inline try-blocks
+move into `_initialize<Name>()` wrappers so every task is one call.
+
+Every other statement (code without `await`, `Future.delayed` pauses)
+stays where it is relative to the tasks: tasks are only regrouped within
+the run between two such statements, never moved across one, since the
+statement may rely on the tasks before it or be a deliberate pause.
+
+A task stays critical (awaited before runApp) only if the first frame
+needs it: its service is reachable from main.dart's app code, the router
+or the providers built in main.dart, or a critical task depends on it.
+The other critical tasks are deferred to the start of the non-critical
+batch, unless a statement after them in the critical function may
+rely on them. Tasks are never promoted; services that initialize lazily keep doing so.
+
+The critical-path estimate counts the `await`s on the longest path, each
+taken as one I/O round trip. A wave costs its slowest task, and
+`Future.delayed` time is listed separately.
+
+    python3 scripts/service_init_dag.py --dry-run
+    python3 scripts/service_init_dag.py
+"""
+import argparse
+import re
+
+from dart_corpus import dart_files
+from dart_index import SourceIndex
+from dart_lexer import IDENT, mask_non_code
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+MAIN = 'lib/main.dart'
+CRITICAL = '_initializeCriticalServices'
+NON_CRITICAL = '_initializeNonCriticalServices'
+# Code that runs before the first frame besides main.dart itself
+FIRST_FRAME_FILES = ('lib/core/routing/app_router.dart',)
+FIREBASE = 'Firebase'
+
+_DELAY = re.compile(r'Future\.delayed\(\s*(?:const\s+)?Duration\(\s*milliseconds:\s*(\d+)\s*\)')
+_CALL = re.compile(r'\b(_\w+)\(\)')
+
+
+class Service:
+    """A class with an initialize() method, as far as startup ordering cares."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.references = set()
+        self.cost = 1
+
+
+class Task:
+    """One awaited step of an init function: a wrapper call or an inline block."""
+
+    def __init__(self, call, services, inline=None, comment=''):
+        self.call = call
+        self.services = services
+        self.inline = inline
+        self.comment = comment
+        self.cost = 0
+        self.after = set()
+
+    def __repr__(self):
+        return f'{self.call}()'
+
+
+class Statement:
+    """Code between the tasks that is not a service init; it keeps its place."""
+
+    def __init__(self, text, comment=''):
+        self.text = text
+        self.comment = comment
+
+
+def _service_name(name):
+    """Service class for a referenced identifier; FirebaseAuth & co. count as Firebase."""
+    return FIREBASE if name.startswith(FIREBASE) else name
+
+
+def find_services(patterns=('lib/**/*.dart',)):
+    """{class name: Service} for every class declaring initialize()."""
+    found = {}
+    indexes = []
+    for path in dart_files(patterns):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = SourceIndex(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading {path}: {e}")
+            continue
+        for span in index.methods:
+            if span.name == 'initialize' and span.class_name and span.class_name not in found:
+                found[span.class_name] = Service(span.class_name, path)
+                indexes.append((index, span.class_name))
+
+    names = set(found) | {FIREBASE}
+    for index, class_name in indexes:
+        service = found[class_name]
+        methods = {span.name: span for span in index.methods if span.class_name == class_name}
+        reachable = ['initialize']
+        awaits = 0
+        for name in reachable:
+            for token in index.body_tokens(methods[name]):
+                if token.kind != IDENT:
+                    continue
+                if token.text == 'await':
+                    awaits += 1
+                elif token.text in methods and token.text not in reachable:
+                    reachable.append(token.text)
+                elif _service_name(token.text) in names:
+                    service.references.add(_service_name(token.text))
+        # Field initializers run when the instance is created
+        class_span = next(span for span in index.classes if span.name == class_name)
+        bodies = [span.body_tokens for span in methods.values()]
+        first, last = class_span.body_tokens
+        for position in range(first + 1, last):
+            token = index.tokens[position]
+            if token.kind == IDENT and not any(start < position < end for start, end in bodies):
+                if _service_name(token.text) in names:
+                    service.references.add(_service_name(token.text))
+        service.references.discard(class_name)
+        service.cost = max(awaits, 1)
+    return found
+
+
+def dependencies(services):
+    """{service: every service it transitively needs initialized}."""
+    closure = {}
+
+    def visit(name, trail):
+        if name in closure:
+            return closure[name]
+        if name in trail:
+            return set()
+        needed = set()
+        for reference in services[name].references if name in services else ():
+            needed.add(reference)
+            needed |= visit(reference, trail | {name})
+        closure[name] = needed
+        return needed
+
+    for name in services:
+        visit(name, frozenset())
+    return closure
+
+
+def _referenced(text, services):
+    """Services named in the code (not the strings or comments) of text."""
+    return {
+        _service_name(name) for name in re.findall(r'\b[A-Z]\w*', mask_non_code(text))
+        if _service_name(name) in services or _service_name(name) == FIREBASE
+    }
+
+
+def _statements(index, span):
+    """(start, end) offsets of the top-level statements in a function body, comments excluded."""
+    tokens = index.tokens
+    first, last = span.body_tokens
+    statements = []
+    start = None
+    depth = 0
+    position = first + 1
+    while position < last:
+        token = tokens[position]
+        if start is None:
+            start = token.start
+        if token.text in '([{':
+            depth += 1
+        elif token.text in ')]}':
+            depth -= 1
+            if depth == 0 and token.text == '}':
+                following = tokens[position + 1].text if position + 1 < last else ''
+                if following not in ('catch', 'on', 'finally', 'else'):
+                    statements.append((start, token.end))
+                    start = None
+        elif token.text == ';' and depth == 0:
+            statements.append((start, token.end))
+            start = None
+        position += 1
+    return statements
+
+
+def _comment_before(source, start):
+    """Comment lines directly above offset start."""
+    lines = source[:start].split('\n')[:-1]
+    comment = []
+    while lines and lines[-1].strip().startswith('//'):
+        comment.insert(0, lines.pop().strip())
+    return '\n'.join(comment)
+
+
+def _wrapper_name(services, taken):
+    name = sorted(services)[0] if services else 'Step'
+    for suffix in ('Service', 'Engine'):
+        if name.endswith(suffix) and name != suffix:
+            name = name[:-len(suffix)]
+            break
+    call = f'_initialize{name}'
+    while call in taken:
+        call += '_'
+    return call
+
+
+class InitPlan:
+    """The init tasks of main.dart and their schedule."""
+
+    def __init__(self, source, services, first_frame=()):
+        self.source = source
+        self.index = SourceIndex(source)
+        self.services = services
+        self.closure = dependencies(services)
+        self.functions = {span.name: span for span in self.index.methods if span.class_name is None}
+        self.trailing = {}
+        self.critical_steps = self._steps(CRITICAL)
+        self.non_critical_steps = self._steps(NON_CRITICAL)
+        self.critical = [step for step in self.critical_steps if isinstance(step, Task)]
+        self.non_critical = [step for step in self.non_critical_steps if isinstance(step, Task)]
+        self.needed = self._first_frame_services(first_frame)
+
+    def _steps(self, function):
+        """The Tasks and Statements of one init function, in source order."""
+        span = self.functions[function]
+        source = self.source
+        steps = []
+        taken = set(self.functions)
+        statements = _statements(self.index, span)
+        tail = source[statements[-1][1] if statements else span.body_start + 1:span.body_end - 1]
+        self.trailing[function] = '\n'.join(
+            line.strip() for line in tail.split('\n') if line.strip().startswith('//')
+        )
+        for start, end in statements:
+            text = source[start:end]
+            comment = _comment_before(source, start)
+            if 'await' not in text or _DELAY.search(text):
+                steps.append(Statement(text, comment))
+                continue
+            calls = _CALL.findall(text) if re.match(r'await\s+(?:Future\.wait\(\s*\[|_\w+\(\))', text) else []
+            if calls:
+                for call in calls:
+                    wrapper = self.functions.get(call)
+                    body = source[wrapper.body_start:wrapper.body_end] if wrapper else ''
+                    steps.append(Task(call, _referenced(body, self.services)))
+                continue
+            services = _referenced(text, self.services)
+            call = _wrapper_name(services, taken)
+            taken.add(call)
+            steps.append(Task(call, services, inline=text, comment=comment))
+        for task in steps:
+            if isinstance(task, Task):
+                task.cost = sum(
+                    self.services[name].cost if name in self.services else 1 for name in task.services
+                )
+        return steps
+
+    def _first_frame_services(self, extra):
+        """Services the code that builds the first frame can reach."""
+        init_spans = [
+            span for name, span in self.functions.items()
+            if name == 'main' or name.startswith('_initialize')
+        ]
+        app_code = self.source
+        for span in sorted(init_spans, key=lambda s: -s.start):
+            app_code = app_code[:span.start] + app_code[span.body_end:]
+        texts = [app_code]
+        constructed = set(re.findall(r'\b([A-Z]\w*Provider)\(\)', app_code))
+        for path in FIRST_FRAME_FILES + tuple(
+                path for path in dart_files(['lib/**/providers/*.dart'])
+                if any(f'class {name} ' in _read(path) for name in constructed)):
+            texts.append(_read(path))
+        needed = set(extra)
+        for text in texts:
+            needed |= _referenced(text, self.services)
+        for name in list(needed):
+            needed |= self.closure.get(name, set())
+        return needed
+
+    def pinned(self):
+        """Critical tasks a later statement of the critical function may rely on."""
+        pinned = []
+        for position, step in enumerate(self.critical_steps):
+            if isinstance(step, Task) and any(isinstance(later, Statement) for later in self.critical_steps[position + 1:]):
+                pinned.append(step)
+        return pinned
+
+    def schedule(self):
+        """(critical blocks, non-critical blocks, deferred tasks); see _blocks."""
+        pinned = self.pinned()
+        deferred = [
+            task for task in self.critical
+            if task not in pinned and (not task.services or not (task.services & self.needed))
+        ]
+        critical = [task for task in self.critical if task not in deferred]
+        # Dependencies of what stays critical stay critical
+        changed = True
+        while changed:
+            changed = False
+            needed = set().union(*(self._needs(task) for task in critical)) if critical else set()
+            for task in list(deferred):
+                if task.services & needed:
+                    deferred.remove(task)
+                    critical.append(task)
+                    changed = True
+        deferred.sort(key=self.critical.index)
+        critical_steps = [step for step in self.critical_steps if step not in deferred]
+        # Deferred tasks run first in the non-critical batch, so no statement there runs before them
+        return self._blocks(critical_steps), self._blocks(deferred + self.non_critical_steps), deferred
+
+    def _blocks(self, steps):
+        """Statements kept in place and, for each run of tasks between them, its waves.
+
+        Returns a list of Statements and wave lists (lists of lists of Tasks).
+        """
+        blocks = []
+        run = []
+        for step in steps + [None]:
+            if isinstance(step, Task):
+                run.append(step)
+                continue
+            if run:
+                blocks.append(self._waves(run))
+                run = []
+            if step is not None:
+                blocks.append(step)
+        return blocks
+
+    def _needs(self, task):
+        needed = set()
+        for name in task.services:
+            needed |= self.closure.get(name, set())
+        return needed - task.services
+
+    def _waves(self, tasks):
+        """Longest-path layering: each task runs one wave after its last dependency."""
+        level = {}
+        for task in tasks:
+            task.after = {other for other in tasks if other is not task and other.services & self._needs(task)}
+        remaining = list(tasks)
+        while remaining:
+            ready = [task for task in remaining if all(dep in level for dep in task.after)]
+            if not ready:
+                # A dependency cycle: keep the remaining tasks in their original order
+                names = ', '.join(task.call for task in remaining)
+                print(f"⚠️ Dependency cycle between {names}; running them one after another")
+                base = max(level.values(), default=-1) + 1
+                for offset, task in enumerate(remaining):
+                    level[task] = base + offset
+                break
+            for task in ready:
+                level[task] = max((level[dep] + 1 for dep in task.after), default=0)
+                remaining.remove(task)
+        waves = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for task in tasks:
+            waves[level[task]].append(task)
+        return waves
+
+    def render(self, critical, non_critical):
+        """main.dart with both init functions regenerated and inline tasks extracted."""
+        functions = self.functions
+        edits = [
+            (functions[CRITICAL], self._body(critical, 'Services the first frame needs', self.trailing[CRITICAL])),
+            (functions[NON_CRITICAL], self._body(non_critical, 'Everything else', self.trailing[NON_CRITICAL])),
+        ]
+        wrappers = ''.join(
+            f"\nFuture<void> {task.call}() async {{\n"
+            + (f"  {task.comment.replace(chr(10), chr(10) + '  ')}\n" if task.comment else '')
+            + f"  {task.inline}\n}}\n"
+            for task in self.critical + self.non_critical if task.inline
+        )
+        source = self.source
+        for span, body in sorted(edits, key=lambda edit: -edit[0].start):
+            source = source[:span.body_start] + body + source[span.body_end:]
+        if wrappers:
+            span = SourceIndex(source).method(NON_CRITICAL)
+            source = source[:span.body_end] + '\n' + wrappers.rstrip('\n') + source[span.body_end:]
+        return source
+
+    @staticmethod
+    def _body(blocks, title, trailing=''):
+        lines = ['{']
+        titled = False
+        previous = None
+        for block in blocks:
+            if isinstance(block, Statement):
+                if isinstance(previous, list):
+                    lines.append('')
+                if block.comment:
+                    lines.extend(f'  {line}' for line in block.comment.split('\n'))
+                lines.append(f'  {block.text}')
+                previous = block
+                continue
+            if previous is not None:
+                lines.append('')
+            if not titled:
+                lines.append(f'  // {title}, in dependency waves (scripts/service_init_dag.py)')
+                titled = True
+            for wave in block:
+                if len(wave) == 1:
+                    lines.append(f'  await {wave[0].call}();')
+                else:
+                    lines.append('  await Future.wait([')
+                    lines.extend(f'    {task.call}(),' for task in wave)
+                    lines.append('  ]);')
+            previous = block
+        if trailing:
+            lines.append('')
+            lines.extend(f'  {line}' for line in trailing.split('\n'))
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+def _read(path, _cache={}):
+    if path not in _cache:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _cache[path] = f.read()
+        except OSError:
+            _cache[path] = ''
+    return _cache[path]
+
+
+def critical_path(source, services):
+    """(awaits before runApp, awaits until every service is up, delay ms) for a main.dart."""
+    plan = InitPlan(source, services)
+    index = plan.index
+
+    def path(function):
+        span = plan.functions[function]
+        tasks = {step.call: step for step in plan._steps(function) if isinstance(step, Task)}
+        inline = iter(task for task in tasks.values() if task.inline)
+        cost = 0
+        delay = 0
+        for start, end in _statements(index, span):
+            text = source[start:end]
+            match = _DELAY.search(text)
+            if match:
+                delay += int(match.group(1))
+                continue
+            if 'await' not in text:
+                continue
+            calls = _CALL.findall(text) if re.match(r'await\s+(?:Future\.wait\(\s*\[|_\w+\(\))', text) else []
+            group = [tasks[call] for call in calls if call in tasks]
+            if not group:
+                task = next(inline, None)
+                # An await that is neither a known task nor an extracted block counts as one round trip
+                group = [task] if task is not None else []
+            cost += max((task.cost for task in group), default=1)
+        return cost, delay
+
+    critical, critical_delay = path(CRITICAL)
+    rest, rest_delay = path(NON_CRITICAL)
+    return critical, critical + rest, critical_delay + rest_delay
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reorder the service initialization in lib/main.dart into dependency waves')
+    parser.add_argument('--main', default=MAIN, help=f'entry point to rewrite (default {MAIN})')
+    parser.add_argument('--first-frame', action='append', default=[], metavar='SERVICE',
+                        help='treat SERVICE as needed by the first frame (repeatable)')
+    add_dry_run_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+
+    services = find_services()
+    source = _read(args.main)
+    plan = InitPlan(source, services, args.first_frame)
+    critical, non_critical, deferred = plan.schedule()
+
+    print(f"🧭 {len(services)} services with initialize(); first frame needs: "
+          f"{', '.join(sorted(plan.needed & (set(services) | {FIREBASE}))) or 'none'}")
+    for title, blocks in (('critical', critical), ('non-critical', non_critical)):
+        number = 0
+        for block in blocks:
+            if isinstance(block, Statement):
+                print(f"   📌 {title}, kept in place: {block.text.splitlines()[0]}")
+                continue
+            for wave in block:
+                number += 1
+                calls = ', '.join(f"{task.call} [{task.cost}]" for task in wave)
+                print(f"   {title} wave {number}: {calls}")
+    for task in deferred:
+        print(f"   ⏭️  deferred past the first frame: {task.call}")
+    for task in plan.pinned():
+        if not task.services & plan.needed:
+            print(f"   📌 kept critical, a later statement may rely on it: {task.call}")
+
+    new_source = plan.render(critical, non_critical)
+    before = critical_path(source, services)
+    after = critical_path(new_source, services)
+    print(f"⏱️  Critical path (awaits): first frame {before[0]} → {after[0]}, "
+          f"all services {before[1]} → {after[1]} (+{after[2]} ms of delays)")
+    if new_source != source and after[:2] >= before[:2]:
+        print(f"✅ No shorter schedule for {args.main}; left unchanged")
+    elif write_source(args.main, new_source, source):
+        print(f"✅ Rescheduled service initialization in {args.main}")
+    else:
+        print(f"✅ {args.main} already initializes services in dependency order")
+    print_summary()
+
+
+if __name__ == '__main__':
+    main()
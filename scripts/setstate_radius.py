@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+setState blast radius of stateful screens.
+
+For every `State` subclass, finds the fields each `setState` call mutates
+and the places in `build` (and the helpers it calls) that read them. A
+setState rebuilds the whole build tree. Only the innermost widgets that
+read a mutated field actually need it, so the rest is wasted work. The
+report gives both numbers for each call, counted in widget constructor
+calls, and ranks the subtrees worth extracting into their own widget (or
+a ValueListenableBuilder) so that setState stops rebuilding the screen.
+
+Reads inside event handlers (`onTap: () { ... }`) run after the build and
+are not counted. Reads inside `builder:` callbacks and positional closures
+(`.map((e) => ...)`) are counted, because they run while building.
+
+    python3 scripts/setstate_radius.py
+    python3 scripts/setstate_radius.py lib/features/cycle/screens/home_screen.dart --json radius.json
+"""
+import argparse
+import bisect
+import json
+import re
+
+from const_analysis import ConstAnalysis, const_symbols
+from dart_corpus import dart_files
+from dart_index import SourceIndex
+from dart_lexer import IDENT, STRING
+from rebuild_cost import closure_at, widget_call
+
+DEFAULT_PATTERNS = ('lib/features/**/*.dart',)
+
+# Collection methods that mutate their receiver in place
+MUTATORS = {
+    'add', 'addAll', 'insert', 'insertAll', 'remove', 'removeAt', 'removeLast', 'removeWhere',
+    'retainWhere', 'clear', 'sort', 'shuffle', 'putIfAbsent', 'update', 'updateAll', 'addEntries',
+}
+# Calls whose closure arguments run immediately, i.e. during build
+BUILD_TIME_CALLS = {
+    'map', 'where', 'expand', 'generate', 'fold', 'reduce', 'any', 'every', 'forEach',
+    'firstWhere', 'lastWhere', 'singleWhere', 'takeWhile', 'skipWhile', 'sort', 'Builder',
+}
+_COMPOUND_OPERATORS = set('+-*/%|&^?~')
+_STATE_BASE = re.compile(r'\bextends\s+State\s*<')
+_INTERPOLATION = re.compile(r'\$(?:\{([^}]*)\}|([A-Za-z_]\w*))')
+_INTERPOLATED_NAME = re.compile(r'(?<![\w.])([A-Za-z_]\w*)')
+
+
+class Member:
+    """A method or getter of a State class, as a token range of its body."""
+
+    def __init__(self, name, first, last, getter=False):
+        self.name = name
+        self.first = first
+        self.last = last
+        self.getter = getter
+
+
+class TreeNode:
+    """A widget constructor call, or a helper call standing in for the helper's tree."""
+
+    def __init__(self, start, end, key, helper=None):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.helper = helper
+        self.reads = set()
+        self.size = None
+
+
+class SetStateCall:
+    """One setState call and the part of the build tree it really needs."""
+
+    def __init__(self, method, line, fields):
+        self.method = method
+        self.line = line
+        self.fields = fields
+        self.rebuilt = 0
+        self.needed = None
+        self.regions = []
+
+    @property
+    def wasted(self):
+        return 0 if self.needed is None else self.rebuilt - self.needed
+
+    def as_dict(self):
+        return {
+            'method': self.method,
+            'line': self.line,
+            'mutates': sorted(self.fields),
+            'rebuilt_widgets': self.rebuilt,
+            'needed_widgets': self.needed,
+            'wasted_widgets': self.wasted,
+            'needed_regions': [region.label for region in self.regions],
+        }
+
+
+class Region:
+    """A subtree that reads mutated fields: a split-point candidate."""
+
+    def __init__(self, label, line, size, whole_build=False):
+        self.label = label
+        self.line = line
+        self.size = size
+        self.whole_build = whole_build
+        self.fields = set()
+        self.calls = []
+        self.saving = 0.0
+
+
+class StateAnalysis:
+    """Fields, setState calls and build-tree reads of one State class."""
+
+    def __init__(self, path, name, analysis, bodies, line_of):
+        self.path = path
+        self.name = name
+        self.analysis = analysis
+        self.tokens = analysis.tokens
+        self.line_of = line_of
+        self.line = line_of(bodies[0][0])
+        self.fields = {}
+        self.members = {}
+        # The class body, then the bodies of extensions on the class
+        for first, last in bodies:
+            self._scan_members(first + 1, last)
+        self.nodes = {}
+        self.root_reads = {}
+        self.totals = {}
+        self.calls = []
+        self.regions = {}
+        self._memo = {}
+        build = self.members.get('build')
+        self.reachable = self._reachable('build') if build is not None else []
+        for name in self.reachable:
+            self._scan_tree(self.members[name])
+        self.total = self._total('build', set()) if build is not None else 0
+        if build is not None:
+            self._scan_set_states()
+
+    # Declarations
+
+    def _skip_annotation(self, index):
+        if self.tokens[index].text == '@' and index + 1 < len(self.tokens):
+            index += 2
+            while index + 1 < len(self.tokens) and self.tokens[index].text == '.':
+                index += 2
+            if index < len(self.tokens) and self.tokens[index].text == '(':
+                index = self.analysis.pairs.get(index, index) + 1
+        return index
+
+    def _scan_members(self, first, last):
+        """Record the fields and members declared directly in the class body."""
+        tokens = self.tokens
+        pairs = self.analysis.pairs
+        statement = []
+        index = first
+        while index < last:
+            skipped = self._skip_annotation(index)
+            if skipped != index:
+                index = skipped
+                continue
+            text = tokens[index].text
+            if text == '{' and '=' not in (tokens[i].text for i in statement):
+                end = pairs.get(index, last)
+                self._add_member(statement, index + 1, end)
+                statement = []
+                index = end + 1
+                continue
+            if text == '=' and index + 1 < last and tokens[index + 1].text == '>':
+                end = index + 2
+                while end < last and tokens[end].text != ';':
+                    end = pairs.get(end, end) + 1 if tokens[end].text in '([{' else end + 1
+                self._add_member(statement, index + 2, end)
+                statement = []
+                index = end + 1
+                continue
+            if text == ';':
+                self._add_field(statement)
+                statement = []
+                index += 1
+                continue
+            statement.append(index)
+            index = pairs.get(index, index) + 1 if text in '([{' else index + 1
+
+    def _add_member(self, statement, first, last):
+        texts = [self.tokens[i].text for i in statement]
+        if 'get' in texts:
+            position = texts.index('get') + 1
+            if position < len(texts):
+                self.members[texts[position]] = Member(texts[position], first, last, getter=True)
+            return
+        for position, i in enumerate(statement):
+            if self.tokens[i].text == '(' and position > 0 and self.tokens[statement[position - 1]].kind == IDENT:
+                name = self.tokens[statement[position - 1]].text
+                self.members[name] = Member(name, first, last)
+                return
+
+    def _add_field(self, statement):
+        texts = [self.tokens[i].text for i in statement]
+        if not texts or 'static' in texts or texts[0] in ('const', 'factory'):
+            return
+        end = texts.index('=') if '=' in texts else len(texts)
+        if '(' in texts[:end] or end == 0:
+            return
+        name_index = statement[end - 1]
+        if self.tokens[name_index].kind == IDENT:
+            self.fields[self.tokens[name_index].text] = self.line_of(name_index)
+
+    # References
+
+    def _is_reference(self, index, names):
+        """True when the identifier at index is an unqualified (or this.) use of one of names."""
+        token = self.tokens[index]
+        if token.kind != IDENT or token.text not in names:
+            return False
+        if index > 0 and self.tokens[index - 1].text == '.':
+            return index > 1 and self.tokens[index - 2].text == 'this'
+        return True
+
+    def _string_reads(self, token):
+        names = set()
+        for braced, bare in _INTERPOLATION.findall(token.text):
+            if bare:
+                names.add(bare)
+            else:
+                names.update(_INTERPOLATED_NAME.findall(braced))
+        return names & self.fields.keys()
+
+    def _enclosing_call(self, index):
+        """Name of the call whose argument list contains tokens[index], else None."""
+        tokens = self.tokens
+        position = index - 1
+        while position > 0:
+            text = tokens[position].text
+            if text in ')]}':
+                position = self.analysis.pairs.get(position, position) - 1
+                continue
+            if text == '(':
+                return tokens[position - 1].text if tokens[position - 1].kind == IDENT else None
+            if text in '[{;':
+                return None
+            position -= 1
+        return None
+
+    def _deferred_closures(self, first, last):
+        """Token ranges of closures in [first, last) that do not run during build.
+
+        `builder:` callbacks and closures handed to iterable methods
+        (`.map`, `List.generate`, ...) run while building; handlers such as
+        `onTap:` or a callback passed to a helper run later.
+        """
+        ranges = []
+        tokens = self.tokens
+        for index in range(first, last):
+            if tokens[index].text != '(' or index < 2:
+                continue
+            end = closure_at(self.analysis, index)
+            if end is None:
+                continue
+            if tokens[index - 1].text == ':':
+                if not tokens[index - 2].text.lower().endswith('builder'):
+                    ranges.append((index, end))
+            elif self._enclosing_call(index) not in BUILD_TIME_CALLS:
+                ranges.append((index, end))
+        return ranges
+
+    def _call_at(self, index):
+        """Member name called (or getter read) at index, else None."""
+        token = self.tokens[index]
+        member = self.members.get(token.text)
+        if member is None or member.name == 'build' or not self._is_reference(index, self.members):
+            return None
+        following = self.tokens[index + 1].text if index + 1 < len(self.tokens) else ''
+        if member.getter or following == '(':
+            return member.name
+        return None
+
+    def _reachable(self, root):
+        """Members run while building: root and everything it calls, in discovery order."""
+        order = [root]
+        seen = {root}
+        for name in order:
+            member = self.members[name]
+            deferred = self._deferred_closures(member.first, member.last)
+            for index in range(member.first, member.last):
+                if any(start <= index <= end for start, end in deferred):
+                    continue
+                called = self._call_at(index)
+                if called is not None and called not in seen:
+                    seen.add(called)
+                    order.append(called)
+        return order
+
+    # Build tree
+
+    def _scan_tree(self, member):
+        """Widget/helper nodes of one member and the fields each one reads directly."""
+        tokens = self.tokens
+        nodes = []
+        root_reads = set()
+        deferred = self._deferred_closures(member.first, member.last)
+        open_nodes = []
+        skip_until = -1
+        for index in range(member.first, member.last):
+            if index <= skip_until:
+                continue
+            hit = next((end for start, end in deferred if start == index), None)
+            if hit is not None:
+                skip_until = hit
+                continue
+            while open_nodes and index > open_nodes[-1].end:
+                open_nodes.pop()
+            token = tokens[index]
+            reads = set()
+            if token.kind == STRING:
+                reads = self._string_reads(token)
+            elif self._is_reference(index, self.fields):
+                reads = {token.text}
+            if reads:
+                (open_nodes[-1].reads if open_nodes else root_reads).update(reads)
+                continue
+            if token.kind != IDENT:
+                continue
+            called = self._call_at(index)
+            if called is not None:
+                following = index + 1
+                end = self.analysis.pairs.get(following, index) if tokens[following].text == '(' else index
+                node = TreeNode(index, end, called, helper=called)
+            else:
+                found = widget_call(self.analysis, index)
+                if found is None:
+                    continue
+                node = TreeNode(index, found[2], found[0])
+            nodes.append(node)
+            open_nodes.append(node)
+        self.nodes[member.name] = nodes
+        self.root_reads[member.name] = root_reads
+
+    def _total(self, name, active):
+        """Widgets member name builds, helpers included; sizes every node on the way."""
+        if name in self.totals:
+            return self.totals[name]
+        if name in active or name not in self.nodes:
+            return 0
+        active.add(name)
+        nodes = self.nodes[name]
+        # Sizes innermost first: a node is itself plus the nodes it contains
+        for position in range(len(nodes) - 1, -1, -1):
+            node = nodes[position]
+            size = self._total(node.helper, active) if node.helper else 1
+            following = position + 1
+            while following < len(nodes) and nodes[following].start <= node.end:
+                size += nodes[following].size
+                following = self._next_sibling(nodes, following)
+            node.size = size
+        total = 0
+        position = 0
+        while position < len(nodes):
+            total += nodes[position].size
+            position = self._next_sibling(nodes, position)
+        active.discard(name)
+        self.totals[name] = total
+        return total
+
+    @staticmethod
+    def _next_sibling(nodes, position):
+        end = nodes[position].end
+        position += 1
+        while position < len(nodes) and nodes[position].start <= end:
+            position += 1
+        return position
+
+    def needed(self, name, fields, active=frozenset()):
+        """(widgets, regions) of member name that must rebuild when fields change."""
+        key = (name, fields)
+        if key in self._memo:
+            return self._memo[key]
+        if name in active or name not in self.nodes:
+            return 0, []
+        member = self.members[name]
+        if self.root_reads[name] & fields:
+            region = (name, None, self.totals.get(name, 0))
+            result = self.totals.get(name, 0), [region]
+        else:
+            count = 0
+            regions = []
+            nodes = self.nodes[name]
+            position = 0
+            while position < len(nodes):
+                node = nodes[position]
+                if node.reads & fields:
+                    count += node.size
+                    regions.append((name, node, node.size))
+                    position = self._next_sibling(nodes, position)
+                    continue
+                if node.helper:
+                    helper_count, helper_regions = self.needed(node.helper, fields, active | {member.name})
+                    count += helper_count
+                    regions.extend(helper_regions)
+                position += 1
+            result = count, regions
+        self._memo[key] = result
+        return result
+
+    # setState calls
+
+    def _mutations(self, first, last, active):
+        """Fields mutated in tokens[first:last], following calls to other members."""
+        tokens = self.tokens
+        pairs = self.analysis.pairs
+        mutated = set()
+        for index in range(first, last):
+            token = tokens[index]
+            if token.kind != IDENT:
+                continue
+            if self._is_reference(index, self.fields):
+                after = index + 1
+                if after < len(tokens) and tokens[after].text == '[':
+                    after = pairs.get(after, after) + 1
+                operator = after
+                while operator < len(tokens) and operator - after < 2 and tokens[operator].text in _COMPOUND_OPERATORS:
+                    operator += 1
+                texts = [tokens[i].text for i in range(operator, min(operator + 2, len(tokens)))]
+                assigned = texts[:1] == ['='] and texts[1:2] not in (['='], ['>'])
+                incremented = [t.text for t in tokens[after:after + 2]] in (['+', '+'], ['-', '-'])
+                pre_incremented = index >= 2 and [t.text for t in tokens[index - 2:index]] in (['+', '+'], ['-', '-'])
+                mutator = (index + 3 < len(tokens) and tokens[index + 1].text == '.'
+                           and tokens[index + 2].text in MUTATORS and tokens[index + 3].text == '(')
+                if (assigned and operator - after <= 2) or incremented or pre_incremented or mutator:
+                    mutated.add(token.text)
+                continue
+            member = self.members.get(token.text)
+            if (member is not None and member.name not in active and index + 1 < len(tokens)
+                    and tokens[index + 1].text == '(' and self._is_reference(index, self.members)):
+                mutated |= self._mutations(member.first, member.last, active | {member.name})
+        return mutated
+
+    def _scan_set_states(self):
+        tokens = self.tokens
+        for member in self.members.values():
+            for index in range(member.first, member.last):
+                if tokens[index].text != 'setState' or index + 2 >= len(tokens) or tokens[index + 1].text != '(':
+                    continue
+                end = closure_at(self.analysis, index + 2)
+                fields = self._mutations(index + 2, end + 1, {member.name}) if end is not None else set()
+                if not fields:
+                    # `_x = y; setState(() {});`
+                    fields = self._mutations(member.first, index, {member.name})
+                call = SetStateCall(member.name, self.line_of(index), fields)
+                call.rebuilt = self.total
+                if fields:
+                    call.needed, regions = self.needed('build', frozenset(fields))
+                    call.regions = [self._region(region, call, fields, len(regions)) for region in regions]
+                self.calls.append(call)
+
+    def _region(self, found, call, fields, siblings):
+        name, node, size = found
+        if node is None:
+            label = f'{self.name}.{name}' if name != 'build' else f'{self.name}.build (top level)'
+            line = self.members[name].first
+        else:
+            label = f'{node.key}(…) in {self.name}.{name}'
+            line = node.start
+        key = (name, node.start if node is not None else None)
+        region = self.regions.get(key)
+        if region is None:
+            region = Region(label, self.line_of(line), size, whole_build=size >= self.total)
+            self.regions[key] = region
+        reads = self.root_reads[name] if node is None else node.reads
+        region.fields |= reads & fields
+        region.calls.append(call)
+        # Extracting this subtree alone saves its share of the call's waste
+        region.saving += (self.total - size) / siblings
+        return region
+
+    def split_points(self):
+        return sorted(
+            (region for region in self.regions.values() if region.size and not region.whole_build),
+            key=lambda region: region.saving, reverse=True,
+        )
+
+    def as_dict(self):
+        return {
+            'class': self.name,
+            'file': self.path,
+            'line': self.line,
+            'build_widgets': self.total,
+            'fields': sorted(self.fields),
+            'set_states': [call.as_dict() for call in self.calls],
+            'split_points': [
+                {'region': region.label, 'line': region.line, 'widgets': region.size,
+                 'reads': sorted(region.fields), 'set_states': len(region.calls),
+                 'saving': round(region.saving, 1)}
+                for region in self.split_points()
+            ],
+        }
+
+
+def analyze_file(path, source, symbols):
+    """StateAnalysis of every State subclass with a build method in one file."""
+    index = SourceIndex(source)
+    classes = [span for span in index.classes if _STATE_BASE.search(index.header(span))]
+    extensions = [span for span in index.classes if index.header(span).lstrip().startswith('extension')]
+    if not classes:
+        return []
+    analysis = ConstAnalysis(source, path, symbols)
+    starts = [token.start for token in analysis.tokens]
+    newlines = [offset for offset, char in enumerate(source) if char == '\n']
+
+    def line_of(token_index):
+        return bisect.bisect_right(newlines, analysis.tokens[token_index].start) + 1
+
+    states = []
+    def token_range(span):
+        return bisect.bisect_left(starts, span.body_start), bisect.bisect_left(starts, span.body_end - 1)
+
+    for span in classes:
+        on_class = re.compile(rf'\bon\s+{re.escape(span.name)}\b')
+        bodies = [token_range(span)] + [
+            token_range(extension) for extension in extensions if on_class.search(index.header(extension))
+        ]
+        state = StateAnalysis(path, span.name, analysis, bodies, line_of)
+        if state.calls and state.total:
+            states.append(state)
+    return states
+
+
+def analyze(patterns=DEFAULT_PATTERNS):
+    symbols = const_symbols()
+    states = []
+    for path in dart_files(patterns):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading {path}: {e}")
+            continue
+        states.extend(analyze_file(path, source, symbols))
+    return states
+
+
+def print_report(states, top=10, splits=3):
+    ranked = sorted(states, key=lambda s: sum(call.wasted for call in s.calls), reverse=True)
+    calls = sum(len(state.calls) for state in states)
+    wasted = sum(call.wasted for state in states for call in state.calls)
+    rebuilt = sum(call.rebuilt for state in states for call in state.calls if call.needed is not None)
+    share = f" ({wasted * 100 // rebuilt}%)" if rebuilt else ""
+    print(f"💥 setState blast radius: {calls} calls in {len(states)} State classes, "
+          f"{wasted} of {rebuilt} widget rebuilds unneeded{share}")
+    for state in ranked[:top]:
+        print(f"\n🎯 {state.name} ({state.path}:{state.line}): build makes {state.total} widgets")
+        for call in state.calls:
+            fields = ', '.join(sorted(call.fields)) or '?'
+            if call.needed is None:
+                print(f"   line {call.line:<5} {call.method}: mutates no tracked field, rebuilds {call.rebuilt}")
+                continue
+            print(f"   line {call.line:<5} {call.method}: mutates {fields}; rebuilds {call.rebuilt}, "
+                  f"needs {call.needed} ({call.wasted * 100 // max(call.rebuilt, 1)}% wasted)")
+        for rank, region in enumerate(state.split_points()[:splits], 1):
+            print(f"   ✂️  {rank}. extract {region.label} (line {region.line}, {region.size} widgets, "
+                  f"reads {', '.join(sorted(region.fields))}): saves ~{region.saving:.0f} widget rebuilds")
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report how much of the build tree each setState rebuilds needlessly')
+    parser.add_argument('patterns', nargs='*', default=list(DEFAULT_PATTERNS),
+                        help=f'glob patterns to analyze (default {DEFAULT_PATTERNS[0]})')
+    parser.add_argument('--top', type=int, default=10, help='State classes to list (default 10)')
+    parser.add_argument('--splits', type=int, default=3, help='split points to propose per class (default 3)')
+    parser.add_argument('--json', metavar='PATH', help='also write every State class as JSON to PATH')
+    args = parser.parse_args()
+
+    states = analyze(args.patterns)
+    ranked = print_report(states, args.top, args.splits)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([state.as_dict() for state in ranked], f, indent=2)
+        print(f"   Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
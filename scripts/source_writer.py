@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Shared write layer for the fixer scripts.
+
+A file is only written when its new bytes differ from what is on disk, and
+then through a temporary file plus rename, so untouched files keep their
+mtime and the Dart analyzer and `flutter build` caches stay valid. With
+--dry-run nothing is written; unified diffs are printed from memory instead.
+"""
+import difflib
+import os
+import stat
+import tempfile
+
+DRY_RUN_ENV = 'ZYRAFLOW_DRY_RUN'
+
+# Paths written (or, in a dry run, that would be written) by this process
+touched = []
+unchanged = 0
+
+
+def enable_dry_run():
+    """Print diffs instead of writing, including in worker processes."""
+    os.environ[DRY_RUN_ENV] = '1'
+
+
+def dry_run_enabled():
+    return os.environ.get(DRY_RUN_ENV) == '1'
+
+
+def add_dry_run_argument(parser):
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='print unified diffs instead of writing any file',
+    )
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_source(path, content, original=None):
+    """Write content to path only if it changes the file. Returns True if it did.
+
+    original, when the caller still has the text it read, lets an unchanged
+    file be recognised without reading it again.
+    """
+    global unchanged
+    path = str(path)
+
+    if original is not None and content == original:
+        unchanged += 1
+        return False
+
+    data = content.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+
+    if current == data:
+        unchanged += 1
+        return False
+
+    touched.append(path)
+    if dry_run_enabled():
+        old_text = current.decode('utf-8', errors='replace') if current is not None else ''
+        diff = difflib.unified_diff(
+            old_text.splitlines(keepends=True),
+            content.splitlines(keepends=True),
+            fromfile=f'a/{path}',
+            tofile=f'b/{path}',
+        )
+        for line in diff:
+            print(line, end='' if line.endswith('\n') else '\n')
+        return True
+
+    _atomic_write(path, data)
+    return True
+
+
+def write_chunks(path, chunks):
+    """write_source for text produced piece by piece.
+
+    Chunks go straight to the temporary file while being compared with the
+    file on disk, so the full text is never held in memory; the temporary
+    file is dropped if the bytes turn out identical. Returns True if the
+    file changed. A dry run joins the chunks to print the diff.
+    """
+    global unchanged
+    path = str(path)
+    if dry_run_enabled():
+        return write_source(path, ''.join(chunks))
+
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        try:
+            current = open(path, 'rb')
+        except FileNotFoundError:
+            current = None
+        same = current is not None
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                data = chunk.encode('utf-8')
+                f.write(data)
+                if same:
+                    same = current.read(len(data)) == data
+        if current is not None:
+            same = same and current.read(1) == b''
+            current.close()
+        if same:
+            os.unlink(tmp_path)
+            unchanged += 1
+            return False
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    touched.append(path)
+    return True
+
+
+def snapshot():
+    """Marker used to collect the writes a worker process made."""
+    return len(touched), unchanged
+
+
+def since(marker):
+    """Writes made since marker, as (touched_paths, unchanged_count)."""
+    count, unchanged_before = marker
+    return touched[count:], unchanged - unchanged_before
+
+
+def merge(paths, unchanged_count):
+    """Fold writes reported by a worker process into this process."""
+    global unchanged
+    touched.extend(paths)
+    unchanged += unchanged_count
+
+
+def print_summary():
+    verb = 'Would write' if dry_run_enabled() else 'Wrote'
+    print(f"📝 {verb} {len(touched)} files; skipped {unchanged} writes that changed nothing")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Where a bare `theme` is declared and where `context` is a BuildContext.
+
+The theme fixers rewrite `theme.` into `Theme.of(context).` and back. Both
+directions are only sound inside a method that has no `theme` of its own
+(a local, a `ThemeData theme` parameter or a field) and whose `context`
+is a BuildContext: a `build(BuildContext context)` style parameter, or
+the `context` getter of a State subclass. A `paint(PaintingContext
+context, ...)` method has a `context`, but not one Theme.of accepts.
+"""
+import functools
+import re
+
+from dart_index import SourceIndex
+from dart_lexer import IDENT, mask_non_code
+
+# Declarations that put a `theme` in scope: locals, fields, getters and
+# parameters, typed or `this.theme`
+THEME_DECLARATION = re.compile(
+    r'(?:\b(?:final|var|late|const)\s+(?:ThemeData\??\s+)?|\bThemeData\??\s+|\bget\s+|\bthis\.)theme\b'
+)
+_BUILD_CONTEXT_PARAM = re.compile(r'\bBuildContext\??\s+context\b')
+_CONTEXT_PARAM = re.compile(r'\bcontext\b')
+_STATE_CLASS = re.compile(r'\bextends\s+State\s*<')
+
+
+class ThemeScope:
+    """Answers scope questions about `theme` and `context` at an offset of one source."""
+
+    def __init__(self, source):
+        self.source = source
+        self.index = SourceIndex(source)
+        masked = mask_non_code(source)
+        self.declarations = [match.end() for match in THEME_DECLARATION.finditer(masked)]
+        # Offsets of `theme` identifiers in code, not in strings or comments
+        self.theme_tokens = {token.start for token in self.index.tokens
+                             if token.kind == IDENT and token.text == 'theme'}
+
+    @staticmethod
+    def _innermost(spans, offset, start='body_start'):
+        inner = None
+        for span in spans:
+            if getattr(span, start) < offset < span.body_end and (inner is None or span.body_start > inner.body_start):
+                inner = span
+        return inner
+
+    def method_at(self, offset):
+        """The method whose body contains offset, or None."""
+        return self._innermost(self.index.methods, offset)
+
+    def theme_declared(self, offset):
+        """True if a `theme` declared in the method (parameters included), class or file covers offset."""
+        method = self.method_at(offset)
+        owners = [span for span in self.index.classes if span.body_start < offset < span.body_end]
+        for end in self.declarations:
+            declared_in = self._innermost(self.index.methods, end, start='start')
+            if declared_in is not None:
+                if method is not None and declared_in.start == method.start and end < offset:
+                    return True
+                continue
+            # Fields of the enclosing classes and top-level declarations
+            owner = self._innermost(self.index.classes, end)
+            if owner is None or any(span.start == owner.start for span in owners):
+                return True
+        return False
+
+    def build_context(self, offset):
+        """True if `context` at offset is a BuildContext."""
+        method = self.method_at(offset)
+        if method is None:
+            return False
+        if _BUILD_CONTEXT_PARAM.search(method.params):
+            return True
+        if _CONTEXT_PARAM.search(method.params):
+            return False
+        owner = self._innermost(self.index.classes, offset)
+        return owner is not None and bool(_STATE_CLASS.search(self.index.header(owner)))
+
+    def can_use_theme_of(self, offset):
+        """True if a bare `theme` at offset can become Theme.of(context)."""
+        return offset in self.theme_tokens and not self.theme_declared(offset) and self.build_context(offset)
+
+
+@functools.lru_cache(maxsize=4)
+def theme_scope(source):
+    """ThemeScope for source, shared by every match a rule makes on the same text."""
+    return ThemeScope(source)
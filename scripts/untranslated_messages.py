@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Regenerate untranslated_messages.json straight from the ARB files.
+
+`flutter gen-l10n` only refreshes this report as a side effect of
+regenerating every lib/generated/app_localizations_*.dart. This writes the
+same file on its own: for every locale, the template messages it does not
+define, in template order, locales in file order, laid out as gen-l10n
+lays it out.
+
+Results are cached per ARB file by content hash (arb_store.ArbCache), so
+only locales whose file changed are parsed again, and the template only
+when it changed. The JSON is streamed to disk locale by locale and only
+replaces the file when its bytes change.
+
+    python3 scripts/untranslated_messages.py
+"""
+import argparse
+import json
+import os
+import time
+
+from arb_store import CACHE_DIR, ArbCache, arb_paths, is_metadata
+from project_config import add_root_argument, enter_project_root, l10n_config
+from source_writer import add_dry_run_argument, dry_run_enabled, enable_dry_run, print_summary, write_chunks
+
+CACHE_NAME = 'untranslated_messages'
+CACHE_VERSION = 1
+
+
+def _read(path, data):
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+    return json.loads(data)
+
+
+def untranslated(root='.', use_cache=True):
+    """Compute the report from the ARB files.
+
+    Returns (report, changes): report maps each locale with untranslated
+    messages to their keys; changes maps every locale that was recomputed
+    to (previous count or None, new count).
+    """
+    config = l10n_config(root)
+    paths = arb_paths(os.path.join(root, config['arb-dir']), config['template-arb-file'])
+    cache = ArbCache(CACHE_NAME, CACHE_VERSION, root)
+    if not use_cache:
+        cache.entries = {}
+
+    template, template_path = next(iter(paths.items()))
+    template_hash, data = cache.fingerprint(template_path)
+    messages = cache.get(template_path, template_hash)
+    if messages is None:
+        messages = [key for key in _read(template_path, data) if not is_metadata(key)]
+        cache.put(template_path, template_hash, template_hash, messages)
+
+    report = {}
+    changes = {}
+    for code, path in paths.items():
+        if code == template:
+            continue
+        digest, data = cache.fingerprint(path)
+        # A locale's result depends on its own file and on the template
+        key = f'{template_hash}:{digest}'
+        missing = cache.get(path, key)
+        if missing is None:
+            previous = cache.entry(path)
+            defined = _read(path, data)
+            missing = [message for message in messages if message not in defined]
+            cache.put(path, digest, key, missing)
+            changes[code] = (len(previous['result']) if previous else None, len(missing))
+        if missing:
+            report[code] = missing
+
+    if not dry_run_enabled():
+        cache.save()
+    return report, changes
+
+
+def render(report):
+    """The report as JSON text in gen-l10n's layout, one locale at a time."""
+    if not report:
+        yield '{}'
+        return
+    yield '{\n'
+    last = len(report) - 1
+    for position, (code, keys) in enumerate(report.items()):
+        lines = ',\n'.join(f'    "{key}"' for key in keys)
+        separator = ',\n' if position < last else ''
+        yield f'  "{code}": [\n{lines}\n  ]{separator}\n'
+    yield '}\n'
+
+
+def update(root='.', use_cache=True):
+    """Recompute and write the configured untranslated-messages-file.
+
+    Returns (report, changes) as untranslated() does, or None when l10n.yaml
+    does not name a report file.
+    """
+    output = l10n_config(root).get('untranslated-messages-file')
+    if not output:
+        print("⚠️ l10n.yaml has no untranslated-messages-file; nothing to update")
+        return None
+    report, changes = untranslated(root, use_cache)
+    write_chunks(os.path.join(root, output), render(report))
+    return report, changes
+
+
+def print_progress(report, changes):
+    """One line per recomputed locale whose count moved, then the totals."""
+    for code, (before, after) in changes.items():
+        if before is not None and before != after:
+            print(f"   📉 {code}: {before} → {after} untranslated")
+    total = sum(len(keys) for keys in report.values())
+    print(f"📊 {total:,} untranslated messages across {len(report)} locales")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate untranslated_messages.json from the ARB files')
+    add_root_argument(parser)
+    add_dry_run_argument(parser)
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help=f'parse every ARB file instead of reusing results cached in {CACHE_DIR}/')
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    enter_project_root(args.root)
+
+    start = time.perf_counter()
+    result = update(use_cache=args.use_cache)
+    if result is None:
+        return
+    report, changes = result
+    elapsed = (time.perf_counter() - start) * 1000
+    print_progress(report, changes)
+    print(f"🔁 Recomputed {len(changes)} locales in {elapsed:.1f} ms")
+    print_summary()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Watch lib/ and re-apply the codemods to Dart files as they are saved.
+
+Runs the withOpacity, unused-code and theme/const fixers on each changed
+file only, with only the rules whose path patterns cover it. Change events
+come from inotify where the kernel has it (through ctypes, no extra
+packages) and from mtime polling elsewhere. Events are debounced so one
+save, or an editor's write-and-rename, is handled once. Rules are compiled
+and every file's last known text is kept in memory, so an event costs one
+read and the rules that apply. The fixers' own writes come back as events
+with unchanged text and are ignored.
+
+    python3 scripts/watch_codemods.py            # Ctrl-C to stop
+    python3 scripts/watch_codemods.py --dry-run  # print diffs, write nothing
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fix_all_theme_errors
+from cleanup_unused import clean_unused_content
+from dart_corpus import DartCorpus, glob_regex
+from fix_with_opacity import WITH_OPACITY_PATTERN, WITH_OPACITY_REPLACEMENT
+from project_config import add_root_argument, enter_project_root
+from rule_profile import add_profile_argument, enable_profile, profile_rule, report_profile
+from source_writer import add_dry_run_argument, enable_dry_run, print_summary, write_source
+
+WATCH_ROOT = 'lib'
+DEBOUNCE_SECONDS = 0.03
+POLL_SECONDS = 0.5
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT = struct.Struct('iIII')
+
+# Theme rules not run on save: theme_before_declaration rewrites `theme.`
+# the editor is still typing, before the declaration it refers to exists
+UNWATCHED_THEME_RULES = {'theme_before_declaration'}
+
+
+class WatchRule:
+    """A content-level fixer and the paths it applies to."""
+
+    def __init__(self, name, fix, patterns=('lib/**/*.dart',)):
+        self.name = name
+        self.fix = fix
+        self.patterns = [glob_regex(pattern) for pattern in patterns]
+
+    def applies(self, path):
+        return any(pattern.match(path) for pattern in self.patterns)
+
+
+def _theme_error_fixer():
+    """fix_all_theme_errors.fix_file_errors over precompiled rules, less UNWATCHED_THEME_RULES."""
+    compiled = []
+    for name, pattern, replacement in fix_all_theme_errors.THEME_ERROR_RULES:
+        if name in UNWATCHED_THEME_RULES:
+            continue
+        try:
+            compiled.append((name, re.compile(pattern), replacement))
+        except re.error as e:
+            print(f"⚠️ Skipping theme rule {name}: {e}")
+
+    def fix(content, path):
+        count = 0
+        for _, pattern, replacement in compiled:
+            content, fixed = pattern.subn(replacement, content)
+            count += fixed
+        return content, count
+    return fix
+
+
+def _unused_fixer(content, path):
+    content, changes = clean_unused_content(content)
+    return content, len(changes)
+
+
+def _with_opacity_fixer(content, path):
+    return WITH_OPACITY_PATTERN.subn(WITH_OPACITY_REPLACEMENT, content)
+
+
+def default_rules():
+    return [
+        WatchRule('fix_with_opacity', _with_opacity_fixer),
+        WatchRule('cleanup_unused', _unused_fixer),
+        WatchRule('fix_all_theme_errors', _theme_error_fixer(), fix_all_theme_errors.TARGET_PATTERNS),
+    ]
+
+
+class InotifyWatcher:
+    """Recursive directory watch on top of the raw inotify syscalls."""
+
+    name = 'inotify'
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = {}
+        self._add_tree(root)
+
+    def _add_tree(self, root):
+        for directory, subdirs, _ in os.walk(root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+            self.dirs[wd] = directory
+
+    def wait(self, timeout):
+        """Return the set of changed paths, or an empty set after timeout seconds."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; let the caller rescan everything
+                changed.add(None)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                    changed.add(None)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback: compare (mtime, size) of every file on each tick."""
+
+    name = 'polling'
+
+    def __init__(self, root, interval=POLL_SECONDS):
+        self.root = root
+        self.interval = interval
+        self.stats = self._scan()
+
+    def _scan(self):
+        stats = {}
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        stats = self._scan()
+        changed = {path for path, stat in stats.items() if self.stats.get(path) != stat}
+        changed.update(path for path in self.stats if path not in stats)
+        self.stats = stats
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, polling=False):
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except OSError as e:
+            print(f"⚠️ inotify unavailable ({e}); falling back to polling")
+    return PollingWatcher(root)
+
+
+class CodemodDaemon:
+    """Keeps rules and file contents warm and fixes files as they change."""
+
+    def __init__(self, rules, root=WATCH_ROOT):
+        self.rules = rules
+        self.root = root
+        corpus = DartCorpus.load([os.path.join(root, '**', '*.dart')])
+        self.contents = {f.path: f.content for f in corpus.files}
+
+    def process(self, path):
+        """Re-run the relevant rules on one file. Returns the number of fixes."""
+        if not path.endswith('.dart') or os.path.basename(path).startswith('.'):
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            self.contents.pop(path, None)
+            return 0
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading {path}: {e}")
+            return 0
+
+        # Our own writes (and saves that changed nothing) come back as events
+        if self.contents.get(path) == content:
+            return 0
+
+        start = time.perf_counter()
+        original = content
+        fired = []
+        for rule in self.rules:
+            if not rule.applies(path):
+                continue
+            try:
+                content, count = profile_rule(rule.name, path, lambda text: rule.fix(text, path), content)
+            except Exception as e:
+                print(f"❌ Error applying {rule.name} to {path}: {e}")
+                continue
+            if count:
+                fired.append(f"{rule.name} ×{count}")
+
+        self.contents[path] = content
+        if content != original:
+            write_source(path, content, original)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"⚡ {path}: {', '.join(fired)} ({elapsed:.1f} ms)")
+            return len(fired)
+        return 0
+
+    def rescan(self):
+        """Handle every file whose text differs from what is in memory."""
+        paths = set(self.contents)
+        for directory, _, files in os.walk(self.root):
+            paths.update(os.path.join(directory, name) for name in files if name.endswith('.dart'))
+        return sum(self.process(path) for path in sorted(paths))
+
+    def run(self, watcher, debounce=DEBOUNCE_SECONDS):
+        while True:
+            changed = watcher.wait(None)
+            # Collect the rest of a burst (editor temp files, multi-file saves)
+            while changed:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            if None in changed:
+                self.rescan()
+                continue
+            for path in sorted(changed):
+                self.process(os.path.relpath(path) if os.path.isabs(path) else path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-apply the codemods to Dart files as they are saved')
+    parser.add_argument('--watch-dir', default=WATCH_ROOT,
+                        help=f'directory to watch, relative to the project root (default {WATCH_ROOT})')
+    parser.add_argument('--poll', action='store_true', help='use mtime polling instead of inotify')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS * 1000, metavar='MS',
+                        help=f'quiet time that ends a burst of events (default {DEBOUNCE_SECONDS * 1000:.0f} ms)')
+    parser.add_argument('--initial-pass', action='store_true', help='fix every file once before watching')
+    add_dry_run_argument(parser)
+    add_profile_argument(parser)
+    add_root_argument(parser)
+    args = parser.parse_args()
+    if args.dry_run:
+        enable_dry_run()
+    if args.profile:
+        enable_profile(args.profile)
+
+    enter_project_root(args.root)
+
+    daemon = CodemodDaemon(default_rules(), args.watch_dir)
+    if args.initial_pass:
+        daemon.contents.clear()
+        daemon.rescan()
+
+    watcher = make_watcher(args.watch_dir, args.poll)
+    print(f"👀 Watching {args.watch_dir}/ ({len(daemon.contents)} Dart files, {watcher.name}); Ctrl-C to stop")
+    try:
+        daemon.run(watcher, args.debounce / 1000)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+        print_summary()
+        report_profile()
+
+
+if __name__ == '__main__':
+    main()
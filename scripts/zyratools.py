@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the project scripts.
+
+    zyratools [--root DIR] <command> <tool> [tool arguments...]
+
+Commands group the existing scripts (fix, l10n, icons, analyze, bench);
+everything after the tool name is handed to the script unchanged, so
+`zyratools fix opacity --dry-run` is `scripts/fix_with_opacity.py --dry-run`.
+The project root is resolved once by project_config and exported, so every
+tool sees the same root whichever directory zyratools was started from.
+
+Nothing but argparse is imported until a tool is chosen; each script pulls
+in its own dependencies (Pillow for the icons, watchdog for `fix watch`)
+when it runs. This keeps `zyratools --help` fast.
+"""
+import argparse
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CHECKOUT = os.path.dirname(SCRIPTS_DIR)
+
+# command -> (help, {tool: (path relative to the checkout, help)})
+COMMANDS = {
+    'fix': ('Apply the Dart codemods to lib/', {
+        'opacity': ('scripts/fix_with_opacity.py', 'Replace withOpacity() with withValues(alpha:)'),
+        'unused': ('scripts/cleanup_unused.py', 'Remove unused imports and variables'),
+        'performance': ('scripts/optimize_performance.py', 'Run the startup, const and theme optimizations'),
+        'critical': ('scripts/fix_critical_errors.py', 'Fix critical analyzer errors'),
+        'production': ('scripts/production_cleanup.py', 'Run the production cleanup fixes'),
+        'theme': ('fix_all_theme_errors.py', 'Fix theme and const errors'),
+        'fixpoint': ('scripts/fixed_point.py', 'Run the theme fixers together to a fixed point per file'),
+        'biometric': ('fix_biometric_errors.py', 'Fix the biometric dashboard screen'),
+        'init-waves': ('scripts/service_init_dag.py', 'Reorder main.dart service initialization into waves'),
+        'watch': ('scripts/watch_codemods.py', 'Re-apply the codemods as files are saved'),
+    }),
+    'l10n': ('Maintain the ARB translation files', {
+        'complete': ('scripts/complete_translations.py', 'Fill in missing translations'),
+        'critical': ('scripts/add_critical_translations.py', 'Add the critical translations to key languages'),
+        'untranslated': ('scripts/untranslated_messages.py', 'Regenerate untranslated_messages.json from the ARB files'),
+        'generate': ('scripts/gen_l10n.py', 'Regenerate the changed lib/generated/app_localizations*.dart files'),
+    }),
+    'icons': ('Generate app icons and logos', {
+        'app': ('create_flowsense_icon.py', 'Draw the app icon in several sizes (Pillow)'),
+        'logo': ('create_logo.py', 'Draw the logo PNG, or an SVG without Pillow'),
+        'android': ('generate_android_icons.sh', 'Rasterize the Android launcher icons (rsvg-convert)'),
+        'ios': ('generate_ios_icons.sh', 'Rasterize the iOS app icons (rsvg-convert)'),
+        'ios-appiconset': ('scripts/generate_icons.sh', 'Build the iOS icon set from zyraflow_icon.svg'),
+    }),
+    'analyze': ('Static reports over lib/', {
+        'imports': ('scripts/import_graph.py', 'Import graph and startup closure'),
+        'references': ('scripts/reference_graph.py', 'Unused imports, dead files and declarations'),
+        'rebuild-cost': ('scripts/rebuild_cost.py', 'Rank build methods by rebuild cost'),
+        'setstate': ('scripts/setstate_radius.py', 'setState blast radius of State classes'),
+        'diagnostics': ('scripts/diagnostics_store.py', 'Store and query analyzer runs'),
+    }),
+    'bench': ('Benchmarks for the tooling', {
+        'codemods': ('scripts/bench_codemods.py', 'Benchmark the codemods on synthetic corpora'),
+        'passes': ('scripts/dart_corpus.py', 'Compare per-rule passes with a single corpus pass'),
+    }),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='zyratools',
+        description='ZyraFlow project tools',
+        epilog='Run `zyratools <command> <tool> --help` for the options of a tool.',
+    )
+    parser.add_argument('--root', metavar='DIR', help='Flutter project root (default $ZYRAFLOW_ROOT, else the nearest directory with a pubspec.yaml)')
+    commands = parser.add_subparsers(dest='command', metavar='<command>')
+    parser.command_parsers = {}
+    for command, (command_help, tools) in COMMANDS.items():
+        width = max(len(tool) for tool in tools)
+        listing = '\n'.join(f'  {tool:<{width}}  {text}' for tool, (_, text) in tools.items())
+        sub = commands.add_parser(
+            command, help=command_help, description=command_help,
+            epilog=f'tools:\n{listing}', formatter_class=argparse.RawDescriptionHelpFormatter,
+        )
+        sub.add_argument('tool', nargs='?', choices=list(tools), metavar='<tool>')
+        sub.add_argument('args', nargs=argparse.REMAINDER, help='arguments passed to the tool')
+        parser.command_parsers[command] = sub
+    return parser
+
+
+def run_tool(path, args):
+    """Run a script as if it were started directly. Returns the exit status."""
+    if path.endswith('.sh'):
+        import subprocess
+        return subprocess.call(['bash', path] + args)
+
+    import runpy
+    sys.argv = [path] + args
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except SystemExit as exit:
+        return exit.code
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.tool is None:
+        parser.command_parsers[args.command].print_help()
+        return 2
+
+    from project_config import enter_project_root
+    enter_project_root(args.root)
+    path, _ = COMMANDS[args.command][1][args.tool]
+    return run_tool(os.path.join(CHECKOUT, path), args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())